@@ -0,0 +1,168 @@
+# src/arrays.py
+"""
+Fixed-size arrays: ``int a[8];`` / ``float v[3];``.
+
+Values are ``array.array`` buffers (``'q'`` 64-bit ints, ``'d'`` doubles),
+so an array costs 8 bytes per element instead of a Python object each.
+Whole-array expressions are one operation over the buffer, never an
+interpreted loop: ``a = b + c;`` is a single ``map`` over both buffers,
+``sum(a)`` a single call, ``a = 0;`` one repeat of a one-element buffer.
+Both engines (``VM.run`` and the TAC interpreter) use these helpers, so
+they agree element for element.
+
+Semantics:
+- elements start at 0; indices run from 0 to size - 1, anything else is a
+  runtime error (no negative indices);
+- ``+ - * /`` work element-wise between arrays of the same size, or
+  between an array and a scalar (the scalar applies to every element);
+  ``/`` always gives a float array, as it gives a float for scalars;
+- assigning an array copies it; assigning a scalar fills the array;
+- ``sum``, ``min`` and ``max`` reduce an array to a scalar;
+- ``print(a)`` prints ``[1, 2, 3]``;
+- int elements are 64 bit: a result outside that range is a runtime error;
+- a size is at most ``MAX_ARRAY_SIZE`` elements (a syntax error otherwise).
+
+Array types are spelled ``int[8]`` in the checker and in diagnostics.
+"""
+
+import operator
+from array import array
+from itertools import repeat
+from typing import Union
+
+from .errors import RuntimeErrorMC
+
+TYPECODES = {'int': 'q', 'float': 'd'}
+ELEMENT_TYPES = {'q': 'int', 'd': 'float'}
+ELEMENT_BYTES = 8
+# 128 MB per array; the whole buffer is allocated by the declaration
+MAX_ARRAY_SIZE = 1 << 24
+
+ELEMENTWISE = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+}
+REDUCTIONS = {'sum': sum, 'min': min, 'max': max}
+
+Scalar = Union[int, float]
+
+
+# -----------------------------
+# Types (checker side)
+# -----------------------------
+def array_type(elem: str, size: int) -> str:
+    return f"{elem}[{size}]"
+
+
+def is_array_type(t: str) -> bool:
+    return t.endswith(']')
+
+
+def element_type(t: str) -> str:
+    return t[:t.index('[')]
+
+
+def array_size(t: str) -> int:
+    return int(t[t.index('[') + 1:-1])
+
+
+# -----------------------------
+# Values (runtime side)
+# -----------------------------
+def new_array(elem: str, size: int) -> array:
+    # zero bytes are 0 / 0.0 for both type codes
+    try:
+        return array(TYPECODES[elem], bytes(ELEMENT_BYTES * size))
+    except MemoryError:
+        # a hand-made .mcb can skip the front end's size check
+        raise RuntimeErrorMC(f"Out of memory allocating {elem}[{size}]") from None
+
+
+def type_of(arr: array) -> str:
+    return array_type(ELEMENT_TYPES[arr.typecode], len(arr))
+
+
+def _code(v) -> str:
+    if isinstance(v, array):
+        return v.typecode
+    return 'd' if isinstance(v, float) else 'q'
+
+
+def _build(code: str, values) -> array:
+    try:
+        return array(code, values)
+    except OverflowError:
+        raise RuntimeErrorMC("Integer overflow in array operation") from None
+
+
+def elementwise(op: str, left, right) -> array:
+    """``left op right`` where at least one side is an array."""
+    fn = ELEMENTWISE[op]
+    l_arr = isinstance(left, array)
+    r_arr = isinstance(right, array)
+    code = 'd' if op == '/' or 'd' in (_code(left), _code(right)) else 'q'
+    if l_arr and r_arr:
+        if len(left) != len(right):
+            raise RuntimeErrorMC(f"Array size mismatch: {len(left)} vs {len(right)}")
+        values = map(fn, left, right)
+    elif l_arr:
+        values = map(fn, left, repeat(right, len(left)))
+    else:
+        values = map(fn, repeat(left, len(right)), right)
+    try:
+        return _build(code, values)
+    except ZeroDivisionError:
+        raise RuntimeErrorMC("Division by zero") from None
+
+
+def negate(arr: array) -> array:
+    return _build(arr.typecode, map(operator.neg, arr))
+
+
+def assign(target: array, value, name: str) -> None:
+    """``name = value`` for an array variable: copy or fill in place."""
+    if isinstance(value, array):
+        if len(value) != len(target):
+            raise RuntimeErrorMC(
+                f"Array size mismatch: cannot assign {len(value)} elements to '{name}' "
+                f"({len(target)})")
+        if value.typecode == target.typecode:
+            target[:] = value
+            return
+        if target.typecode == 'q':
+            raise RuntimeErrorMC(f"Type error: cannot assign float array to int array {name}")
+        target[:] = array('d', value)
+        return
+    if target.typecode == 'q' and isinstance(value, float):
+        raise RuntimeErrorMC(f"Type error: cannot assign float to int array {name}")
+    target[:] = _build(target.typecode, (value,)) * len(target)
+
+
+def _checked(arr: array, i, name: str) -> int:
+    if not isinstance(i, int) or not 0 <= i < len(arr):
+        raise RuntimeErrorMC(f"Index {i} out of range for '{name}' (size {len(arr)})")
+    return i
+
+
+def get(arr: array, i, name: str) -> Scalar:
+    return arr[_checked(arr, i, name)]
+
+
+def put(arr: array, i, value, name: str) -> None:
+    i = _checked(arr, i, name)
+    if arr.typecode == 'q' and isinstance(value, float):
+        raise RuntimeErrorMC(f"Type error: cannot assign float to int array {name}")
+    try:
+        arr[i] = value
+    except OverflowError:
+        raise RuntimeErrorMC("Integer overflow in array operation") from None
+
+
+def reduce(op: str, arr: array) -> Scalar:
+    return REDUCTIONS[op](arr)
+
+
+def format_array(arr: array) -> str:
+    return str(arr.tolist())
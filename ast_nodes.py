@@ -1,26 +1,45 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional
 
+# Every node remembers the source line it starts on (0 = unknown). It is
+# left out of ==/repr so structurally equal trees still compare equal.
+
 # Expressions
 class Expr: ...
 @dataclass
 class Literal(Expr):
     value: object
+    line: int = field(default=0, compare=False, repr=False)
 
 @dataclass
 class Var(Expr):
     name: str
+    line: int = field(default=0, compare=False, repr=False)
 
 @dataclass
 class Unary(Expr):
     op: str
     right: Expr
+    line: int = field(default=0, compare=False, repr=False)
 
 @dataclass
 class Binary(Expr):
     left: Expr
     op: str
     right: Expr
+    line: int = field(default=0, compare=False, repr=False)
+
+@dataclass
+class Index(Expr):
+    name: str       # always an array variable
+    index: Expr
+    line: int = field(default=0, compare=False, repr=False)
+
+@dataclass
+class Reduce(Expr):
+    op: str         # 'sum' | 'min' | 'max'
+    arg: Expr       # array valued
+    line: int = field(default=0, compare=False, repr=False)
 
 # Statements
 class Stmt: ...
@@ -29,30 +48,50 @@ class VarDecl(Stmt):
     type_name: str  # 'int' or 'float'
     name: str
     init: Optional[Expr]
+    line: int = field(default=0, compare=False, repr=False)
+
+@dataclass
+class ArrayDecl(Stmt):
+    type_name: str  # element type, 'int' or 'float'
+    name: str
+    size: int
+    line: int = field(default=0, compare=False, repr=False)
+
+@dataclass
+class IndexAssign(Stmt):
+    name: str
+    index: Expr
+    value: Expr
+    line: int = field(default=0, compare=False, repr=False)
 
 @dataclass
 class Assign(Stmt):
     name: str
     value: Expr
+    line: int = field(default=0, compare=False, repr=False)
 
 @dataclass
 class Print(Stmt):
     expr: Expr
+    line: int = field(default=0, compare=False, repr=False)
 
 @dataclass
 class Block(Stmt):
     statements: List[Stmt]
+    line: int = field(default=0, compare=False, repr=False)
 
 @dataclass
 class If(Stmt):
     cond: Expr
     then_branch: Stmt
     else_branch: Optional[Stmt]
+    line: int = field(default=0, compare=False, repr=False)
 
 @dataclass
 class While(Stmt):
     cond: Expr
     body: Stmt
+    line: int = field(default=0, compare=False, repr=False)
 
 @dataclass
 class Program:
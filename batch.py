@@ -0,0 +1,124 @@
+# src/batch.py
+"""
+Batch mode: compile and run many .mc files over a process pool.
+
+Every program is handled by ``compile_file`` in a worker process with its
+own output sink, so outputs never interleave. ``Executor.map`` returns
+results in submission order and the input list is sorted, so the report is
+the same however the pool schedules the work.
+"""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Set
+
+from .pipeline import Compiler
+from .report import BOLD, CYAN, RED, RESET, print_overall_summary
+
+
+@dataclass
+class BatchResult:
+    path: str
+    total_tokens: int = 0
+    lexemes: Set[str] = field(default_factory=set)
+    tac_instr_count: int = 0
+    vm_executed: bool = False
+    output: str = ''
+    # 'lex' | 'parse' | 'semantic' | 'runtime' | 'internal', None if clean
+    error_phase: Optional[str] = None
+    error: str = ''
+
+
+ERROR_TITLES = {
+    'lex': 'LEXER ERROR',
+    'parse': 'PARSER (Syntax) ERROR',
+    'semantic': 'SEMANTIC ANALYSIS ERROR',
+    'runtime': 'RUNTIME ERROR',
+    'internal': 'INTERNAL ERROR',
+}
+
+
+_RUN = Compiler(until='run')
+_COMPILE = Compiler(until='tac')
+
+
+def expand_inputs(patterns: Iterable[str]) -> List[str]:
+    """Directories (recursive *.mc), globs and plain paths -> sorted unique list."""
+    found = set()
+    for pat in patterns:
+        if os.path.isdir(pat):
+            found.update(glob.glob(os.path.join(pat, '**', '*.mc'), recursive=True))
+        elif glob.has_magic(pat):
+            found.update(p for p in glob.glob(pat, recursive=True) if os.path.isfile(p))
+        else:
+            found.add(pat)
+    return sorted(found)
+
+
+def compile_file(path: str, run_program: bool = True) -> BatchResult:
+    """Full pipeline for one file; never raises, the error goes in the result."""
+    res = BatchResult(path)
+    compiled = (_RUN if run_program else _COMPILE).compile_file(path)
+    if compiled.tokens is not None:
+        user_tokens = compiled.tokens[:-1]
+        res.total_tokens = len(user_tokens)
+        res.lexemes = {t.lexeme for t in user_tokens}
+    if compiled.tac is not None:
+        res.tac_instr_count = len(compiled.tac)
+    res.vm_executed = 'run' in compiled.stages
+    res.output = compiled.output
+    if compiled.error is not None:
+        e = compiled.error
+        res.error_phase = compiled.error_phase
+        # e.g. missing file or division by zero; keep the rest of the batch going
+        res.error = f"{type(e).__name__}: {e}" if res.error_phase == 'internal' else str(e)
+    return res
+
+
+def _compile_and_run(path: str) -> BatchResult:
+    return compile_file(path, True)
+
+
+def _compile_only(path: str) -> BatchResult:
+    return compile_file(path, False)
+
+
+def run_batch(paths: List[str], jobs: Optional[int] = None,
+              run_program: bool = True) -> List[BatchResult]:
+    """Results in the order of *paths*. ``jobs=1`` stays in this process."""
+    worker = _compile_and_run if run_program else _compile_only
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(paths) <= 1:
+        return [worker(p) for p in paths]
+    # bigger chunks = fewer round trips for thousands of tiny programs
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        return list(pool.map(worker, paths, chunksize=chunksize))
+
+
+def print_batch_report(results: List[BatchResult]) -> None:
+    for r in results:
+        print(f"{BOLD}{CYAN}--- {r.path} ---{RESET}")
+        if r.output:
+            print(r.output, end='')
+        if r.error_phase:
+            print(f"{BOLD}{RED}{ERROR_TITLES[r.error_phase]}{RESET}: {r.error}")
+        print()
+
+    def count(phase):
+        return sum(1 for r in results if r.error_phase == phase)
+
+    lexemes = set()
+    for r in results:
+        lexemes |= r.lexemes
+    executed = sum(1 for r in results if r.vm_executed)
+    print_overall_summary(
+        sum(r.total_tokens for r in results), len(lexemes),
+        count('lex'), count('parse'), count('semantic'),
+        count('runtime') + count('internal'),
+        sum(r.tac_instr_count for r in results),
+        f"{executed}/{len(results)}", executed == len(results),
+        programs=len(results),
+    )
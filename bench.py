@@ -0,0 +1,297 @@
+# src/bench.py
+"""
+Per-phase benchmark harness with JSON baselines.
+
+Every workload (synthetic programs from ``workload.py`` plus the demo files
+that compile) is run through each phase separately, ``--repeat`` times; the
+fastest run of each phase is kept. ``--save`` writes the numbers as a JSON
+baseline, ``--compare`` fails (exit code 1) when a phase got slower than the
+baseline by more than ``--threshold``.
+
+    python -m package.bench --save baseline.json
+    python -m package.bench --compare baseline.json --threshold 0.15
+
+``--startup`` instead times cold starts: fresh interpreters running the
+CLI (and importing the library API) on a small demo, best and median of
+``--repeat`` runs, next to a bare ``python -c pass``.
+
+    python -m package.bench --startup --repeat 20
+
+``--front-end`` compares the multi-pass front end (parse, check, TAC)
+with the one-pass one (``onepass.py``) on the same tokens: best time and
+peak traced memory, AST and TAC included.
+
+    python -m package.bench --front-end --workload size
+"""
+
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+from .lexer import Lexer
+from .parser import Parser
+from .semantic import SemanticAnalyzer
+from .tac import TACGenerator
+from .onepass import OnePassParser
+from .vm import VM
+from .sinks import NullSink
+from .workload import WorkloadSpec, generate_program
+
+BASELINE_VERSION = 1
+PHASES = ('lexer', 'parser', 'semantic', 'tac', 'vm', 'vm_ast')
+
+# regressions smaller than this are timer noise, whatever the ratio
+MIN_DELTA = 0.0002
+
+# one knob turned up per workload so a regression points at a dimension
+WORKLOADS: Dict[str, WorkloadSpec] = {
+    'baseline': WorkloadSpec(),
+    'size': WorkloadSpec(size=400),
+    'depth': WorkloadSpec(size=20, depth=4, trips=4),
+    'expr_depth': WorkloadSpec(expr_depth=7),
+    'trips': WorkloadSpec(size=20, trips=200),
+    'variables': WorkloadSpec(size=200, variables=200),
+}
+QUICK = ('baseline', 'expr_depth')
+
+DEMO_DIR = os.path.dirname(os.path.abspath(__file__))
+PKG = __package__ or 'package'
+STARTUP_DEMO = os.path.join(DEMO_DIR, 'demo1.mc')
+
+# name -> interpreter arguments; every one runs in a fresh process
+STARTUP_COMMANDS: Dict[str, List[str]] = {
+    'python -c pass': ['-c', 'pass'],
+    'import pipeline': ['-c', f'import {PKG}.pipeline'],
+    'main --lex': ['-m', f'{PKG}.main', '--lex', '-q', STARTUP_DEMO],
+    'main --tac-only': ['-m', f'{PKG}.main', '--tac-only', '-q', STARTUP_DEMO],
+    'main (run)': ['-m', f'{PKG}.main', '-q', STARTUP_DEMO],
+}
+
+
+def _timed(fn) -> Tuple[float, object]:
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def time_phases(source: str, repeat: int = 3) -> Dict[str, float]:
+    """Best-of-*repeat* seconds for each phase of *source*."""
+    best = {p: float('inf') for p in PHASES}
+    sink = NullSink()
+    for _ in range(repeat):
+        dt, tokens = _timed(lambda: Lexer(source).scan_tokens())
+        best['lexer'] = min(best['lexer'], dt)
+        dt, program = _timed(lambda: Parser(tokens).parse())
+        best['parser'] = min(best['parser'], dt)
+        dt, _ = _timed(lambda: SemanticAnalyzer().analyze(program))
+        best['semantic'] = min(best['semantic'], dt)
+        dt, tac = _timed(lambda: TACGenerator().generate(program))
+        best['tac'] = min(best['tac'], dt)
+        dt, _ = _timed(lambda: VM(program, sink).execute(tac))
+        best['vm'] = min(best['vm'], dt)
+        dt, _ = _timed(lambda: VM(program, sink).run())
+        best['vm_ast'] = min(best['vm_ast'], dt)
+    return best
+
+
+def _multi_pass(tokens):
+    program = Parser(tokens).parse()
+    SemanticAnalyzer().analyze(program)
+    return TACGenerator().generate(program)
+
+
+def _one_pass(tokens):
+    return OnePassParser(tokens).compile()
+
+
+FRONT_ENDS = {'multi-pass': _multi_pass, 'one-pass': _one_pass}
+
+
+def time_front_ends(source: str, repeat: int = 3) -> Dict[str, Tuple[float, int]]:
+    """name -> (best seconds, peak bytes) from tokens to TAC."""
+    tokens = Lexer(source).scan_tokens()
+    out = {}
+    for name, fn in FRONT_ENDS.items():
+        best = min(_timed(lambda: fn(tokens))[0] for _ in range(repeat))
+        # measured apart: tracing slows the run down
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn(tokens)
+            _cur, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        out[name] = (best, peak)
+    return out
+
+
+def print_front_ends(workloads: Dict[str, Tuple[dict, str]], repeat: int = 3) -> None:
+    head = (f"{'workload':<28}{'multi-pass':>12}{'one-pass':>12}{'speedup':>9}"
+            f"{'multi peak':>12}{'one peak':>12}{'memory':>8}")
+    print(head)
+    print('-' * len(head))
+    for name, (_desc, src) in workloads.items():
+        res = time_front_ends(src, repeat)
+        (mt, mp), (ot, op) = res['multi-pass'], res['one-pass']
+        print(f"{name:<28}{mt * 1000:>10.3f}ms{ot * 1000:>10.3f}ms{mt / ot:>8.2f}x"
+              f"{mp / 1024:>10.1f}KB{op / 1024:>10.1f}KB{op / mp:>7.0%}")
+
+
+def time_startup(repeat: int = 10) -> Dict[str, Tuple[float, float]]:
+    """name -> (best, median) seconds of a cold start."""
+    # the package has to be importable from the child's working directory
+    cwd = os.path.dirname(DEMO_DIR)
+    out = {}
+    for name, argv in STARTUP_COMMANDS.items():
+        runs = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable] + argv, cwd=cwd, check=True,
+                           stdout=subprocess.DEVNULL)
+            runs.append(time.perf_counter() - t0)
+        out[name] = (min(runs), statistics.median(runs))
+    return out
+
+
+def print_startup(times: Dict[str, Tuple[float, float]]) -> None:
+    bare = times['python -c pass'][0]
+    print(f"{'cold start':<20}{'best':>11}{'median':>11}{'over bare':>12}")
+    print('-' * 54)
+    for name, (best, median) in times.items():
+        print(f"{name:<20}{best * 1000:>9.1f}ms{median * 1000:>9.1f}ms"
+              f"{(best - bare) * 1000:>10.1f}ms")
+
+
+def collect_workloads(names: Optional[List[str]] = None,
+                      demos: bool = True) -> Dict[str, Tuple[dict, str]]:
+    """name -> (description, source)."""
+    out = {}
+    for name in names or WORKLOADS:
+        if name not in WORKLOADS:
+            raise SystemExit(f"unknown workload {name!r}; choose from {', '.join(WORKLOADS)}")
+        spec = WORKLOADS[name]
+        out[name] = (spec.to_dict(), generate_program(spec))
+    if demos:
+        for path in sorted(glob.glob(os.path.join(DEMO_DIR, 'demo*.mc'))):
+            with open(path) as f:
+                src = f.read()
+            try:
+                SemanticAnalyzer().analyze(Parser(Lexer(src).scan_tokens()).parse())
+            except Exception:
+                # some demos use operators the language does not have
+                continue
+            out[os.path.basename(path)] = ({'file': os.path.basename(path)}, src)
+    return out
+
+
+def run_benchmarks(workloads: Dict[str, Tuple[dict, str]], repeat: int = 3) -> dict:
+    results = {}
+    for name, (desc, src) in workloads.items():
+        results[name] = {'params': desc, 'phases': time_phases(src, repeat)}
+    return {
+        'version': BASELINE_VERSION,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'repeat': repeat,
+        'workloads': results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Human readable regressions of *current* against *baseline*."""
+    if baseline.get('version') != BASELINE_VERSION:
+        raise SystemExit(f"baseline version {baseline.get('version')} != {BASELINE_VERSION}")
+    problems = []
+    for name, res in current['workloads'].items():
+        base = baseline['workloads'].get(name)
+        if base is None:
+            continue
+        for phase, secs in res['phases'].items():
+            old = base['phases'].get(phase)
+            if old is None:
+                continue
+            if secs > old * (1 + threshold) and secs - old > MIN_DELTA:
+                problems.append(f"{name}/{phase}: {old * 1000:.3f} ms -> {secs * 1000:.3f} ms "
+                                f"(+{(secs / old - 1) * 100:.0f}%)")
+    return problems
+
+
+def print_table(report: dict, baseline: Optional[dict] = None) -> None:
+    head = f"{'workload':<28}" + ''.join(f"{p:>11}" for p in PHASES)
+    print(head)
+    print('-' * len(head))
+    for name, res in report['workloads'].items():
+        row = f"{name:<28}"
+        for p in PHASES:
+            row += f"{res['phases'][p] * 1000:>9.3f}ms"
+        print(row)
+        if baseline and name in baseline['workloads']:
+            old = baseline['workloads'][name]['phases']
+            row = f"{'  vs baseline':<28}"
+            for p in PHASES:
+                if old.get(p):
+                    row += f"{(res['phases'][p] / old[p] - 1) * 100:>+10.0f}%"
+                else:
+                    row += f"{'-':>11}"
+            print(row)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-phase benchmarks for the MC compiler")
+    ap.add_argument("--workload", action="append", help="only these synthetic workloads")
+    ap.add_argument("--quick", action="store_true", help="small subset, no demos")
+    ap.add_argument("--no-demos", dest="demos", action="store_false")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--save", metavar="JSON", help="write results as a baseline")
+    ap.add_argument("--compare", metavar="JSON", help="fail on regressions vs this baseline")
+    ap.add_argument("--threshold", type=float, default=0.10,
+                    help="allowed slowdown per phase, 0.10 = 10%% (default)")
+    ap.add_argument("--startup", action="store_true",
+                    help="time cold starts of the CLI instead of the phases")
+    ap.add_argument("--front-end", dest="front_end", action="store_true",
+                    help="compare multi-pass and one-pass front ends (time, peak memory)")
+    args = ap.parse_args()
+
+    if args.startup:
+        print_startup(time_startup(max(args.repeat, 5)))
+        return
+
+    names = args.workload or (list(QUICK) if args.quick else None)
+    workloads = collect_workloads(names, demos=args.demos and not args.quick)
+    if args.front_end:
+        print_front_ends(workloads, args.repeat)
+        return
+    report = run_benchmarks(workloads, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_table(report, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nbaseline written to {args.save}")
+
+    if baseline is not None:
+        problems = compare(report, baseline, args.threshold)
+        if problems:
+            print(f"\nREGRESSIONS (threshold {args.threshold * 100:.0f}%):")
+            for p in problems:
+                print("  " + p)
+            sys.exit(1)
+        print(f"\nno phase regressed more than {args.threshold * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# src/client.py
+"""
+Thin client for ``server.py``.
+
+    python -m package.client run demo1.mc demo7_factorial.mc
+    python -m package.client --unix /tmp/mc.sock check prog.mc --json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+from .server import DEFAULT_HOST, DEFAULT_PORT, LINE_LIMIT
+
+
+async def request_many(requests: List[Dict[str, Any]], host: str = DEFAULT_HOST,
+                       port: int = DEFAULT_PORT,
+                       unix_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Pipeline *requests* over one connection; responses in request order."""
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path, limit=LINE_LIMIT)
+    else:
+        reader, writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+
+    async def send():
+        for req in requests:
+            writer.write(json.dumps(req).encode('utf-8') + b'\n')
+            await writer.drain()
+
+    # write and read at the same time so neither side's buffer fills up
+    sender = asyncio.ensure_future(send())
+    responses = []
+    try:
+        for _ in requests:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("server closed the connection")
+            responses.append(json.loads(line))
+        await sender
+    finally:
+        sender.cancel()
+        writer.close()
+    return responses
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Client for the MC compile server")
+    ap.add_argument("op", choices=["check", "compile", "run", "stats"])
+    ap.add_argument("files", nargs="*", help="source files (.mc)")
+    ap.add_argument("--host", default=DEFAULT_HOST)
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--unix", metavar="PATH", help="connect to a Unix socket")
+    ap.add_argument("--json", action="store_true", help="print raw JSON responses")
+    args = ap.parse_args()
+
+    if args.op == "stats":
+        requests = [{"id": 0, "op": "stats"}]
+    else:
+        if not args.files:
+            ap.error(f"{args.op} needs at least one file")
+        requests = []
+        for i, path in enumerate(args.files):
+            with open(path, "r") as f:
+                requests.append({"id": i, "op": args.op, "source": f.read()})
+
+    responses = asyncio.run(request_many(requests, args.host, args.port, args.unix))
+
+    failed = 0
+    for resp in responses:
+        if args.json:
+            print(json.dumps(resp))
+            failed += not resp.get("ok")
+            continue
+        name = args.files[resp["id"]] if args.files else "server"
+        if not resp.get("ok"):
+            failed += 1
+            sys.stdout.write(resp.get("output", ""))
+            err = resp["error"]
+            print(f"{name}: {err['phase']} error: {err['message']}")
+        elif args.op == "run":
+            sys.stdout.write(resp["output"])
+        elif args.op == "compile":
+            for ins in resp["tac"]:
+                print(tuple(ins))
+        elif args.op == "check":
+            print(f"{name}: OK ({resp['tokens']} tokens)")
+        else:
+            print(resp)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
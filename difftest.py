@@ -0,0 +1,433 @@
+# src/difftest.py
+"""
+Differential testing and throughput comparison of the execution engines.
+
+The same program is run by every engine and the results must be identical:
+the printed text and, if the run fails, the error class and message. Front
+end errors are results too, so the streaming and hash-consed front ends are
+checked against the plain one.
+
+    ast        tree walking interpreter (VM.run)
+    tac        TAC interpreter (VM.execute), per peephole level
+    mcb        TAC through an in-memory .mcb image
+    stream     streamed front end -> peephole -> .mcb file -> VM
+    hashcons   hash-consed AST with memoised checking and lowering
+    onepass    parse, check and TAC in one traversal, no AST
+    resumable  TACExecution.resume in small slices
+    snapshot   paused at every slice, saved as .mcs, resumed from the copy
+
+Programs are the demos plus random ones from ``fuzz.py``, valid and broken
+(every engine must then fail with the same diagnostic). A disagreement is
+shrunk (delta debugging over lines, then tokens) to a small program that
+still shows it, and printed. ``--bench`` prints execution time of every
+engine side by side, relative to ``tac`` (``snapshot`` is only checked,
+not timed).
+
+    python -m package.difftest --fuzz 500 --seed 1
+    python -m package.difftest --bench --engines ast,tac,mcb
+
+Exit code 1 if any program made the engines disagree.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .errors import BudgetExceeded
+from .lexer import Lexer
+from .parser import Parser
+from .semantic import SemanticAnalyzer
+from .tac import TACGenerator
+from .onepass import OnePassParser
+from .vm import VM, tac_labels
+from .mcb import encode_mcb, loads_mcb, load_mcb, write_mcb_stream
+from .peephole import MAX_LEVEL, optimize, optimize_list
+from .snapshot import encode_snapshot, loads_snapshot
+from .sinks import ListSink, NullSink, OutputSink
+from .limits import Limits
+from .fuzz import TOKEN, broken_program, random_program
+from .workload import WorkloadSpec, generate_program
+
+# safety net only: fuzzed programs terminate, shrunk ones may not
+DEFAULT_LIMITS = Limits(max_steps=2_000_000)
+SHRINK_LIMITS = Limits(max_steps=50_000)
+SLICE = 7
+
+DEMO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (printed text, "ErrorClass: message" or None)
+Outcome = Tuple[str, Optional[str]]
+# runs the prepared program, printing into the sink
+Runner = Callable[[OutputSink, Optional[Limits]], None]
+
+
+class Inconclusive(Exception):
+    """Some engine ran out of budget; the program proves nothing."""
+
+
+# -----------------------------
+# Engines: prepare(source, level) -> runner
+# -----------------------------
+def _front(source: str):
+    program = Parser(Lexer(source).scan_tokens()).parse()
+    SemanticAnalyzer().analyze(program)
+    return program
+
+
+def _lowered(source: str, level: int):
+    gen = TACGenerator()
+    tac = gen.generate(_front(source))
+    if level:
+        return optimize_list(tac, gen.lines, level)
+    return tac, gen.lines
+
+
+def prepare_ast(source: str, level: int) -> Runner:
+    program = _front(source)
+    return lambda sink, limits: VM(program, sink, limits).run()
+
+
+def prepare_tac(source: str, level: int) -> Runner:
+    tac, _lines = _lowered(source, level)
+    labels = tac_labels(tac)
+    return lambda sink, limits: VM(None, sink, limits).execute(tac, labels)
+
+
+def prepare_mcb(source: str, level: int) -> Runner:
+    code = loads_mcb(encode_mcb(*_lowered(source, level))).code
+    labels = code.labels()
+    return lambda sink, limits: VM(None, sink, limits).execute(code, labels)
+
+
+def prepare_stream(source: str, level: int) -> Runner:
+    parser = Parser(Lexer(source).scan_tokens())
+    located = TACGenerator().stream(SemanticAnalyzer().iter_checked(parser.iter_statements()))
+    if level:
+        located = optimize(located, level)
+    fd, path = tempfile.mkstemp(suffix='.mcb')
+    os.close(fd)
+    try:
+        write_mcb_stream(path, located)
+        with load_mcb(path) as prog:
+            code = list(prog.code)
+    finally:
+        os.unlink(path)
+    labels = tac_labels(code)
+    return lambda sink, limits: VM(None, sink, limits).execute(code, labels)
+
+
+def prepare_hashcons(source: str, level: int) -> Runner:
+    program = Parser(Lexer(source).scan_tokens(), hash_cons=True).parse()
+    SemanticAnalyzer(memoize=True).analyze(program)
+    gen = TACGenerator(memoize=True)
+    tac, lines = gen.generate(program), gen.lines
+    if level:
+        tac, _lines = optimize_list(tac, lines, level)
+    labels = tac_labels(tac)
+    return lambda sink, limits: VM(None, sink, limits).execute(tac, labels)
+
+
+def prepare_onepass(source: str, level: int) -> Runner:
+    parser = OnePassParser(Lexer(source).scan_tokens())
+    tac = parser.compile()
+    if level:
+        tac, _lines = optimize_list(tac, parser.lines, level)
+    labels = tac_labels(tac)
+    return lambda sink, limits: VM(None, sink, limits).execute(tac, labels)
+
+
+def prepare_resumable(source: str, level: int) -> Runner:
+    tac, _lines = _lowered(source, level)
+    labels = tac_labels(tac)
+
+    def runner(sink, limits):
+        run = VM(None, sink, limits).start(tac, labels)
+        while not run.resume(SLICE):
+            pass
+        sink.flush()
+    return runner
+
+
+def prepare_snapshot(source: str, level: int) -> Runner:
+    tac, lines = _lowered(source, level)
+    labels = tac_labels(tac)
+
+    def runner(sink, limits):
+        # every slice continues in a fresh run decoded from the last one
+        run = VM(None, ListSink(), limits).start(tac, labels)
+        try:
+            while not run.resume(SLICE):
+                run = loads_snapshot(encode_snapshot(run, lines)).resume(ListSink(), limits)
+        finally:
+            for v in run.output.pending():
+                sink.write(v)
+            sink.flush()
+    return runner
+
+
+ENGINES: Dict[str, Tuple[Callable[[str, int], Runner], Sequence[int]]] = {
+    'ast': (prepare_ast, (0,)),
+    'tac': (prepare_tac, range(MAX_LEVEL + 1)),
+    'mcb': (prepare_mcb, range(MAX_LEVEL + 1)),
+    'stream': (prepare_stream, range(MAX_LEVEL + 1)),
+    'hashcons': (prepare_hashcons, range(MAX_LEVEL + 1)),
+    'onepass': (prepare_onepass, range(MAX_LEVEL + 1)),
+    'resumable': (prepare_resumable, (0, MAX_LEVEL)),
+    'snapshot': (prepare_snapshot, (0, MAX_LEVEL)),
+}
+
+
+def variants(names: Optional[Sequence[str]] = None) -> List[Tuple[str, int]]:
+    """(engine, level) pairs; ``ast`` has no levels."""
+    out = []
+    for name in names or ENGINES:
+        if name not in ENGINES:
+            raise SystemExit(f"unknown engine {name!r}; choose from {', '.join(ENGINES)}")
+        out += [(name, level) for level in ENGINES[name][1]]
+    return out
+
+
+def label(engine: str, level: int) -> str:
+    return engine if engine == 'ast' else f"{engine}-O{level}"
+
+
+# -----------------------------
+# Comparing
+# -----------------------------
+def _describe(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+def outcome(source: str, engine: str, level: int,
+            limits: Optional[Limits] = DEFAULT_LIMITS) -> Outcome:
+    sink = ListSink()
+    try:
+        ENGINES[engine][0](source, level)(sink, limits)
+    except BudgetExceeded:
+        # the AST engine counts statements, TAC counts instructions
+        raise Inconclusive(label(engine, level)) from None
+    except Exception as e:
+        return sink.text(), _describe(e)
+    return sink.text(), None
+
+
+def run_all(source: str, pairs: Sequence[Tuple[str, int]],
+            limits: Optional[Limits] = DEFAULT_LIMITS) -> Dict[str, Outcome]:
+    return {label(e, lvl): outcome(source, e, lvl, limits) for e, lvl in pairs}
+
+
+def disagree(results: Dict[str, Outcome]) -> bool:
+    return len(set(results.values())) > 1
+
+
+def _differs(pairs, limits) -> Callable[[str], bool]:
+    def check(source: str) -> bool:
+        try:
+            return disagree(run_all(source, pairs, limits))
+        except Inconclusive:
+            return False
+    return check
+
+
+# -----------------------------
+# Shrinking
+# -----------------------------
+def ddmin(items: List[str], test: Callable[[List[str]], bool]) -> List[str]:
+    """Zeller's delta debugging: a 1-minimal sublist on which *test* holds."""
+    n = 2
+    while len(items) >= 2:
+        chunk = max(1, len(items) // n)
+        subsets = [items[i:i + chunk] for i in range(0, len(items), chunk)]
+        reduced = False
+        for i in range(len(subsets)):
+            complement = [x for j, s in enumerate(subsets) if j != i for x in s]
+            if test(complement):
+                items = complement
+                n = max(n - 1, 2)
+                reduced = True
+                break
+        if not reduced:
+            if n >= len(items):
+                break
+            n = min(n * 2, len(items))
+    return items
+
+
+def shrink(source: str, test: Callable[[str], bool]) -> str:
+    """Smallest program (lines first, then tokens) for which *test* holds."""
+    lines = ddmin(source.splitlines(), lambda ls: test('\n'.join(ls) + '\n'))
+    tokens = ddmin(TOKEN.findall('\n'.join(lines)), lambda ts: test(' '.join(ts)))
+    # ddmin cannot drop a bracket pair (either half alone does not parse)
+    i = 0
+    while i < len(tokens):
+        if tokens[i] == '(':
+            depth, j = 0, i
+            while j < len(tokens):
+                depth += {'(': 1, ')': -1}.get(tokens[j], 0)
+                if depth == 0:
+                    break
+                j += 1
+            candidate = tokens[:i] + tokens[i + 1:j] + tokens[j + 1:]
+            if j < len(tokens) and test(' '.join(candidate)):
+                tokens = candidate
+                continue
+        i += 1
+    return ' '.join(tokens)
+
+
+# -----------------------------
+# Corpus
+# -----------------------------
+def demo_sources() -> Dict[str, str]:
+    out = {}
+    for path in sorted(glob.glob(os.path.join(DEMO_DIR, 'demo*.mc'))):
+        with open(path) as f:
+            out[os.path.basename(path)] = f.read()
+    return out
+
+
+def check(sources: Dict[str, str], pairs, verbose: bool = False,
+          reduce: bool = True) -> Tuple[int, int, List[str]]:
+    """(agreed, inconclusive, report lines)."""
+    agreed = skipped = 0
+    report = []
+    for name, src in sources.items():
+        try:
+            results = run_all(src, pairs)
+        except Inconclusive as e:
+            skipped += 1
+            if verbose:
+                print(f"SKIP {name} (budget exceeded in {e})")
+            continue
+        if not disagree(results):
+            agreed += 1
+            if verbose:
+                print(f"OK   {name}")
+            continue
+        report.append(f"MISMATCH {name}")
+        for who, (text, err) in results.items():
+            report.append(f"  {who:<14} output={text!r} error={err!r}")
+        if reduce:
+            small = shrink(src, _differs(pairs, SHRINK_LIMITS))
+            report.append("  reduced program:")
+            report.append("    " + small)
+            for who, (text, err) in run_all(small, pairs, SHRINK_LIMITS).items():
+                report.append(f"    {who:<14} output={text!r} error={err!r}")
+        if verbose:
+            print(f"FAIL {name}")
+    return agreed, skipped, report
+
+
+# -----------------------------
+# Throughput
+# -----------------------------
+BENCH_WORKLOADS = {
+    'baseline': WorkloadSpec(),
+    'expr_depth': WorkloadSpec(expr_depth=7),
+    'trips': WorkloadSpec(size=20, trips=200),
+}
+
+
+UNTIMED = ('snapshot',)
+
+
+def time_engine(source: str, engine: str, level: int, repeat: int = 3) -> float:
+    """Best-of-*repeat* seconds for running (not compiling) *source*."""
+    runner = ENGINES[engine][0](source, level)
+    sink = NullSink()
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        runner(sink, None)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_sources(fuzz_sample: int = 50, seed: int = 0) -> Dict[str, str]:
+    out = {name: generate_program(spec) for name, spec in BENCH_WORKLOADS.items()}
+    for name, src in demo_sources().items():
+        try:
+            _front(src)
+        except Exception:
+            continue
+        out[name] = src
+    if fuzz_sample:
+        # one program per seed; timed together as a single row
+        out[f"fuzz x{fuzz_sample}"] = [random_program(seed + i) for i in range(fuzz_sample)]
+    return out
+
+
+def bench(sources: Dict[str, object], pairs, repeat: int = 3) -> None:
+    # re-encoding the whole program every few steps says nothing about speed
+    pairs = [(e, lvl) for e, lvl in pairs if e not in UNTIMED]
+    names = [label(e, lvl) for e, lvl in pairs]
+    ref = 'tac-O0' if 'tac-O0' in names else names[0]
+    head = f"{'program':<26}" + ''.join(f"{n:>13}" for n in names)
+    print(head)
+    print('-' * len(head))
+    totals = {n: 0.0 for n in names}
+    for prog, src in sources.items():
+        batch = src if isinstance(src, list) else [src]
+        row = {}
+        for (e, lvl), n in zip(pairs, names):
+            secs = 0.0
+            for s in batch:
+                try:
+                    secs += time_engine(s, e, lvl, repeat)
+                except Exception:
+                    # division by zero etc.: time up to the failure is lost
+                    pass
+            row[n] = secs
+            totals[n] += secs
+        print(f"{prog:<26}" + ''.join(f"{row[n] * 1000:>11.3f}ms" for n in names))
+    print('-' * len(head))
+    print(f"{'total':<26}" + ''.join(f"{totals[n] * 1000:>11.3f}ms" for n in names))
+    print(f"{'relative to ' + ref:<26}" + ''.join(
+        f"{totals[n] / totals[ref] if totals[ref] else 0:>12.2f}x" for n in names))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Differential testing of the MC execution engines")
+    ap.add_argument("--engines", help=f"comma separated subset of {','.join(ENGINES)}")
+    ap.add_argument("--fuzz", type=int, default=200, metavar="N", help="random programs (default %(default)s)")
+    ap.add_argument("--broken", type=int, default=100, metavar="N",
+                    help="random invalid programs (default %(default)s)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--no-demos", dest="demos", action="store_false")
+    ap.add_argument("--no-shrink", dest="shrink", action="store_false",
+                    help="report disagreements without reducing them")
+    ap.add_argument("--bench", action="store_true", help="also print the throughput table")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args()
+
+    pairs = variants(args.engines.split(',') if args.engines else None)
+    sources = demo_sources() if args.demos else {}
+    for i in range(args.fuzz):
+        sources[f"fuzz#{args.seed + i}"] = random_program(args.seed + i)
+    for i in range(args.broken):
+        sources[f"broken#{args.seed + i}"] = broken_program(args.seed + i)
+
+    t0 = time.perf_counter()
+    agreed, skipped, report = check(sources, pairs, args.verbose, args.shrink)
+    secs = time.perf_counter() - t0
+    mismatches = len(sources) - agreed - skipped
+    if report:
+        print('\n'.join(report))
+    print(f"{len(sources)} programs x {len(pairs)} engine variants in {secs:.1f} s: "
+          f"{agreed} agree, {mismatches} disagree, {skipped} inconclusive")
+
+    if args.bench:
+        print()
+        bench(bench_sources(seed=args.seed), pairs, args.repeat)
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,3 +18,26 @@ class SemanticError(Exception):
 class RuntimeErrorMC(Exception):
     """Error thrown by the virtual machine / runtime."""
     pass
+
+
+class MCBError(Exception):
+    """Error thrown while writing or loading a compiled .mcb file."""
+    pass
+
+
+class SnapshotError(Exception):
+    """Error thrown while writing or loading a VM snapshot (.mcs)."""
+    pass
+
+
+class BudgetExceeded(RuntimeErrorMC):
+    """A run hit one of its execution limits (see ``limits.Limits``).
+
+    ``limit`` is ``'steps'``, ``'time'`` or ``'memory'``.
+    """
+
+    def __init__(self, limit: str, allowed, used):
+        self.limit = limit
+        self.allowed = allowed
+        self.used = used
+        super().__init__(f"{limit} limit exceeded: used {used}, allowed {allowed}")
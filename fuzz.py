@@ -0,0 +1,293 @@
+# src/fuzz.py
+"""
+Grammar-based random MC programs for differential testing.
+
+Unlike ``workload.py`` (shape-controlled, for timing) these programs try
+to reach every corner of the language: int and float variables, shadowing
+in nested blocks, declarations without initialiser, unary operators,
+comparisons, float division, if/else chains, nested loops and small
+arrays (indexing, element and whole-array assignment, reductions).
+
+Programs are type-correct and terminate by construction: every loop runs
+on its own counter (``k1``, ``k2``, ...) that no random statement assigns,
+and loop nesting and trip counts are small. Division may still divide by
+zero at runtime, and an array index may be out of range, which is fine:
+all engines have to agree on that too.
+
+``broken_program`` makes invalid programs out of valid ones with a few
+token edits, so front end diagnostics get compared as well.
+
+    python -m package.fuzz --seed 3
+    python -m package.fuzz --seed 3 --broken
+"""
+
+import argparse
+import random
+import re
+from typing import Dict, List, Optional
+
+INT_OPS = ('+', '-', '*')
+CMP_OPS = ('<', '<=', '>', '>=', '==', '!=')
+# t1, t2: names that would clash with TAC temps if temps were not '$N'
+NAMES = ('a', 'b', 'c', 'd', 'x', 'y', 't1', 't2')
+TOKEN = re.compile(r"\d+\.\d+|\w+|[<>=!]=|\S")
+# spliced into broken programs; 'zz' is never declared
+JUNK = ('(', ')', '{', '}', '[', ']', ';', '=', '+', '<', '!',
+        'int', 'float', 'else', 'sum', '0', '1.5', 'zz')
+SWAP = {'int': 'float', 'float': 'int'}
+
+
+class ProgramFuzzer:
+    def __init__(self, seed: int = 0, max_stmts: int = 12, max_depth: int = 3,
+                 max_loop_nest: int = 2, max_trips: int = 4):
+        self.rnd = random.Random(seed)
+        self.max_stmts = max_stmts
+        self.max_depth = max_depth
+        self.max_loop_nest = max_loop_nest
+        self.max_trips = max_trips
+        # name -> type, innermost block last
+        self.scopes: List[Dict[str, str]] = []
+        self.lines: List[str] = []
+        self.loops = 0
+        self.loop_nest = 0
+
+    # -----------------------------
+    # Scope helpers
+    # -----------------------------
+    def _visible(self) -> Dict[str, str]:
+        out: Dict[str, str] = {}
+        for scope in self.scopes:
+            out.update(scope)
+        return out
+
+    def _pick(self, want: Optional[str] = None, assignable: bool = False) -> Optional[str]:
+        names = [n for n, t in self._visible().items()
+                 if (want is None or t == want) and not (assignable and n.startswith('k'))]
+        return self.rnd.choice(sorted(names)) if names else None
+
+    def _pick_array(self, elem: str) -> Optional[str]:
+        names = [n for n, t in self._visible().items() if t.startswith(elem + '[')]
+        return self.rnd.choice(sorted(names)) if names else None
+
+    def _size(self, name: str) -> int:
+        t = self._visible()[name]
+        return int(t[t.index('[') + 1:-1])
+
+    def index(self, name: str) -> str:
+        # now and then one past the end
+        return str(self.rnd.randint(0, self._size(name) - (self.rnd.random() > 0.05)))
+
+    def array_read(self, elem: str) -> Optional[str]:
+        name = self._pick_array(elem)
+        if name is None:
+            return None
+        if self.rnd.random() < 0.7:
+            return f"{name}[{self.index(name)}]"
+        return f"{self.rnd.choice(('sum', 'min', 'max'))}({name})"
+
+    # -----------------------------
+    # Expressions
+    # -----------------------------
+    def int_expr(self, depth: int) -> str:
+        r = self.rnd.random()
+        if depth <= 0 or r < 0.25:
+            if self.rnd.random() < 0.15:
+                read = self.array_read('int')
+                if read is not None:
+                    return read
+            name = self._pick('int')
+            if name is not None and self.rnd.random() < 0.7:
+                return name
+            return str(self.rnd.randint(0, 9))
+        if r < 0.35:
+            return f"-{self.int_expr(depth - 1)}"
+        if r < 0.42:
+            return f"!({self.any_expr(depth - 1)})"
+        if r < 0.6:
+            return f"({self.any_expr(depth - 1)} {self.rnd.choice(CMP_OPS)} {self.any_expr(depth - 1)})"
+        op = self.rnd.choice(INT_OPS)
+        if op == '*':
+            # small factors keep values from exploding inside loops
+            return f"({self.int_expr(depth - 1)} * {self.rnd.randint(0, 3)})"
+        return f"({self.int_expr(depth - 1)} {op} {self.int_expr(depth - 1)})"
+
+    def float_expr(self, depth: int) -> str:
+        r = self.rnd.random()
+        if depth <= 0 or r < 0.25:
+            if self.rnd.random() < 0.15:
+                read = self.array_read('float')
+                if read is not None:
+                    return read
+            name = self._pick('float')
+            if name is not None and self.rnd.random() < 0.7:
+                return name
+            return f"{self.rnd.randint(0, 9)}.{self.rnd.choice((0, 5, 25))}"
+        if r < 0.35:
+            return f"-{self.float_expr(depth - 1)}"
+        if r < 0.55:
+            # mostly non-zero divisors, so most runs get past the division
+            if self.rnd.random() < 0.8:
+                return f"({self.any_expr(depth - 1)} / {self.rnd.randint(1, 4)}.5)"
+            return f"({self.any_expr(depth - 1)} / {self.any_expr(depth - 1)})"
+        op = self.rnd.choice(('+', '-'))
+        return f"({self.float_expr(depth - 1)} {op} {self.any_expr(depth - 1)})"
+
+    def any_expr(self, depth: int) -> str:
+        if self.rnd.random() < 0.5:
+            return self.int_expr(depth)
+        return self.float_expr(depth)
+
+    # -----------------------------
+    # Statements
+    # -----------------------------
+    def emit(self, indent: int, text: str):
+        self.lines.append('    ' * indent + text)
+
+    def declare(self, indent: int):
+        scope = self.scopes[-1]
+        free = [n for n in NAMES if n not in scope]
+        if not free:
+            return self.assign(indent)
+        name = self.rnd.choice(free)
+        type_ = self.rnd.choice(('int', 'float'))
+        if self.rnd.random() < 0.15:
+            size = self.rnd.randint(1, 4)
+            self.emit(indent, f"{type_} {name}[{size}];")
+            scope[name] = f"{type_}[{size}]"
+            return
+        if self.rnd.random() < 0.2:
+            self.emit(indent, f"{type_} {name};")
+        else:
+            # initialiser may read an outer variable of the same name
+            init = self.int_expr(2) if type_ == 'int' else self.any_expr(2)
+            self.emit(indent, f"{type_} {name} = {init};")
+        scope[name] = type_
+
+    def assign(self, indent: int):
+        name = self._pick(assignable=True)
+        if name is None:
+            return self.declare(indent)
+        t = self._visible()[name]
+        if t.endswith(']'):
+            return self.assign_array(indent, name, t[:t.index('[')])
+        value = self.int_expr(3) if t == 'int' else self.any_expr(3)
+        self.emit(indent, f"{name} = {value};")
+
+    def assign_array(self, indent: int, name: str, elem: str):
+        value = self.int_expr(2) if elem == 'int' else self.any_expr(2)
+        r = self.rnd.random()
+        if r < 0.6:
+            self.emit(indent, f"{name}[{self.index(name)}] = {value};")
+            return
+        t = self._visible()[name]
+        same = [n for n, u in self._visible().items() if u == t]
+        other = self.rnd.choice(sorted(same))
+        if r < 0.75:
+            self.emit(indent, f"{name} = {value};")
+        elif elem == 'int':
+            self.emit(indent, f"{name} = {other} {self.rnd.choice(INT_OPS)} {self.rnd.randint(0, 3)};")
+        else:
+            op = self.rnd.choice(('+', '-', '*', '/'))
+            self.emit(indent, f"{name} = -{other} {op} {self.rnd.randint(1, 4)}.5;")
+
+    def block(self, indent: int, depth: int, extra: Optional[List[str]] = None):
+        self.scopes.append({})
+        for _ in range(self.rnd.randint(1, 4)):
+            self.stmt(indent, depth)
+        for line in extra or ():
+            self.emit(indent, line)
+        self.scopes.pop()
+
+    def stmt(self, indent: int, depth: int):
+        r = self.rnd.random()
+        if depth <= 0:
+            r *= 0.6
+        if r < 0.2:
+            self.declare(indent)
+        elif r < 0.4:
+            self.assign(indent)
+        elif r < 0.6:
+            arr = self._pick_array(self.rnd.choice(('int', 'float')))
+            if arr is not None and self.rnd.random() < 0.2:
+                self.emit(indent, f"print({arr});")
+            else:
+                self.emit(indent, f"print({self.any_expr(3)});")
+        elif r < 0.75:
+            self.emit(indent, f"if ({self.any_expr(2)}) {{")
+            self.block(indent + 1, depth - 1)
+            if self.rnd.random() < 0.5:
+                self.emit(indent, "} else {")
+                self.block(indent + 1, depth - 1)
+            self.emit(indent, "}")
+        elif r < 0.9 and self.loop_nest < self.max_loop_nest:
+            self.loops += 1
+            k = f"k{self.loops}"
+            self.emit(indent, f"int {k} = 0;")
+            self.scopes[-1][k] = 'int'
+            self.emit(indent, f"while ({k} < {self.rnd.randint(0, self.max_trips)}) {{")
+            self.loop_nest += 1
+            self.block(indent + 1, depth - 1, [f"{k} = {k} + 1;"])
+            self.loop_nest -= 1
+            self.emit(indent, "}")
+        else:
+            self.emit(indent, "{")
+            self.block(indent + 1, depth - 1)
+            self.emit(indent, "}")
+
+    def program(self) -> str:
+        self.scopes = [{}]
+        self.lines = []
+        self.emit(0, "start")
+        for _ in range(self.rnd.randint(1, 3)):
+            self.declare(1)
+        for _ in range(self.rnd.randint(1, self.max_stmts)):
+            self.stmt(1, self.max_depth)
+        self.emit(0, "end")
+        return '\n'.join(self.lines) + '\n'
+
+
+def random_program(seed: int, **kwargs) -> str:
+    return ProgramFuzzer(seed, **kwargs).program()
+
+
+def broken_program(seed: int, **kwargs) -> str:
+    """``random_program(seed)`` with one to three tokens dropped, inserted or
+    replaced, or a name or type changed: mostly a syntax or semantic error,
+    sometimes several, now and then still a valid program. Lines naming a loop counter are left alone,
+    so a mutant that still runs still terminates."""
+    rnd = random.Random(seed)
+    lines = [TOKEN.findall(line) for line in random_program(seed, **kwargs).splitlines()]
+    editable = [i for i, toks in enumerate(lines)
+                if not any(t[0] == 'k' and t[1:].isdigit() for t in toks)]
+    for _ in range(rnd.randint(1, 3)):
+        toks = lines[rnd.choice(editable)]
+        i = rnd.randrange(len(toks) + 1)
+        r = rnd.random()
+        if r < 0.2 and i < len(toks):
+            del toks[i]
+        elif r < 0.4 or i == len(toks):
+            toks.insert(i, rnd.choice(JUNK))
+        elif r < 0.6:
+            toks[i] = rnd.choice(JUNK + tuple(toks))
+        else:
+            # well-formed but ill-typed or undeclared: a semantic error
+            words = [j for j, t in enumerate(toks) if t in SWAP or t in NAMES]
+            if words:
+                j = rnd.choice(words)
+                toks[j] = SWAP.get(toks[j], 'zz')
+    return '\n'.join(' '.join(toks) for toks in lines) + '\n'
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate a random MC program")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--max-stmts", type=int, default=12)
+    ap.add_argument("--max-depth", type=int, default=3)
+    ap.add_argument("--broken", action="store_true", help="mutate it into an invalid program")
+    args = ap.parse_args()
+    make = broken_program if args.broken else random_program
+    print(make(args.seed, max_stmts=args.max_stmts, max_depth=args.max_depth), end="")
+
+
+if __name__ == "__main__":
+    main()
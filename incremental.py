@@ -0,0 +1,455 @@
+# src/incremental.py
+"""
+Incremental recompilation and ``--watch`` mode.
+
+The program is kept as a list of top-level statement *chunks*, each with its
+tokens, AST, declared names and TAC fragment. On a new version of the source:
+
+1. the changed character range is found (common prefix / suffix);
+2. only the chunks touching that range are re-lexed and re-parsed; the lexer
+   must resynchronise on the first token of the next untouched chunk;
+3. the new chunks are checked against the top-level names declared before
+   them, and later chunks are re-checked / re-lowered only if they mention a
+   top-level name whose declaration changed;
+4. everything else (tokens, AST, TAC) is reused.
+
+Whenever any of this fails (lex/parse/semantic error, damage in 'start' or
+'end', lexer does not resynchronise) the whole file goes through the normal
+pipeline, so diagnostics are exactly the multi-pass ones. Reused TAC keeps its
+temp/label names; new fragments continue the numbering, so an incremental TAC
+list can differ textually, never semantically, from a fresh one.
+"""
+
+import re
+import time
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from .lexer import Lexer
+from .parser import Parser
+from .semantic import SemanticAnalyzer, Scope, Symbol
+from .tac import TACGenerator
+from .tokens import Token, TokenType
+from .ast_nodes import *
+from .arrays import array_type, is_array_type
+from .errors import LexError, ParseError, SemanticError, RuntimeErrorMC
+
+# re-parse at most this many extra chunks before giving up and going full
+MAX_WIDEN = 4
+
+
+@dataclass(eq=False)
+class Chunk:
+    start: int                   # source offset of the first token
+    line: int                    # current position of the first token
+    col: int
+    tokens: List[Token]          # positions as lexed, see shifted_tokens()
+    line0: int = 0               # position of the first token when lexed
+    col0: int = 0
+    stmt: Optional[Stmt] = None  # None for the 'start' / 'end' pseudo chunks
+    declares: Dict[str, str] = field(default_factory=dict)
+    names: Set[str] = field(default_factory=set)
+    tac: List[Tuple] = field(default_factory=list)
+    tac_lines: List[int] = field(default_factory=list)  # as lexed, like tokens
+    index: int = 0
+
+    def shifted_tokens(self) -> List[Token]:
+        dl, dc = self.line - self.line0, self.col - self.col0
+        if not dl and not dc:
+            return self.tokens
+        return [Token(t.type, t.lexeme, t.literal, t.line + dl,
+                      t.col + dc if t.line == self.line0 else t.col)
+                for t in self.tokens]
+
+
+@dataclass
+class UpdateStats:
+    full: bool = False
+    relexed_chars: int = 0
+    reparsed: int = 0     # chunks re-lexed / re-parsed
+    rechecked: int = 0    # chunks re-checked and re-lowered
+    reused: int = 0
+    seconds: float = 0.0
+
+
+# -------------------------------------------------
+# AST helpers
+# -------------------------------------------------
+def _top_level_decls(st: Stmt, out: Dict[str, str]):
+    # blocks open a scope; bare if/while bodies declare in the current one
+    if isinstance(st, VarDecl):
+        out[st.name] = st.type_name
+    elif isinstance(st, ArrayDecl):
+        out[st.name] = array_type(st.type_name, st.size)
+    elif isinstance(st, If):
+        _top_level_decls(st.then_branch, out)
+        if st.else_branch:
+            _top_level_decls(st.else_branch, out)
+    elif isinstance(st, While):
+        _top_level_decls(st.body, out)
+
+
+def _names(node, out: Set[str]):
+    if isinstance(node, (Var, Index)):
+        out.add(node.name)
+    elif isinstance(node, (VarDecl, ArrayDecl, Assign, IndexAssign)):
+        out.add(node.name)
+    if isinstance(node, (Expr, Stmt)):
+        for v in vars(node).values():
+            if isinstance(v, list):
+                for item in v:
+                    _names(item, out)
+            elif isinstance(v, (Expr, Stmt)):
+                _names(v, out)
+
+
+def _line_starts(text: str) -> List[int]:
+    return [0] + [m.end() for m in re.finditer('\n', text)]
+
+
+def _common_prefix(a: str, b: str, limit: int) -> int:
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    lo, hi = 0, limit
+    la, lb = len(a), len(b)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[la - mid:] == b[lb - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class _Fallback(Exception):
+    """Incremental path not applicable; recompile the whole file."""
+
+
+class IncrementalCompiler:
+    def __init__(self):
+        self.source: Optional[str] = None
+        self.head: Optional[Chunk] = None   # 'start'
+        self.chunks: List[Chunk] = []
+        self.tail: Optional[Chunk] = None   # 'end' and anything after it
+        self.gen = TACGenerator()
+        self.sem = SemanticAnalyzer()
+        self.decl_owner: Dict[str, Chunk] = {}
+        self.users: Dict[str, Set[Chunk]] = {}
+
+    # -----------------------------
+    # Results
+    # -----------------------------
+    def program(self) -> Program:
+        return Program([c.stmt for c in self.chunks])
+
+    def tac(self) -> List[Tuple]:
+        code: List[Tuple] = []
+        for c in self.chunks:
+            code.extend(c.tac)
+        return code
+
+    def line_table(self) -> List[int]:
+        """Source line of every instruction in tac()."""
+        lines: List[int] = []
+        for c in self.chunks:
+            dl = c.line - c.line0
+            lines.extend([ln + dl if ln else 0 for ln in c.tac_lines] if dl else c.tac_lines)
+        return lines
+
+    def tokens(self) -> List[Token]:
+        toks: List[Token] = []
+        for c in [self.head] + self.chunks + [self.tail]:
+            toks.extend(c.shifted_tokens())
+        return toks
+
+    # -----------------------------
+    # Entry point
+    # -----------------------------
+    def update(self, source: str) -> UpdateStats:
+        """Bring the state up to date with *source*.
+
+        Raises LexError / ParseError / SemanticError exactly like the
+        multi-pass pipeline; after an error the next update is a full one.
+        """
+        t0 = time.perf_counter()
+        if self.source is not None and self.chunks:
+            try:
+                stats = self._incremental(source)
+            except _Fallback:
+                stats = None
+        else:
+            stats = None
+        if stats is None:
+            try:
+                stats = self._full(source)
+            except Exception:
+                self.source = None
+                raise
+        self.source = source
+        stats.seconds = time.perf_counter() - t0
+        return stats
+
+    # -----------------------------
+    # Full compile
+    # -----------------------------
+    def _full(self, source: str) -> UpdateStats:
+        tokens = Lexer(source).scan_tokens()
+        parser = Parser(tokens)
+        program = parser.parse()
+        self.sem.analyze(program)
+
+        starts = _line_starts(source)
+
+        def offset(tok):
+            return starts[tok.line - 1] + tok.col - 1
+
+        def make_chunk(toks, stmt=None):
+            first = toks[0] if toks else tokens[-1]
+            return Chunk(offset(first), first.line, first.col, toks,
+                         first.line, first.col, stmt)
+
+        spans = parser.spans
+        first_stmt = spans[0][0] if spans else parser.i - 1
+        self.head = make_chunk(tokens[:first_stmt])
+        end_i = spans[-1][1] if spans else first_stmt
+        # drop EOF, keep 'end' and whatever trails it
+        self.tail = make_chunk(tokens[end_i:-1])
+        self.gen = TACGenerator()
+        self.chunks = []
+        for st, (a, b) in zip(program.statements, spans):
+            c = make_chunk(tokens[a:b], st)
+            _top_level_decls(st, c.declares)
+            _names(st, c.names)
+            c.tac = self.gen.gen_stmt(st)
+            c.tac_lines = self.gen.lines
+            self.chunks.append(c)
+        self._reindex(0)
+        self.decl_owner = {}
+        self.users = {}
+        for c in self.chunks:
+            self._link(c)
+        return UpdateStats(full=True, relexed_chars=len(source),
+                           reparsed=len(self.chunks), rechecked=len(self.chunks))
+
+    # -----------------------------
+    # Incremental compile
+    # -----------------------------
+    def _incremental(self, new: str) -> UpdateStats:
+        old = self.source
+        if new == old:
+            return UpdateStats(reused=len(self.chunks))
+        limit = min(len(old), len(new))
+        p = _common_prefix(old, new, limit)
+        s = _common_suffix(old, new, limit - p)
+        q_old = len(old) - s
+        delta = len(new) - len(old)
+
+        i = self._chunk_at(p - 1)
+        j = self._chunk_at(max(p - 1, q_old - 1))
+        if i is None or j is None:
+            raise _Fallback()
+
+        for _ in range(MAX_WIDEN + 1):
+            result = self._reparse(new, i, j, delta)
+            if result is not None:
+                break
+            j += 1
+            if j >= len(self.chunks):
+                raise _Fallback()
+        else:
+            raise _Fallback()
+        new_chunks, lookahead, a, b_new = result
+
+        removed = self.chunks[i:j + 1]
+        follow = self.chunks[j + 1:] + [self.tail]
+        old_la = follow[0]
+
+        # declarations that changed shape decide what must be re-checked
+        old_decls: Dict[str, str] = {}
+        for c in removed:
+            old_decls.update(c.declares)
+        new_decls: Dict[str, str] = {}
+        for c in new_chunks:
+            _top_level_decls(c.stmt, c.declares)
+            _names(c.stmt, c.names)
+            new_decls.update(c.declares)
+        changed = {n for n in set(old_decls) | set(new_decls)
+                   if old_decls.get(n) != new_decls.get(n)}
+
+        for c in removed:
+            self._unlink(c)
+        self.chunks[i:j + 1] = new_chunks
+        self._reindex(i)
+        for c in new_chunks:
+            self._link(c)
+
+        # shift everything after the edit
+        dl = lookahead.line - old_la.line
+        dc = lookahead.col - old_la.col
+        la_line = old_la.line
+        for c in follow:
+            if c.line == la_line:
+                c.col += dc
+            c.line += dl
+            c.start += delta
+
+        recheck = set(new_chunks)
+        for n in changed:
+            for c in self.users.get(n, ()):
+                if c.index > i:
+                    recheck.add(c)
+        try:
+            for c in sorted(recheck, key=lambda c: c.index):
+                self._check_and_lower(c)
+        except SemanticError:
+            raise _Fallback()
+
+        return UpdateStats(relexed_chars=b_new - a, reparsed=len(new_chunks),
+                           rechecked=len(recheck),
+                           reused=len(self.chunks) - len(new_chunks))
+
+    def _reparse(self, new: str, i: int, j: int, delta: int):
+        """Re-lex/parse chunks i..j against *new*; None means widen."""
+        first = self.chunks[i]
+        nxt = self.chunks[j + 1] if j + 1 < len(self.chunks) else self.tail
+        if not nxt.tokens:
+            raise _Fallback()
+        la_old = nxt.shifted_tokens()[0]
+        a = first.start
+        b_new = nxt.start + delta
+        text = new[a:b_new + len(la_old.lexeme)]
+        try:
+            toks = Lexer(text).scan_tokens()[:-1]
+        except LexError:
+            raise _Fallback()
+
+        # local positions -> absolute ones
+        starts = _line_starts(text)
+        offs = []
+        for k, t in enumerate(toks):
+            offs.append(a + starts[t.line - 1] + t.col - 1)
+            if t.line == 1:
+                t.col += first.col - 1
+            t.line += first.line - 1
+        if not toks or offs[-1] != b_new or toks[-1].type is not la_old.type \
+                or toks[-1].lexeme != la_old.lexeme:
+            return None
+        lookahead = toks.pop()
+        offs.pop()
+
+        eof = Token(TokenType.EOF, '', None, lookahead.line, lookahead.col)
+        parser = Parser(toks + [eof])
+        try:
+            stmts = parser.parse_statements()
+        except ParseError:
+            return None
+        chunks = []
+        for st, (s, e) in zip(stmts, parser.spans):
+            t = toks[s]
+            chunks.append(Chunk(offs[s], t.line, t.col, toks[s:e], t.line, t.col, st))
+        return chunks, lookahead, a, b_new
+
+    def _check_and_lower(self, c: Chunk):
+        # only the top-level names this chunk mentions matter to it
+        scope = Scope()
+        env: Dict[str, str] = {}
+        for n in c.names:
+            owner = self.decl_owner.get(n)
+            if owner is not None and owner.index < c.index:
+                scope.table[n] = Symbol(n, owner.declares[n])
+                env[n] = n
+        self.sem.check_statements([c.stmt], scope)
+        self.gen.scopes = [env]
+        self.gen.arrays = {n for n in env if is_array_type(scope.table[n].type_name)}
+        c.tac = self.gen.gen_stmt(c.stmt)
+        # AST lines are the ones seen when the chunk was lexed
+        c.tac_lines = self.gen.lines
+
+    # -----------------------------
+    # Book-keeping
+    # -----------------------------
+    def _chunk_at(self, pos: int) -> Optional[int]:
+        """Index of the chunk whose span holds *pos*; None for head/tail."""
+        if pos < 0 or not self.chunks or pos < self.chunks[0].start \
+                or pos >= self.tail.start:
+            return None
+        lo, hi = 0, len(self.chunks) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.chunks[mid].start <= pos:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    def _reindex(self, start: int):
+        for k in range(start, len(self.chunks)):
+            self.chunks[k].index = k
+
+    def _link(self, c: Chunk):
+        for n in c.declares:
+            if n in self.decl_owner:
+                # duplicate top-level declaration; let the full pass report it
+                raise _Fallback()
+            self.decl_owner[n] = c
+        for n in c.names:
+            self.users.setdefault(n, set()).add(c)
+
+    def _unlink(self, c: Chunk):
+        for n in c.declares:
+            if self.decl_owner.get(n) is c:
+                del self.decl_owner[n]
+        for n in c.names:
+            users = self.users.get(n)
+            if users is not None:
+                users.discard(c)
+
+
+# -------------------------------------------------
+# --watch
+# -------------------------------------------------
+def watch(path: str, run_program: bool = False, interval: float = 0.2):
+    """Recompile *path* whenever it changes, until Ctrl-C."""
+    from .report import BOLD, CYAN, GREEN, RED, RESET
+    from .vm import VM
+
+    inc = IncrementalCompiler()
+    last_mtime = None
+    print(f"{BOLD}{CYAN}--- WATCHING {path} (Ctrl-C to stop) ---{RESET}")
+    try:
+        while True:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime is not None and mtime != last_mtime:
+                last_mtime = mtime
+                with open(path, 'r') as f:
+                    source = f.read()
+                try:
+                    st = inc.update(source)
+                except (LexError, ParseError, SemanticError) as e:
+                    print(f"{RED}{type(e).__name__}{RESET}: {e}")
+                else:
+                    mode = 'full' if st.full else 'incremental'
+                    print(f"{GREEN}OK{RESET} {mode} in {st.seconds * 1000:.2f} ms: "
+                          f"{st.reparsed} re-parsed, {st.rechecked} re-checked, "
+                          f"{st.reused} reused, {len(inc.chunks)} statements")
+                    if run_program:
+                        try:
+                            VM(inc.program()).execute(inc.tac())
+                        except RuntimeErrorMC as e:
+                            print(f"{RED}RuntimeErrorMC{RESET}: {e}")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print()
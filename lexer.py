@@ -42,9 +42,10 @@ class Lexer:
                 if self._match('/*'):
                     # block comment
                     while not self._eof() and not self._match('*/'):
-                        ch = self._advance()
-                        if ch == '\n':
-                            self._advance_line(bump=False)
+                        if self._peek() == '\n':
+                            self._advance_line()
+                        else:
+                            self._advance()
                     continue
 
             # two-char operators
@@ -62,11 +63,12 @@ class Lexer:
                 '+': TokenType.PLUS, '-': TokenType.MINUS, '*': TokenType.STAR, '/': TokenType.SLASH,
                 '!': TokenType.BANG, '=': TokenType.EQUAL, '<': TokenType.LT, '>': TokenType.GT,
                 '(': TokenType.LPAREN, ')': TokenType.RPAREN, '{': TokenType.LBRACE, '}': TokenType.RBRACE,
-                ';': TokenType.SEMI, ',': TokenType.COMMA
+                ';': TokenType.SEMI, ',': TokenType.COMMA,
+                '[': TokenType.LBRACKET, ']': TokenType.RBRACKET
             }
             if c in single:
-                self._add(single[c], c)
                 self._advance()
+                self._add(single[c], c)
                 continue
 
             # number
@@ -108,7 +110,8 @@ class Lexer:
 
     # helpers
     def _add(self, ttype, lexeme):
-        self.tokens.append(Token(ttype, lexeme, None, self.line, self.col))
+        # called right after the lexeme was consumed
+        self.tokens.append(Token(ttype, lexeme, None, self.line, self.col - len(lexeme)))
 
     def _peek(self):
         return self.text[self.i]
@@ -127,7 +130,10 @@ class Lexer:
             self.col = 1
 
     def _match(self, s):
+        # consume s if the input continues with it
         if self.text[self.i:self.i+len(s)] == s:
+            self.i += len(s)
+            self.col += len(s)
             return True
         return False
 
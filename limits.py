@@ -0,0 +1,131 @@
+# src/limits.py
+"""
+Execution budgets for untrusted programs.
+
+``VM(program, limits=Limits(max_steps=..., max_seconds=..., max_memory=...))``
+stops a run with ``errors.BudgetExceeded`` once it goes over any of them.
+A step is one TAC instruction in ``VM.execute`` and one statement in
+``VM.run``; a whole-array operation counts one step per element.
+
+Checks only happen on loop back-edges (a ``goto``/``if_goto`` jumping
+backwards, or the next ``while`` iteration), since straight-line code can
+never run longer than the program is. The step limit is checked on every
+back-edge and may be overshot by at most one loop iteration. So is the
+clock, when there is a deadline: one iteration can cost far more than its
+step count says (``x = x * x`` on a huge int), and reading the clock is
+cheaper than one interpreted instruction. Measuring memory walks every live
+value, so it backs off to once every ``check_every`` steps while usage
+stays flat, but goes back to checking every few steps as soon as it grows:
+``x = x * x`` doubles its size each iteration and would be far past any
+limit by the next regular check.
+
+The clock only runs between ``start()`` and ``stop()``: a run executed in
+slices (``TACExecution.resume``, see ``scheduler.py``) is charged for the
+time spent inside its slices, not for the time it waits in a queue.
+"""
+
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+
+from .errors import BudgetExceeded
+
+# steps between memory checks while usage keeps growing
+MIN_MEMORY_INTERVAL = 8
+SIZE_SUFFIXES = {'k': 1 << 10, 'm': 1 << 20, 'g': 1 << 30}
+
+
+@dataclass
+class Limits:
+    max_steps: Optional[int] = None
+    max_seconds: Optional[float] = None
+    # bytes held by variable values and scope frames (estimate)
+    max_memory: Optional[int] = None
+    check_every: int = 1024
+
+    def any(self) -> bool:
+        return (self.max_steps is not None or self.max_seconds is not None
+                or self.max_memory is not None)
+
+
+class Budget:
+    """Meter for one run; ``check`` is called with the steps done so far."""
+
+    def __init__(self, limits: Limits, memory: Callable[[], int]):
+        self.limits = limits
+        self.memory = memory
+        self.max_steps = limits.max_steps
+        self.deadline = None
+        # seconds charged by earlier slices; started is None while stopped
+        self.spent = 0.0
+        self.started = None
+        self.start()
+        self._every = MIN_MEMORY_INTERVAL if limits.max_memory is not None else limits.check_every
+        self._next_slow = self._every
+        self._last_used = 0
+
+    def start(self) -> None:
+        """Start (or restart) the clock; it starts running when created."""
+        if self.started is not None:
+            return
+        self.started = time.perf_counter()
+        if self.limits.max_seconds is not None:
+            self.deadline = self.started + self.limits.max_seconds - self.spent
+
+    def stop(self) -> None:
+        if self.started is not None:
+            self.spent += time.perf_counter() - self.started
+            self.started = None
+
+    def reserve(self, nbytes: int) -> None:
+        """Check one large allocation before it is made: back-edge checks
+        would only see it once it exists (``int a[99999999];``)."""
+        if self.limits.max_memory is not None and nbytes > self.limits.max_memory:
+            raise BudgetExceeded('memory', self.limits.max_memory, nbytes)
+
+    def check(self, steps: int) -> None:
+        if self.max_steps is not None and steps > self.max_steps:
+            raise BudgetExceeded('steps', self.max_steps, steps)
+        if self.deadline is not None:
+            now = time.perf_counter()
+            if now > self.deadline:
+                raise BudgetExceeded('time', f"{self.limits.max_seconds}s",
+                                     f"{self.spent + now - self.started:.3f}s")
+        if steps < self._next_slow:
+            return
+        if self.limits.max_memory is not None:
+            used = self.memory()
+            if used > self.limits.max_memory:
+                raise BudgetExceeded('memory', self.limits.max_memory, used)
+            if used > self._last_used + self._last_used // 8:
+                self._every = MIN_MEMORY_INTERVAL
+            else:
+                self._every = min(self._every * 2, self.limits.check_every)
+            self._last_used = used
+        self._next_slow = steps + self._every
+
+
+def frame_bytes(frames: Iterable[Dict], wrapped: bool = False) -> int:
+    """Rough size of scope dicts plus their values.
+
+    ``wrapped`` frames hold ``(type, value)`` pairs (the AST engine).
+    """
+    size = 0
+    for frame in frames:
+        size += sys.getsizeof(frame)
+        for v in frame.values():
+            if wrapped:
+                size += sys.getsizeof(v)
+                v = v[1]
+            size += sys.getsizeof(v)
+    return size
+
+
+def parse_size(text: str) -> int:
+    """'65536', '64k', '512M', '1g' -> bytes."""
+    text = text.strip().lower().rstrip('b')
+    mult = SIZE_SUFFIXES.get(text[-1:], 1)
+    if mult != 1:
+        text = text[:-1]
+    return int(float(text) * mult)
@@ -1,31 +1,26 @@
 import argparse
+import sys
 from .lexer import Lexer
-from .parser import Parser
-from .semantic import SemanticAnalyzer
-from .tac import TACGenerator
-from .vm import VM
-from .errors import LexError, ParseError, SemanticError, RuntimeErrorMC
+from .peephole import MAX_LEVEL, optimize, optimize_list
+from .errors import (LexError, ParseError, SemanticError, RuntimeErrorMC, MCBError,
+                     SnapshotError)
 from .tokens import TokenType
+from .report import (BOLD, CYAN, GREEN, RED, RESET, YELLOW, color_ok_fail,
+                     print_overall_summary, NdjsonWriter)
+from .profiling import phase, PhaseProfiler, count_nodes
+from .limits import Limits, parse_size
 
-# ====== Simple ANSI Colors ======
-RESET = "\033[0m"
-BOLD = "\033[1m"
-GREEN = "\033[92m"
-RED = "\033[91m"
-CYAN = "\033[96m"
-YELLOW = "\033[93m"
+# parser, checker, TAC, VM, .mcb and vmprof are imported where a phase first
+# needs them, so e.g. --lex starts without loading any of them
 
 
-def color_ok_fail(count: int) -> str:
-    """0 ho to green, warna red."""
-    if count == 0:
-        return f"{GREEN}{count}{RESET}"
-    return f"{RED}{count}{RESET}"
+def _silent(*_args, **_kwargs):
+    pass
 
 
 def main():
     ap = argparse.ArgumentParser(description="Mini compiler for simple language")
-    ap.add_argument("file", help="source file (.mc)")
+    ap.add_argument("file", nargs="+", help="source file (.mc); with --batch: files, directories or globs")
     ap.add_argument("--lex", action="store_true", help="show only lexer tokens")
     ap.add_argument(
         "--tac-only",
@@ -38,16 +33,128 @@ def main():
         action="store_true",
         help="run program after TAC (default: show all phases + run)",
     )
+    ap.add_argument(
+        "--emit-mcb",
+        dest="emit_mcb",
+        metavar="OUT",
+        help="also write the compiled program to a binary .mcb file",
+    )
+    ap.add_argument(
+        "--load-mcb",
+        dest="load_mcb",
+        action="store_true",
+        help="FILE is a compiled .mcb program: run it without lexing/parsing "
+             "(implied by the .mcb extension)",
+    )
+    ap.add_argument(
+        "--batch",
+        action="store_true",
+        help="compile (and run) every matching .mc file over a process pool",
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="worker processes for --batch (default: all cores)",
+    )
+    ap.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep recompiling FILE incrementally whenever it changes",
+    )
+    ap.add_argument(
+        "--profile",
+        metavar="JSON",
+        help="write per-phase time/allocation/object-count report to JSON",
+    )
+    ap.add_argument(
+        "--cprofile",
+        metavar="OUT",
+        help="with --profile: dump cProfile stats of the slowest phase to OUT",
+    )
+    ap.add_argument(
+        "--profile-vm",
+        dest="profile_vm",
+        type=int,
+        nargs="?",
+        const=10,
+        metavar="TOP",
+        help="count/time executed instructions per source line and loop; "
+             "print the TOP hottest (default 10)",
+    )
+    ap.add_argument(
+        "--quiet", "-q",
+        action="store_true",
+        help="print only program output and errors (errors go to stderr)",
+    )
+    ap.add_argument(
+        "--emit",
+        choices=["text", "ndjson"],
+        default="text",
+        help="ndjson: stream tokens, TAC, diagnostics, output and summary "
+             "as newline-delimited JSON",
+    )
+    ap.add_argument("--max-steps", type=int, metavar="N",
+                    help="stop the program after N executed TAC instructions")
+    ap.add_argument("--timeout", type=float, metavar="SECONDS",
+                    help="stop the program after this much wall-clock time")
+    ap.add_argument("--max-memory", type=parse_size, metavar="BYTES",
+                    help="stop the program when its variables use more (e.g. 64M)")
+    ap.add_argument("-O", "--opt-level", type=int, default=0, choices=range(MAX_LEVEL + 1),
+                    help="peephole optimisation level for the TAC (default 0: as generated)")
+    ap.add_argument("--stream", action="store_true",
+                    help="parse, check and lower one top-level statement at a time, "
+                         "printing TAC / writing --emit-mcb as it is produced; the "
+                         "program is then run from that .mcb")
+    ap.add_argument("--one-pass", dest="one_pass", action="store_true",
+                    help="parse, type-check and emit TAC in a single traversal "
+                         "without building an AST (same TAC and diagnostics)")
+    ap.add_argument("--hash-cons", action="store_true",
+                    help="share identical subexpressions in the AST (a DAG) and "
+                         "memoise types/temps per shared node")
+    ap.add_argument("--checkpoint", metavar="PATH",
+                    help="save VM state to PATH (.mcs) at loop back-edges: on SIGUSR1 "
+                         "and/or periodically; run PATH later to resume")
+    ap.add_argument("--checkpoint-every", type=int, metavar="N",
+                    help="with --checkpoint: save every N executed instructions")
+    ap.add_argument("--checkpoint-interval", type=float, metavar="SECONDS",
+                    help="with --checkpoint: save every SECONDS of run time")
     args = ap.parse_args()
+    limits = Limits(args.max_steps, args.timeout, args.max_memory)
+    if args.stream and not args.emit_mcb and (args.run or not (args.lex or args.tac_only)):
+        ap.error("--stream runs the program from its .mcb: add --emit-mcb OUT (or --tac-only)")
+    if args.checkpoint and args.profile_vm is not None:
+        ap.error("--checkpoint cannot be combined with --profile-vm")
+    if args.one_pass and (args.stream or args.hash_cons):
+        ap.error("--one-pass builds no AST: it cannot be combined with --stream or --hash-cons")
+
 
     # flags ka logic
     lex_only = args.lex and not args.tac_only and not args.run
     tac_only = args.tac_only and not args.run
     run_program = args.run or (not args.lex and not args.tac_only)
 
-    # source file read
-    with open(args.file, "r") as f:
-        source = f.read()
+    if args.batch:
+        from .batch import expand_inputs, run_batch, print_batch_report
+        paths = expand_inputs(args.file)
+        print_batch_report(run_batch(paths, args.jobs, run_program))
+        return
+    if len(args.file) > 1:
+        ap.error("multiple inputs need --batch")
+    args.file = args.file[0]
+    from_mcb = args.load_mcb or args.file.endswith(".mcb")
+    from_snapshot = args.file.endswith(".mcs")
+
+    if args.watch:
+        from .incremental import watch
+        watch(args.file, run_program=args.run)
+        return
+
+    # ====== Output mode ======
+    ndjson = NdjsonWriter() if args.emit == "ndjson" else None
+    quiet = args.quiet or ndjson is not None
+    # phase banners / listings sirf normal text mode mein
+    say = _silent if quiet else print
 
     # ====== Counters / Stats ======
     lex_errors = 0
@@ -60,78 +167,234 @@ def main():
     tac_instr_count = 0
     vm_executed = False
 
+    exec_profile = None
+    source = None
+    profiler = None
+    if args.profile:
+        profiler = PhaseProfiler(cprofile=bool(args.cprofile))
+        profiler.start()
+
+    def report_error(phase_key, title, total_label, count, e):
+        if ndjson is not None:
+            ndjson.record("diagnostic", phase=phase_key, message=str(e))
+        elif quiet:
+            print(f"{title}: {e}", file=sys.stderr)
+        else:
+            print(f"\n{BOLD}{RED}--- {title} ---{RESET}")
+            print(e)
+            if total_label:
+                print(f"{total_label}: {count}")
+
+    def run_tac(run, lines):
+        # --checkpoint: back-edges par pause karke state save karo
+        try:
+            if args.checkpoint:
+                from .snapshot import run_with_checkpoints
+                run_with_checkpoints(run, args.checkpoint, args.checkpoint_every,
+                                     args.checkpoint_interval, lines=lines)
+            else:
+                run.resume()
+        finally:
+            run.output.flush()
+
+    def run_mcb(path):
+        nonlocal exec_profile, tac_instr_count, vm_executed
+        from .mcb import load_mcb
+        from .vm import VM
+        with load_mcb(path) as prog:
+            tac_instr_count = len(prog.code)
+            say(f"{BOLD}{CYAN}--- PROGRAM OUTPUT (VM) ---{RESET}")
+            if args.profile_vm is not None:
+                from .vmprof import ExecProfile
+                exec_profile = ExecProfile(prog.lines)
+            vm = VM(None, ndjson.output_sink() if ndjson else None, limits)
+            with phase("vm"):
+                if args.checkpoint:
+                    run_tac(vm.start(prog.code, prog.code.labels()), prog.lines)
+                else:
+                    vm.execute(prog.code, prog.code.labels(), exec_profile)
+            vm_executed = True
+
+    def listed(located):
+        # streamed TAC ko aate hi dikhao
+        for i, (ins, line) in enumerate(located):
+            if ndjson is not None:
+                op, a1, a2, res = ins
+                ndjson.record("tac", index=i, op=op, arg1=a1, arg2=a2, result=res, line=line)
+            elif not quiet:
+                sys.stdout.write(f"{ins}\n")
+            yield ins, line
+
     try:
+        # -----------------------------------------------------------
+        # 0) SNAPSHOT (.mcs) -> ruke hue run ko wahin se aage chalao
+        # -----------------------------------------------------------
+        if from_snapshot:
+            from .snapshot import load_snapshot
+            snap = load_snapshot(args.file)
+            tac_instr_count = len(snap.code)
+            say(f"{BOLD}{CYAN}--- PROGRAM OUTPUT (VM, resumed at step {snap.steps}) ---{RESET}")
+            run = snap.resume(ndjson.output_sink() if ndjson else None, limits)
+            with phase("vm"):
+                run_tac(run, snap.lines)
+            vm_executed = True
+            return
+
+        # -----------------------------------------------------------
+        # 0) PRECOMPILED .mcb -> seedha VM, front end skip
+        # -----------------------------------------------------------
+        if from_mcb:
+            run_mcb(args.file)
+            return
+
+        # source file read
+        with open(args.file, "r") as f:
+            source = f.read()
+
         # -----------------------------------------------------------
         # 1) LEXER
         # -----------------------------------------------------------
-        print(f"{BOLD}{CYAN}--- LEXER (Lexemes / Tokens) ---{RESET}")
+        say(f"{BOLD}{CYAN}--- LEXER (Lexemes / Tokens) ---{RESET}")
         lex = Lexer(source)
-        tokens = lex.scan_tokens()
+        with phase("lexer"):
+            tokens = lex.scan_tokens()
 
-        for t in tokens:
-            print(f"{t.lexeme!r}\t=> {t.type.name}")
-        print()
+        if ndjson is not None:
+            for t in tokens:
+                ndjson.record("token", token=t.type.name, lexeme=t.lexeme,
+                              line=t.line, col=t.col)
+        elif not quiet:
+            # ek hi write, har token ke liye alag print nahi
+            print("\n".join(f"{t.lexeme!r}\t=> {t.type.name}" for t in tokens))
+            print()
 
         user_tokens = [t for t in tokens if t.type is not TokenType.EOF]
         unique_lexemes = {t.lexeme for t in user_tokens}
         total_tokens = len(user_tokens)
         unique_lexemes_count = len(unique_lexemes)
 
-        print(f"{BOLD}=== LEXER SUMMARY ==={RESET}")
-        print(f"TOTAL TOKENS      : {total_tokens}")
-        print(f"UNIQUE LEXEMES    : {unique_lexemes_count}")
-        print(f"LEXICAL ERRORS    : {color_ok_fail(lex_errors)}")
-        print()
+        say(f"{BOLD}=== LEXER SUMMARY ==={RESET}")
+        say(f"TOTAL TOKENS      : {total_tokens}")
+        say(f"UNIQUE LEXEMES    : {unique_lexemes_count}")
+        say(f"LEXICAL ERRORS    : {color_ok_fail(lex_errors)}")
+        say()
 
         # sirf lexer dekhna hai to yahin tak phases, lekin summary finally mein phir bhi print hogi
         if lex_only:
             return
 
         # -----------------------------------------------------------
-        # 2) PARSER
-        # -----------------------------------------------------------
-        print(f"{BOLD}{CYAN}--- PARSER (Syntax) ---{RESET}")
-        parser = Parser(tokens)
-        program = parser.parse()
-        print(f"{GREEN}OK: no syntax/parse error{RESET}")
-        print(f"SYNTAX ERRORS     : {color_ok_fail(parse_errors)}")
-        print()
-
+        # STREAM: parse -> check -> TAC ek top-level statement at a time
         # -----------------------------------------------------------
-        # 3) SEMANTIC ANALYSIS
-        # -----------------------------------------------------------
-        print(f"{BOLD}{CYAN}--- SEMANTIC ANALYSIS ---{RESET}")
-        sem = SemanticAnalyzer()
-        sem.analyze(program)
-        print(f"{GREEN}OK: no semantic error{RESET}")
-        print(f"SEMANTIC ERRORS   : {color_ok_fail(semantic_errors)}")
-        print()
+        if args.stream:
+            say(f"{BOLD}{CYAN}--- THREE ADDRESS CODE (ICG, streamed) ---{RESET}")
+            from .parser import Parser
+            from .semantic import SemanticAnalyzer
+            from .tac import TACGenerator
+            from .mcb import write_mcb_stream
+            parser = Parser(tokens, hash_cons=args.hash_cons)
+            sem = SemanticAnalyzer(memoize=args.hash_cons)
+            tac_gen = TACGenerator(memoize=args.hash_cons)
+            located = tac_gen.stream(sem.iter_checked(parser.iter_statements()))
+            if args.opt_level:
+                located = optimize(located, args.opt_level)
+            with phase("stream"):
+                if args.emit_mcb:
+                    tac_instr_count, size = write_mcb_stream(args.emit_mcb, listed(located))
+                else:
+                    tac_instr_count = sum(1 for _ in listed(located))
+            say()
+            if args.emit_mcb:
+                say(f"WROTE {args.emit_mcb} ({tac_instr_count} instructions, {size} bytes)")
+                say()
+                if run_program:
+                    run_mcb(args.emit_mcb)
+            return
 
         # -----------------------------------------------------------
-        # 4) TAC (Three Address Code)
+        # 2-4) ONE PASS: parse + check + TAC, AST ke baghair
         # -----------------------------------------------------------
-        print(f"{BOLD}{CYAN}--- THREE ADDRESS CODE (ICG) ---{RESET}")
-        tac_gen = TACGenerator()
-        tac = tac_gen.generate(program)
-
-        if tac:
-            # convert to a list to ensure it's iterable/re-iterable and to avoid "not iterable" issues
-            try:
-                tac_list = list(tac)
-                for line in tac_list:
-                    print(line)
-                tac_instr_count = len(tac_list)
-                tac = tac_list
-            except TypeError:
-                # tac is not iterable -> treat as no TAC produced
-                print(f"{YELLOW}[warning]{RESET} No TAC produced (TAC result not iterable)")
-                tac = []
-                tac_instr_count = 0
+        if args.one_pass:
+            say(f"{BOLD}{CYAN}--- PARSER + SEMANTIC ANALYSIS (one pass) ---{RESET}")
+            from .onepass import OnePassParser
+            parser = OnePassParser(tokens)
+            with phase("onepass"):
+                tac = parser.compile()
+            tac_lines = parser.lines
+            program = None
+            say(f"{GREEN}OK: no syntax/parse error{RESET}")
+            say(f"SYNTAX ERRORS     : {color_ok_fail(parse_errors)}")
+            say(f"{GREEN}OK: no semantic error{RESET}")
+            say(f"SEMANTIC ERRORS   : {color_ok_fail(semantic_errors)}")
+            say()
+            say(f"{BOLD}{CYAN}--- THREE ADDRESS CODE (ICG, one pass) ---{RESET}")
+            if args.opt_level:
+                with phase("peephole"):
+                    tac, tac_lines = optimize_list(tac, tac_lines, args.opt_level)
+            if profiler:
+                profiler.count("temps", parser.gen.temp_id)
+                profiler.count("labels", parser.gen.label_id)
         else:
-            print(f"{YELLOW}[warning]{RESET} No TAC produced")
-            tac = []
-            tac_instr_count = 0
-        print()
+            # -----------------------------------------------------------
+            # 2) PARSER
+            # -----------------------------------------------------------
+            say(f"{BOLD}{CYAN}--- PARSER (Syntax) ---{RESET}")
+            from .parser import Parser
+            parser = Parser(tokens, hash_cons=args.hash_cons)
+            with phase("parser"):
+                program = parser.parse()
+            say(f"{GREEN}OK: no syntax/parse error{RESET}")
+            say(f"SYNTAX ERRORS     : {color_ok_fail(parse_errors)}")
+            if args.hash_cons:
+                say(f"SHARED EXPR NODES : {parser.shared} reused, {len(parser.interned)} unique")
+            say()
+
+            # -----------------------------------------------------------
+            # 3) SEMANTIC ANALYSIS
+            # -----------------------------------------------------------
+            say(f"{BOLD}{CYAN}--- SEMANTIC ANALYSIS ---{RESET}")
+            from .semantic import SemanticAnalyzer
+            sem = SemanticAnalyzer(memoize=args.hash_cons)
+            with phase("semantic"):
+                sem.analyze(program)
+            say(f"{GREEN}OK: no semantic error{RESET}")
+            say(f"SEMANTIC ERRORS   : {color_ok_fail(semantic_errors)}")
+            say()
+
+            # -----------------------------------------------------------
+            # 4) TAC (Three Address Code)
+            # -----------------------------------------------------------
+            say(f"{BOLD}{CYAN}--- THREE ADDRESS CODE (ICG) ---{RESET}")
+            from .tac import TACGenerator
+            tac_gen = TACGenerator(memoize=args.hash_cons)
+            with phase("tac"):
+                tac = tac_gen.generate(program)
+            tac_lines = tac_gen.lines
+            if args.opt_level:
+                with phase("peephole"):
+                    tac, tac_lines = optimize_list(tac, tac_lines, args.opt_level)
+            if profiler:
+                profiler.count("ast_nodes", count_nodes(program))
+                profiler.count("temps", tac_gen.temp_id)
+                profiler.count("labels", tac_gen.label_id)
+
+        tac_instr_count = len(tac)
+        if ndjson is not None:
+            for i, (op, a1, a2, res) in enumerate(tac):
+                ndjson.record("tac", index=i, op=op, arg1=a1, arg2=a2,
+                              result=res, line=tac_lines[i])
+        elif not quiet:
+            if tac:
+                print("\n".join(str(line) for line in tac))
+            else:
+                print(f"{YELLOW}[warning]{RESET} No TAC produced")
+            print()
+
+        if args.emit_mcb:
+            from .mcb import write_mcb
+            size = write_mcb(args.emit_mcb, tac, tac_lines)
+            say(f"WROTE {args.emit_mcb} ({tac_instr_count} instructions, {size} bytes)")
+            say()
 
         # sirf TAC tak dekhna ho (without run)
         if tac_only and not run_program:
@@ -141,9 +404,18 @@ def main():
         # 5) VM (Runtime)
         # -----------------------------------------------------------
         if run_program:
-            print(f"{BOLD}{CYAN}--- PROGRAM OUTPUT (VM) ---{RESET}")
-            vm = VM(program)
-            vm.execute(tac)
+            say(f"{BOLD}{CYAN}--- PROGRAM OUTPUT (VM) ---{RESET}")
+            from .vm import VM
+            # ndjson mode: program output becomes 'output' records
+            vm = VM(program, ndjson.output_sink() if ndjson else None, limits)
+            if args.profile_vm is not None:
+                from .vmprof import ExecProfile
+                exec_profile = ExecProfile(tac_lines)
+            with phase("vm"):
+                if args.checkpoint:
+                    run_tac(vm.start(tac), tac_lines)
+                else:
+                    vm.execute(tac, profile=exec_profile)
             vm_executed = True
 
     # ===============================================================
@@ -151,46 +423,73 @@ def main():
     # ===============================================================
     except LexError as e:
         lex_errors += 1
-        print(f"\n{BOLD}{RED}--- LEXER ERROR ---{RESET}")
-        print(e)
-        print(f"TOTAL LEXICAL ERRORS : {lex_errors}")
+        report_error("lex", "LEXER ERROR", "TOTAL LEXICAL ERRORS ", lex_errors, e)
 
     except ParseError as e:
         parse_errors += 1
-        print(f"\n{BOLD}{RED}--- PARSER (Syntax) ERROR ---{RESET}")
-        print(e)
-        print(f"TOTAL SYNTAX ERRORS  : {parse_errors}")
+        report_error("parse", "PARSER (Syntax) ERROR", "TOTAL SYNTAX ERRORS  ", parse_errors, e)
 
     except SemanticError as e:
         semantic_errors += 1
-        print(f"\n{BOLD}{RED}--- SEMANTIC ANALYSIS ERROR ---{RESET}")
-        print(e)
-        print(f"TOTAL SEMANTIC ERRORS: {semantic_errors}")
+        report_error("semantic", "SEMANTIC ANALYSIS ERROR", "TOTAL SEMANTIC ERRORS", semantic_errors, e)
 
     except RuntimeErrorMC as e:
         runtime_errors += 1
-        print(f"\n{BOLD}{RED}--- RUNTIME ERROR ---{RESET}")
-        print(e)
-        print(f"TOTAL RUNTIME ERRORS : {runtime_errors}")
+        report_error("runtime", "RUNTIME ERROR", "TOTAL RUNTIME ERRORS ", runtime_errors, e)
+
+    except MCBError as e:
+        report_error("mcb", ".mcb FILE ERROR", None, 0, e)
+
+    except SnapshotError as e:
+        report_error("snapshot", "SNAPSHOT ERROR", None, 0, e)
 
     finally:
+        if exec_profile is not None:
+            from .vmprof import format_report
+            if ndjson is not None:
+                ndjson.record(
+                    "vm_profile",
+                    lines=[{"line": ln, "count": n, "seconds": t}
+                           for ln, (n, t) in sorted(exec_profile.by_line().items())],
+                    loops=[{"line": ln, "iterations": n, "seconds": t}
+                           for ln, n, t in exec_profile.loops()],
+                )
+            else:
+                print(file=sys.stderr if quiet else sys.stdout)
+                print(format_report(exec_profile, source, args.profile_vm),
+                      file=sys.stderr if quiet else sys.stdout)
+        if profiler:
+            profiler.stop()
+            profiler.count("tokens", total_tokens)
+            profiler.count("unique_lexemes", unique_lexemes_count)
+            profiler.count("tac_instructions", tac_instr_count)
+            errors = {"lex": lex_errors, "parse": parse_errors,
+                      "semantic": semantic_errors, "runtime": runtime_errors}
+            profiler.error = next((k for k, v in errors.items() if v), None)
+            extra = {"file": args.file}
+            if args.cprofile:
+                extra["cprofile"] = {"phase": profiler.dump_cprofile(args.cprofile),
+                                     "path": args.cprofile}
+            profiler.write(args.profile, **extra)
+
         # ===========================================================
         # OVERALL SUMMARY TABLE
         # ===========================================================
-        print()
-        print(f"{BOLD}{CYAN}========== OVERALL SUMMARY =========={RESET}")
-        print(f"TOTAL TOKENS       : {total_tokens}")
-        print(f"UNIQUE LEXEMES     : {unique_lexemes_count}")
-        print(f"LEXICAL ERRORS     : {color_ok_fail(lex_errors)}")
-        print(f"SYNTAX ERRORS      : {color_ok_fail(parse_errors)}")
-        print(f"SEMANTIC ERRORS    : {color_ok_fail(semantic_errors)}")
-        print(f"RUNTIME ERRORS     : {color_ok_fail(runtime_errors)}")
-        print(f"TAC INSTRUCTIONS   : {tac_instr_count}")
-        print(f"VM EXECUTED        : {GREEN if vm_executed else RED}"
-              f"{'YES' if vm_executed else 'NO'}{RESET}")
-        print(f"{BOLD}{CYAN}====================================={RESET}")
-        print()
-
+        if ndjson is not None:
+            ndjson.record(
+                "summary", total_tokens=total_tokens,
+                unique_lexemes=unique_lexemes_count, lexical_errors=lex_errors,
+                syntax_errors=parse_errors, semantic_errors=semantic_errors,
+                runtime_errors=runtime_errors, tac_instructions=tac_instr_count,
+                vm_executed=vm_executed,
+            )
+            ndjson.flush()
+        elif not quiet:
+            print_overall_summary(
+                total_tokens, unique_lexemes_count, lex_errors, parse_errors,
+                semantic_errors, runtime_errors, tac_instr_count,
+                'YES' if vm_executed else 'NO', vm_executed,
+            )
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,342 @@
+# src/mcb.py
+"""
+Binary container (.mcb) for compiled MC programs.
+
+Layout, all little endian::
+
+    header   b'MCB\\0', u16 version, u16 flags,
+             4 x (u32 offset, u32 size) for consts, symbols, code, lines
+    consts   u32 count, then u8 tag + payload per entry
+    symbols  u32 count, then u16 length + utf-8 bytes per entry
+    code     u32 count, then 16-byte records: u8 opcode, 3 pad, 3 x u32 operand
+    lines    u32 count, then one u32 source line per instruction (0 = unknown)
+
+The header holds every section's offset, so sections may come in any order
+(``write_mcb_stream`` puts the code first).
+
+An operand is 0 for "no operand", otherwise ``tag << 30 | index`` where the
+tag selects the symbol table (names, labels, type names) or the constant pool.
+Code records have a fixed width, so the loader decodes them on demand straight
+out of an ``mmap`` instead of building a list.
+"""
+
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .errors import MCBError
+
+MAGIC = b'MCB\0'
+VERSION = 1
+
+OPCODES = (
+    'label', 'goto', 'if_goto', 'const', 'decl', '=', 'print',
+    '+', '-', '*', '/', '==', '!=', '<', '<=', '>', '>=',
+    'unary_-', 'unary_+', 'unary_!',
+    # new opcodes go at the end so existing files keep decoding
+    'if_false_goto',
+    'array', 'index', 'store_index', 'v+', 'v-', 'v*', 'v/', 'vunary_-',
+    'vassign', 'vprint', 'sum', 'min', 'max',
+)
+OPCODE_OF = {op: i for i, op in enumerate(OPCODES)}
+
+HEADER = struct.Struct('<4sHH8I')
+COUNT = struct.Struct('<I')
+INSTR = struct.Struct('<B3xIII')
+LINE = struct.Struct('<I')
+
+SYM_TAG = 1
+CONST_TAG = 2
+INDEX_MASK = (1 << 30) - 1
+
+# constant pool entry tags
+C_INT = 0
+C_FLOAT = 1
+C_BIGINT = 2
+
+
+# -------------------------------------------------
+# Writer
+# -------------------------------------------------
+def _encode_const(value) -> bytes:
+    if isinstance(value, float):
+        return struct.pack('<Bd', C_FLOAT, value)
+    if -(1 << 63) <= value < (1 << 63):
+        return struct.pack('<Bq', C_INT, value)
+    digits = str(value).encode('ascii')
+    return struct.pack('<BI', C_BIGINT, len(digits)) + digits
+
+
+def decode_const(buf, pos: int) -> Tuple[object, int]:
+    """Inverse of ``_encode_const``: (value, position after it)."""
+    tag = buf[pos]
+    pos += 1
+    if tag == C_INT:
+        return struct.unpack_from('<q', buf, pos)[0], pos + 8
+    if tag == C_FLOAT:
+        return struct.unpack_from('<d', buf, pos)[0], pos + 8
+    if tag == C_BIGINT:
+        (n,) = COUNT.unpack_from(buf, pos)
+        pos += COUNT.size
+        return int(bytes(buf[pos:pos + n]).decode('ascii')), pos + n
+    raise MCBError(f"Unknown constant tag {tag}")
+
+
+class _Pools:
+    """Symbol table and constant pool being built while encoding."""
+
+    def __init__(self):
+        self.consts: List[bytes] = []
+        self.const_index: Dict[bytes, int] = {}
+        self.symbols: List[str] = []
+        self.symbol_index: Dict[str, int] = {}
+
+    def operand(self, v) -> int:
+        if v is None:
+            return 0
+        if isinstance(v, str):
+            if v not in self.symbol_index:
+                self.symbol_index[v] = len(self.symbols)
+                self.symbols.append(v)
+            return SYM_TAG << 30 | self.symbol_index[v]
+        enc = _encode_const(v)
+        if enc not in self.const_index:
+            self.const_index[enc] = len(self.consts)
+            self.consts.append(enc)
+        return CONST_TAG << 30 | self.const_index[enc]
+
+    def instr(self, ins: Tuple) -> bytes:
+        op, a1, a2, res = ins
+        if op not in OPCODE_OF:
+            raise MCBError(f"Cannot encode TAC instruction {op!r}")
+        return INSTR.pack(OPCODE_OF[op], self.operand(a1), self.operand(a2), self.operand(res))
+
+    def sections(self) -> Tuple[bytes, bytes]:
+        """(consts, symbols) sections."""
+        if len(self.symbols) > INDEX_MASK or len(self.consts) > INDEX_MASK:
+            raise MCBError("Too many symbols/constants for the .mcb format")
+        const_sec = COUNT.pack(len(self.consts)) + b''.join(self.consts)
+        sym_sec = bytearray(COUNT.pack(len(self.symbols)))
+        for name in self.symbols:
+            raw = name.encode('utf-8')
+            sym_sec += struct.pack('<H', len(raw)) + raw
+        return const_sec, bytes(sym_sec)
+
+
+def encode_mcb(tac: Sequence[Tuple], lines: Optional[Sequence[int]] = None) -> bytes:
+    """Serialise a TAC list (and optional per-instruction line table)."""
+    pools = _Pools()
+    code = bytearray(COUNT.pack(len(tac)))
+    for ins in tac:
+        code += pools.instr(ins)
+    const_sec, sym_sec = pools.sections()
+
+    if lines is None:
+        line_sec = COUNT.pack(0)
+    else:
+        if len(lines) != len(tac):
+            raise MCBError("Line table must have one entry per instruction")
+        line_sec = COUNT.pack(len(lines)) + b''.join(LINE.pack(ln or 0) for ln in lines)
+
+    sections = [const_sec, sym_sec, bytes(code), line_sec]
+    offsets = []
+    pos = HEADER.size
+    for sec in sections:
+        offsets += [pos, len(sec)]
+        pos += len(sec)
+    header = HEADER.pack(MAGIC, VERSION, 0, *offsets)
+    return header + b''.join(sections)
+
+
+def write_mcb(path: str, tac: Sequence[Tuple], lines: Optional[Sequence[int]] = None) -> int:
+    """Write *tac* to *path*; returns the number of bytes written."""
+    data = encode_mcb(tac, lines)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def write_mcb_stream(path: str, located: Iterable[Tuple[Tuple, int]]) -> Tuple[int, int]:
+    """Write (instruction, line) pairs as they arrive, e.g. from
+    ``TACGenerator.stream``. Returns (instructions, bytes written).
+
+    Section offsets live in the header, so the code goes first and the
+    pools (complete only at the end) last; line numbers wait in a temp
+    file. Memory stays at the pools plus one buffered write.
+
+    The stream may still fail part way (a later statement with an error),
+    so it goes to ``path + '.tmp'`` and is renamed over *path* only once
+    complete; on failure the temp file is removed and *path* left as it was.
+    """
+    pools = _Pools()
+    count = 0
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, 'wb') as f, tempfile.TemporaryFile() as line_buf:
+            f.write(bytes(HEADER.size))
+            code_off = f.tell()
+            f.write(COUNT.pack(0))
+            for ins, line in located:
+                f.write(pools.instr(ins))
+                line_buf.write(LINE.pack(line or 0))
+                count += 1
+            l_off = f.tell()
+            f.write(COUNT.pack(count))
+            line_buf.seek(0)
+            shutil.copyfileobj(line_buf, f)
+            const_sec, sym_sec = pools.sections()
+            c_off = f.tell()
+            f.write(const_sec)
+            s_off = f.tell()
+            f.write(sym_sec)
+            size = f.tell()
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, 0, c_off, len(const_sec), s_off, len(sym_sec),
+                                code_off, l_off - code_off, l_off, c_off - l_off))
+            f.seek(code_off)
+            f.write(COUNT.pack(count))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return count, size
+
+
+# -------------------------------------------------
+# Loader
+# -------------------------------------------------
+class MCBCode(Sequence):
+    """Read-only view of the code section; decodes one instruction per index."""
+
+    def __init__(self, buf, offset: int, count: int, symbols, consts):
+        self._buf = buf
+        self._base = offset + COUNT.size
+        self._count = count
+        self._symbols = symbols
+        self._consts = consts
+
+    def __len__(self):
+        return self._count
+
+    def _operand(self, v):
+        if v == 0:
+            return None
+        if v >> 30 == SYM_TAG:
+            return self._symbols[v & INDEX_MASK]
+        return self._consts[v & INDEX_MASK]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError('instruction index out of range')
+        op, a1, a2, res = INSTR.unpack_from(self._buf, self._base + i * INSTR.size)
+        try:
+            return (OPCODES[op], self._operand(a1), self._operand(a2), self._operand(res))
+        except IndexError:
+            # an opcode or pool index past the end: corrupt, not a VM bug
+            raise MCBError(f"Corrupt .mcb file: bad opcode or operand in instruction {i}") from None
+
+    def labels(self) -> Dict[str, int]:
+        """Label name -> instruction index, scanning only the opcode bytes."""
+        label_op = OPCODE_OF['label']
+        out = {}
+        for i in range(self._count):
+            pos = self._base + i * INSTR.size
+            if self._buf[pos] == label_op:
+                out[self[i][3]] = i
+        return out
+
+
+class MCBProgram:
+    """A loaded .mcb file. Use as a context manager to release the mapping."""
+
+    def __init__(self, buf, close=None):
+        self._buf = buf
+        self._close = close
+        if len(buf) < HEADER.size:
+            raise MCBError("File too small to be an .mcb program")
+        magic, version, self.flags, *offsets = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise MCBError("Not an .mcb file (bad magic)")
+        if version != VERSION:
+            raise MCBError(f"Unsupported .mcb version {version} (expected {VERSION})")
+        self.version = version
+        (c_off, _c_len, s_off, _s_len, code_off, _code_len, l_off, _l_len) = offsets
+        try:
+            self.consts = self._read_consts(c_off)
+            self.symbols = self._read_symbols(s_off)
+            (count,) = COUNT.unpack_from(buf, code_off)
+            if code_off + COUNT.size + count * INSTR.size > len(buf):
+                raise MCBError("Truncated code section")
+            self.code = MCBCode(buf, code_off, count, self.symbols, self.consts)
+            (n_lines,) = COUNT.unpack_from(buf, l_off)
+            self.lines = [LINE.unpack_from(buf, l_off + COUNT.size + i * LINE.size)[0]
+                          for i in range(n_lines)]
+        except struct.error as e:
+            raise MCBError(f"Corrupt .mcb file: {e}") from None
+
+    def _read_consts(self, off: int) -> list:
+        (count,) = COUNT.unpack_from(self._buf, off)
+        pos = off + COUNT.size
+        out = []
+        for _ in range(count):
+            value, pos = decode_const(self._buf, pos)
+            out.append(value)
+        return out
+
+    def _read_symbols(self, off: int) -> List[str]:
+        (count,) = COUNT.unpack_from(self._buf, off)
+        pos = off + COUNT.size
+        out = []
+        for _ in range(count):
+            (n,) = struct.unpack_from('<H', self._buf, pos)
+            pos += 2
+            out.append(bytes(self._buf[pos:pos + n]).decode('utf-8'))
+            pos += n
+        return out
+
+    def line_of(self, index: int) -> int:
+        """Source line of instruction *index*, or 0 if unknown."""
+        if 0 <= index < len(self.lines):
+            return self.lines[index]
+        return 0
+
+    def close(self):
+        if self._close is not None:
+            self._close()
+            self._close = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def loads_mcb(data: bytes) -> MCBProgram:
+    """Load an .mcb image that is already in memory."""
+    return MCBProgram(memoryview(data))
+
+
+def load_mcb(path: str) -> MCBProgram:
+    """Memory-map *path* and return the program without copying its code."""
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file cannot be mapped
+            raise MCBError("File too small to be an .mcb program") from None
+    try:
+        return MCBProgram(mm, mm.close)
+    except Exception:
+        mm.close()
+        raise
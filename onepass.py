@@ -0,0 +1,349 @@
+# src/onepass.py
+"""
+Single-pass front end: parse, type-check and emit TAC in one traversal.
+
+``OnePassParser`` is the recursive-descent parser with its semantic
+actions swapped: where ``Parser`` builds a node, this one checks the
+construct against the current scope and emits its TAC right away, and an
+expression yields ``(operand, type)`` instead of a subtree. No AST is
+built and the program is walked once instead of three times (parse,
+``SemanticAnalyzer``, ``TACGenerator``). Expressions are parsed by
+precedence climbing, one table lookup per operator instead of a method
+call per precedence level. ``python -m package.bench --front-end``
+compares time and peak memory with the multi-pass front end.
+
+    tokens = Lexer(source).scan_tokens()
+    parser = OnePassParser(tokens)
+    tac = parser.compile()
+    parser.lines          # source line of every instruction
+
+The result is the multi-pass result, instruction for instruction:
+
+- temps, shadowed names (``x.1``) and lines are allocated in the same
+  order, since the multi-pass passes visit the tree in source order too;
+- labels are not: ``if`` numbers its else label before the then branch,
+  and the ``else`` is only seen after it. Jumps are emitted with label
+  slots, the else slot is given up when no ``else`` follows (its jump is
+  backpatched to the end label), and the slots of each top-level
+  statement are renamed to ``L1, L2, ...`` once the statement is done;
+- diagnostics: the typing rules are the ones in ``semantic.py``, and
+  checks run in the order the analyzer makes them. The multi-pass
+  pipeline reports a syntax error anywhere in the file before any
+  semantic error, so on a semantic error the tokens are parsed again
+  (syntax only) and a syntax error, if any, wins. Lexing is unchanged.
+"""
+
+from typing import List, Tuple
+
+from .tokens import TokenType as TT
+from .errors import ParseError, SemanticError
+from .parser import Parser, OP_MAP, REDUCTIONS
+from .semantic import (Scope, type_of_literal, check_assignable, unary_type,
+                       binary_type, indexed_type, check_index, reduce_type,
+                       check_cond)
+from .arrays import MAX_ARRAY_SIZE, array_type, is_array_type
+from .tac import TACGenerator
+
+# (TAC operand, type) of an expression
+Attr = Tuple[str, str]
+
+# binary operator -> precedence, loosest first (Parser's _equality ..
+# _factor); 0 = not a binary operator
+BINARY_PREC = {
+    TT.EQEQ: 1, TT.NEQ: 1,
+    TT.LT: 2, TT.LTE: 2, TT.GT: 2, TT.GTE: 2,
+    TT.PLUS: 3, TT.MINUS: 3,
+    TT.STAR: 4, TT.SLASH: 4,
+}
+UNARY_OPS = (TT.BANG, TT.MINUS, TT.PLUS)
+
+
+class OnePassParser(Parser):
+    def __init__(self, tokens):
+        super().__init__(tokens)
+        self.scope = Scope()
+        # the generator only hands out temps and TAC names, and holds the code
+        self.gen = TACGenerator()
+        # label slots of the current top-level statement (True = used) and
+        # the code positions whose target is still a slot
+        self.slots: List[bool] = []
+        self.fixups: List[int] = []
+
+    @property
+    def lines(self) -> List[int]:
+        return self.gen.lines
+
+    def compile(self) -> List[Tuple]:
+        """Check and lower the whole program. Raises the ParseError or
+        SemanticError that ``Parser.parse`` + ``SemanticAnalyzer`` would."""
+        try:
+            self._consume(TT.START, "'start' expected at program start")
+            while (
+                not self._check(TT.END)
+                and not self._check(TT.RBRACE)
+                and not self._is_at_end()
+            ):
+                self._stmt()
+                self._name_labels()
+            self._consume(TT.END, "'end' expected at program end")
+        except SemanticError:
+            # error path only: a syntax error further on is reported first
+            Parser(self.tokens).parse()
+            raise
+        return self.gen.code
+
+    # -------------------------------------------------
+    # Labels (backpatched per top-level statement)
+    # -------------------------------------------------
+    def _slot(self, used: bool = True) -> int:
+        self.slots.append(used)
+        return len(self.slots) - 1
+
+    def _jump(self, ins: Tuple):
+        self.fixups.append(len(self.gen.code))
+        self.gen._emit(ins)
+
+    def _name_labels(self):
+        names = []
+        n = self.gen.label_id
+        for used in self.slots:
+            if used:
+                n += 1
+            names.append(f"L{n}")
+        self.gen.label_id = n
+        code = self.gen.code
+        for pos in self.fixups:
+            op, a1, a2, slot = code[pos]
+            code[pos] = (op, a1, a2, names[slot])
+        self.slots = []
+        self.fixups = []
+
+    # -------------------------------------------------
+    # Statements
+    # -------------------------------------------------
+    def _stmt_list(self, spans=None):
+        while (
+            not self._check(TT.END)
+            and not self._check(TT.RBRACE)
+            and not self._is_at_end()
+        ):
+            self._stmt()
+
+    def _stmt(self):
+        gen = self.gen
+        outer_line = gen.cur_line
+        gen.cur_line = self._peek().line or outer_line
+        try:
+            self._lower_stmt()
+        finally:
+            gen.cur_line = outer_line
+
+    def _lower_stmt(self):
+        gen = self.gen
+        # int / float declaration (scalar or fixed-size array)
+        if self._match(TT.INT, TT.FLOAT):
+            type_name = self._previous().lexeme
+            name = self._consume(TT.IDENT, f"identifier expected after '{type_name}'").lexeme
+            if self._match(TT.LBRACKET):
+                size = self._consume(TT.NUMBER, "array size expected after '['")
+                if not isinstance(size.literal, int) or not 1 <= size.literal <= MAX_ARRAY_SIZE:
+                    raise ParseError(f"array size must be an integer from 1 to {MAX_ARRAY_SIZE} "
+                                     f"(found {size.lexeme} at {size.line}:{size.col})")
+                self._consume(TT.RBRACKET, "] expected after array size")
+                self._consume(TT.SEMI, "; expected after declaration")
+                self.scope.declare(name, array_type(type_name, size.literal))
+                gen._emit(('array', type_name, size.literal, gen._declare(name)))
+                return
+            rhs = None
+            if self._match(TT.EQUAL):
+                # initializer sees the outer binding
+                rhs, t = self._expr()
+                check_assignable(type_name, t, name)
+            self._consume(TT.SEMI, "; expected after declaration")
+            self.scope.declare(name, type_name)
+            gen._emit(('decl', type_name, rhs, gen._declare(name)))
+            return
+
+        # print(x);
+        if self._match(TT.PRINT):
+            self._consume(TT.LPAREN, "( expected after 'print'")
+            v, t = self._expr()
+            self._consume(TT.RPAREN, ") expected after print expr")
+            self._consume(TT.SEMI, "; expected after print")
+            gen._emit(('vprint' if is_array_type(t) else 'print', v, None, None))
+            return
+
+        # if (...) stmt [else stmt]
+        if self._match(TT.IF):
+            self._consume(TT.LPAREN, "( after 'if'")
+            cond, t = self._expr()
+            self._consume(TT.RPAREN, ") after if condition")
+            check_cond(t)
+            l_true, l_end = self._slot(), self._slot()
+            # numbered before the then branch, given up if no else follows
+            l_false = self._slot(used=False)
+            self._jump(('if_goto', cond, None, l_true))
+            skip = len(gen.code)
+            self._jump(('goto', None, None, l_false))
+            self._jump(('label', None, None, l_true))
+            # a block branch opens a scope, a single statement does not
+            self._stmt()
+            if self._match(TT.ELSE):
+                self.slots[l_false] = True
+                self._jump(('goto', None, None, l_end))
+                self._jump(('label', None, None, l_false))
+                self._stmt()
+            else:
+                gen.code[skip] = ('goto', None, None, l_end)
+            self._jump(('label', None, None, l_end))
+            return
+
+        # while (...) stmt
+        if self._match(TT.WHILE):
+            l_start, l_body, l_end = self._slot(), self._slot(), self._slot()
+            self._jump(('label', None, None, l_start))
+            self._consume(TT.LPAREN, "( after 'while'")
+            cond, t = self._expr()
+            self._consume(TT.RPAREN, ") after while condition")
+            check_cond(t)
+            self._jump(('if_goto', cond, None, l_body))
+            self._jump(('goto', None, None, l_end))
+            self._jump(('label', None, None, l_body))
+            self._stmt()
+            self._jump(('goto', None, None, l_start))
+            self._jump(('label', None, None, l_end))
+            return
+
+        # { ... }
+        if self._match(TT.LBRACE):
+            self._block()
+            return
+
+        # assignment: IDENT = expr;
+        if self._check(TT.IDENT) and self._check_next(TT.EQUAL):
+            name = self._advance().lexeme      # IDENT
+            self._advance()                    # '='
+            target = self.scope.resolve(name).type_name
+            v, t = self._expr()
+            check_assignable(target, t, name)
+            self._consume(TT.SEMI, "; expected after assignment")
+            # arrays are copied (or filled, from a scalar) in place
+            op = 'vassign' if is_array_type(target) else '='
+            gen._emit((op, v, None, gen._resolve(name)))
+            return
+
+        # element assignment: IDENT '[' expr ']' = expr;
+        if self._check(TT.IDENT) and self._check_next(TT.LBRACKET):
+            name = self._advance().lexeme      # IDENT
+            self._advance()                    # '['
+            elem = indexed_type(name, self.scope.resolve(name).type_name)
+            index, t = self._expr()
+            check_index(t)
+            self._consume(TT.RBRACKET, "] expected after index")
+            self._consume(TT.EQUAL, "= expected after array element")
+            v, t = self._expr()
+            check_assignable(elem, t, name)
+            self._consume(TT.SEMI, "; expected after assignment")
+            gen._emit(('store_index', v, index, gen._resolve(name)))
+            return
+
+        # plain parser for the message
+        super()._stmt()
+
+    def _block(self):
+        outer = self.scope
+        self.scope = Scope(outer)
+        self.gen.scopes.append({})
+        try:
+            self._stmt_list()
+            self._consume(TT.RBRACE, "} to close block")
+        finally:
+            self.gen.scopes.pop()
+            self.scope = outer
+
+    # -------------------------------------------------
+    # Expressions: precedence climbing over BINARY_PREC instead of one
+    # method per level. It consumes the same tokens in the same order,
+    # so operands, temps and syntax errors come out as in Parser.
+    # -------------------------------------------------
+    def _check(self, type_):
+        # Lexer output always ends in EOF, so there is a current token
+        return self.tokens[self.i].type is type_
+
+    def _expr(self) -> Attr:
+        return self._binary(1)
+
+    def _binary(self, min_prec: int) -> Attr:
+        left = self._unary()
+        while True:
+            tok = self.tokens[self.i]
+            prec = BINARY_PREC.get(tok.type, 0)
+            if prec < min_prec:
+                return left
+            self.i += 1
+            # left-associative: the right operand only takes tighter operators
+            right = self._binary(prec + 1)
+            left = self._mk_binary(left, OP_MAP[tok.type], right, tok.line)
+
+    def _unary(self) -> Attr:
+        tok = self.tokens[self.i]
+        if tok.type in UNARY_OPS:
+            self.i += 1
+            return self._mk_unary(OP_MAP[tok.type], self._unary(), tok.line)
+        return self._primary()
+
+    def _mk_binary(self, left: Attr, op: str, right: Attr, line) -> Attr:
+        (l, lt), (r, rt) = left, right
+        t = binary_type(op, lt, rt)
+        tmp = self.gen.new_temp()
+        self.gen._emit((f'v{op}' if is_array_type(t) else op, l, r, tmp))
+        return tmp, t
+
+    def _mk_unary(self, op: str, right: Attr, line) -> Attr:
+        v, t = right
+        t = unary_type(op, t)
+        ins = f'unary_{op}'
+        if is_array_type(t):
+            # '+a' is a itself
+            if op == '+':
+                return v, t
+            ins = f'vunary_{op}'
+        tmp = self.gen.new_temp()
+        self.gen._emit((ins, v, None, tmp))
+        return tmp, t
+
+    def _primary(self) -> Attr:
+        gen = self.gen
+        tok = self.tokens[self.i]
+        if tok.type is TT.NUMBER:
+            self.i += 1
+            value = tok.literal
+            tmp = gen.new_temp()
+            gen._emit(('const', value, None, tmp))
+            return tmp, type_of_literal(value)
+        if tok.type is TT.IDENT:
+            self.i += 1
+            name = tok.lexeme
+            if self._match(TT.LBRACKET):
+                elem = indexed_type(name, self.scope.resolve(name).type_name)
+                i, t = self._expr()
+                check_index(t)
+                self._consume(TT.RBRACKET, "] expected after index")
+                tmp = gen.new_temp()
+                gen._emit(('index', gen._resolve(name), i, tmp))
+                return tmp, elem
+            if name in REDUCTIONS and self._match(TT.LPAREN):
+                a, t = self._expr()
+                self._consume(TT.RPAREN, f") expected after {name} argument")
+                t = reduce_type(name, t)
+                tmp = gen.new_temp()
+                gen._emit((name, a, None, tmp))
+                return tmp, t
+            t = self.scope.resolve(name).type_name
+            return gen._resolve(name), t
+        if self._match(TT.LPAREN):
+            e = self._expr()
+            self._consume(TT.RPAREN, ") expected after expression")
+            return e
+        # plain parser for the message
+        return super()._primary()
@@ -1,6 +1,7 @@
-from typing import List
+from typing import Iterator, List
 from .tokens import TokenType as TT, Token
 from .errors import ParseError
+from .arrays import MAX_ARRAY_SIZE
 from .ast_nodes import *
 
 OP_MAP = {
@@ -10,52 +11,91 @@ OP_MAP = {
     TT.EQUAL: '=', TT.BANG: '!'
 }
 
+# builtins over a whole array; `sum(` is never valid otherwise, so these
+# stay ordinary identifiers everywhere else
+REDUCTIONS = ('sum', 'min', 'max')
+
 
 class Parser:
-    def __init__(self, tokens: List[Token]):
+    def __init__(self, tokens: List[Token], hash_cons: bool = False):
         self.tokens = tokens
         self.i = 0
+        # (first, end) token index of each top-level statement
+        self.spans = []
+        # hash-consing: structurally equal expressions become one shared
+        # node, so the expression trees form a DAG. Children are interned
+        # first, which makes (op, id(left), id(right)) a complete key.
+        # A shared node keeps the line of its first occurrence.
+        self.hash_cons = hash_cons
+        self.interned = {}
+        self.shared = 0
 
     def parse(self) -> Program:
         # program -> 'start' stmt_list 'end'
         self._consume(TT.START, "'start' expected at program start")
-        stmts = self._stmt_list()
+        self.spans = []
+        stmts = self._stmt_list(self.spans)
         self._consume(TT.END, "'end' expected at program end")
         # Yahan pehle strict EOF check tha; newline / extra space pe error aa raha tha
         # self._consume(TT.EOF, "trailing tokens after 'end'")
         return Program(stmts)
 
+    def iter_statements(self) -> Iterator[Stmt]:
+        """Like ``parse`` but yields top-level statements one at a time, so a
+        streaming pipeline never holds the whole AST."""
+        self._consume(TT.START, "'start' expected at program start")
+        while (
+            not self._check(TT.END)
+            and not self._check(TT.RBRACE)
+            and not self._is_at_end()
+        ):
+            yield self._stmt()
+        self._consume(TT.END, "'end' expected at program end")
+
+    def parse_statements(self) -> List[Stmt]:
+        """Parse a bare statement list (no start/end) up to EOF."""
+        self.spans = []
+        stmts = self._stmt_list(self.spans)
+        if not self._is_at_end():
+            t = self._peek()
+            raise ParseError(f"Unexpected token {t.type.name} at {t.line}:{t.col}")
+        return stmts
+
     # -------------------------------------------------
     # Statements
     # -------------------------------------------------
-    def _stmt_list(self) -> List[Stmt]:
+    def _stmt_list(self, spans=None) -> List[Stmt]:
         stmts = []
         while (
             not self._check(TT.END)
             and not self._check(TT.RBRACE)
             and not self._is_at_end()
         ):
+            first = self.i
             stmts.append(self._stmt())
+            if spans is not None:
+                spans.append((first, self.i))
         return stmts
 
     def _stmt(self) -> Stmt:
-        # int declaration
-        if self._match(TT.INT):
-            name = self._consume(TT.IDENT, "identifier expected after 'int'")
+        line = self._peek().line
+        # int / float declaration (scalar or fixed-size array)
+        if self._match(TT.INT, TT.FLOAT):
+            type_name = self._previous().lexeme
+            name = self._consume(TT.IDENT, f"identifier expected after '{type_name}'")
+            if self._match(TT.LBRACKET):
+                size = self._consume(TT.NUMBER, "array size expected after '['")
+                if not isinstance(size.literal, int) or not 1 <= size.literal <= MAX_ARRAY_SIZE:
+                    raise ParseError(f"array size must be an integer from 1 to {MAX_ARRAY_SIZE} "
+                                     f"(found {size.lexeme} at {size.line}:{size.col})")
+                self._consume(TT.RBRACKET, "] expected after array size")
+                self._consume(TT.SEMI, "; expected after declaration")
+                return ArrayDecl(type_name, name.lexeme, size.literal, line)
             init = None
             if self._match(TT.EQUAL):
                 init = self._expr()
             self._consume(TT.SEMI, "; expected after declaration")
-            return VarDecl('int', name.lexeme, init)
-
-        # float declaration
-        if self._match(TT.FLOAT):
-            name = self._consume(TT.IDENT, "identifier expected after 'float'")
-            init = None
-            if self._match(TT.EQUAL):
-                init = self._expr()
-            self._consume(TT.SEMI, "; expected after declaration")
-            return VarDecl('float', name.lexeme, init)
+            return VarDecl(type_name, name.lexeme, init, line)
 
         # print(x);
         if self._match(TT.PRINT):
@@ -63,7 +103,7 @@ class Parser:
             e = self._expr()
             self._consume(TT.RPAREN, ") expected after print expr")
             self._consume(TT.SEMI, "; expected after print")
-            return Print(e)
+            return Print(e, line)
 
         # if (...) stmt [else stmt]
         if self._match(TT.IF):
@@ -74,7 +114,7 @@ class Parser:
             elseb = None
             if self._match(TT.ELSE):
                 elseb = self._stmt()
-            return If(cond, thenb, elseb)
+            return If(cond, thenb, elseb, line)
 
         # while (...) stmt
         if self._match(TT.WHILE):
@@ -82,13 +122,13 @@ class Parser:
             cond = self._expr()
             self._consume(TT.RPAREN, ") after while condition")
             body = self._stmt()
-            return While(cond, body)
+            return While(cond, body, line)
 
         # { ... }
         if self._match(TT.LBRACE):
             stmts = self._stmt_list()
             self._consume(TT.RBRACE, "} to close block")
-            return Block(stmts)
+            return Block(stmts, line)
 
         # assignment: IDENT = expr;
         if self._check(TT.IDENT) and self._check_next(TT.EQUAL):
@@ -96,7 +136,18 @@ class Parser:
             self._advance()                    # '='
             e = self._expr()
             self._consume(TT.SEMI, "; expected after assignment")
-            return Assign(name, e)
+            return Assign(name, e, line)
+
+        # element assignment: IDENT '[' expr ']' = expr;
+        if self._check(TT.IDENT) and self._check_next(TT.LBRACKET):
+            name = self._advance().lexeme      # IDENT
+            self._advance()                    # '['
+            index = self._expr()
+            self._consume(TT.RBRACKET, "] expected after index")
+            self._consume(TT.EQUAL, "= expected after array element")
+            e = self._expr()
+            self._consume(TT.SEMI, "; expected after assignment")
+            return IndexAssign(name, index, e, line)
 
         raise ParseError(
             f"Unexpected token {self._peek().type.name} at "
@@ -112,47 +163,57 @@ class Parser:
     def _equality(self) -> Expr:
         expr = self._comparison()
         while self._match(TT.EQEQ, TT.NEQ):
-            op = OP_MAP[self._previous().type]
+            op_tok = self._previous()
             right = self._comparison()
-            expr = Binary(expr, op, right)
+            expr = self._mk_binary(expr, OP_MAP[op_tok.type], right, op_tok.line)
         return expr
 
     def _comparison(self) -> Expr:
         expr = self._term()
         while self._match(TT.LT, TT.LTE, TT.GT, TT.GTE):
-            op = OP_MAP[self._previous().type]
+            op_tok = self._previous()
             right = self._term()
-            expr = Binary(expr, op, right)
+            expr = self._mk_binary(expr, OP_MAP[op_tok.type], right, op_tok.line)
         return expr
 
     def _term(self) -> Expr:
         expr = self._factor()
         while self._match(TT.PLUS, TT.MINUS):
-            op = OP_MAP[self._previous().type]
+            op_tok = self._previous()
             right = self._factor()
-            expr = Binary(expr, op, right)
+            expr = self._mk_binary(expr, OP_MAP[op_tok.type], right, op_tok.line)
         return expr
 
     def _factor(self) -> Expr:
         expr = self._unary()
         while self._match(TT.STAR, TT.SLASH):
-            op = OP_MAP[self._previous().type]
+            op_tok = self._previous()
             right = self._unary()
-            expr = Binary(expr, op, right)
+            expr = self._mk_binary(expr, OP_MAP[op_tok.type], right, op_tok.line)
         return expr
 
     def _unary(self) -> Expr:
         if self._match(TT.BANG, TT.MINUS, TT.PLUS):
-            op = OP_MAP[self._previous().type]
+            op_tok = self._previous()
             right = self._unary()
-            return Unary(op, right)
+            return self._mk_unary(OP_MAP[op_tok.type], right, op_tok.line)
         return self._primary()
 
     def _primary(self) -> Expr:
         if self._match(TT.NUMBER):
-            return Literal(self._previous().literal)
+            tok = self._previous()
+            return self._mk_literal(tok)
         if self._match(TT.IDENT):
-            return Var(self._previous().lexeme)
+            tok = self._previous()
+            if self._match(TT.LBRACKET):
+                index = self._expr()
+                self._consume(TT.RBRACKET, "] expected after index")
+                return self._mk_index(tok, index)
+            if tok.lexeme in REDUCTIONS and self._match(TT.LPAREN):
+                arg = self._expr()
+                self._consume(TT.RPAREN, f") expected after {tok.lexeme} argument")
+                return self._mk_reduce(tok, arg)
+            return self._mk_var(tok)
         if self._match(TT.LPAREN):
             e = self._expr()
             self._consume(TT.RPAREN, ") expected after expression")
@@ -162,6 +223,52 @@ class Parser:
             f"Expected expression at {t.line}:{t.col}, got {t.type.name}"
         )
 
+    # -------------------------------------------------
+    # Node construction (hash-consing)
+    # -------------------------------------------------
+    def _intern(self, key, make):
+        node = self.interned.get(key)
+        if node is None:
+            node = self.interned[key] = make()
+        else:
+            self.shared += 1
+        return node
+
+    def _mk_binary(self, left, op, right, line):
+        if not self.hash_cons:
+            return Binary(left, op, right, line)
+        return self._intern(('bin', op, id(left), id(right)),
+                            lambda: Binary(left, op, right, line))
+
+    def _mk_unary(self, op, right, line):
+        if not self.hash_cons:
+            return Unary(op, right, line)
+        return self._intern(('un', op, id(right)), lambda: Unary(op, right, line))
+
+    def _mk_literal(self, tok):
+        if not self.hash_cons:
+            return Literal(tok.literal, tok.line)
+        # 1 and 1.0 are == but different literals
+        return self._intern(('lit', type(tok.literal), tok.literal),
+                            lambda: Literal(tok.literal, tok.line))
+
+    def _mk_var(self, tok):
+        if not self.hash_cons:
+            return Var(tok.lexeme, tok.line)
+        return self._intern(('var', tok.lexeme), lambda: Var(tok.lexeme, tok.line))
+
+    def _mk_index(self, tok, index):
+        if not self.hash_cons:
+            return Index(tok.lexeme, index, tok.line)
+        return self._intern(('idx', tok.lexeme, id(index)),
+                            lambda: Index(tok.lexeme, index, tok.line))
+
+    def _mk_reduce(self, tok, arg):
+        if not self.hash_cons:
+            return Reduce(tok.lexeme, arg, tok.line)
+        return self._intern(('red', tok.lexeme, id(arg)),
+                            lambda: Reduce(tok.lexeme, arg, tok.line))
+
     # -------------------------------------------------
     # Utilities
     # -------------------------------------------------
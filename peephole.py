@@ -0,0 +1,114 @@
+# src/peephole.py
+"""
+Streaming peephole passes over TAC.
+
+Every pass is a generator from (instruction, line) pairs to (instruction,
+line) pairs and only looks at a few instructions at a time, so passes can
+be chained between ``TACGenerator.stream`` and ``mcb.write_mcb_stream``
+without the program ever being in memory. ``optimize(pairs, level)`` runs
+the passes for an optimisation level; level 0 is the code as generated.
+
+    if_goto c L1; goto L2; label L1   ->  if_false_goto c L2; label L1
+    goto L; [label ...] label L        ->  [label ...] label L
+    goto L; <no label>...              ->  goto L        (unreachable code)
+
+Labels are never removed: a later instruction may still jump to them, and
+a streaming pass cannot know.
+"""
+
+from typing import Iterable, Iterator, List, Tuple
+
+Located = Tuple[Tuple, int]
+
+MAX_LEVEL = 1
+
+
+def fuse_conditional_jumps(pairs: Iterable[Located]) -> Iterator[Located]:
+    """Every ``if``/``while`` lowers to if_goto + goto + label; one
+    if_false_goto does the same with one jump fewer per execution."""
+    held: List[Located] = []
+    for item in pairs:
+        ins = item[0]
+        if not held:
+            if ins[0] == 'if_goto':
+                held.append(item)
+            else:
+                yield item
+            continue
+        if len(held) == 1:
+            if ins[0] == 'goto':
+                held.append(item)
+                continue
+        elif ins[0] == 'label' and ins[3] == held[0][0][3]:
+            (_op, cond, _a2, _then), line = held[0]
+            yield ('if_false_goto', cond, None, held[1][0][3]), line
+            yield item
+            held = []
+            continue
+        yield from held
+        held = []
+        if ins[0] == 'if_goto':
+            held.append(item)
+        else:
+            yield item
+    yield from held
+
+
+def drop_jumps_to_next(pairs: Iterable[Located]) -> Iterator[Located]:
+    """A goto whose target label follows it (maybe after other labels) is
+    the same as falling through."""
+    jump = None
+    labels: List[Located] = []
+    for item in pairs:
+        ins = item[0]
+        if jump is not None:
+            if ins[0] == 'label':
+                labels.append(item)
+                if ins[3] == jump[0][3]:
+                    yield from labels
+                    jump = None
+                    labels = []
+                continue
+            yield jump
+            yield from labels
+            jump = None
+            labels = []
+        if ins[0] == 'goto':
+            jump = item
+        else:
+            yield item
+    if jump is not None:
+        yield jump
+        yield from labels
+
+
+def drop_unreachable(pairs: Iterable[Located]) -> Iterator[Located]:
+    """Nothing between a goto and the next label can ever run."""
+    dead = False
+    for item in pairs:
+        op = item[0][0]
+        if op == 'label':
+            dead = False
+        elif dead:
+            continue
+        yield item
+        if op == 'goto':
+            dead = True
+
+
+PASSES = {
+    1: (drop_unreachable, drop_jumps_to_next, fuse_conditional_jumps),
+}
+
+
+def optimize(pairs: Iterable[Located], level: int = 1) -> Iterable[Located]:
+    for lvl in range(1, min(level, MAX_LEVEL) + 1):
+        for p in PASSES[lvl]:
+            pairs = p(pairs)
+    return pairs
+
+
+def optimize_list(tac: List[Tuple], lines: List[int], level: int = 1) -> Tuple[List[Tuple], List[int]]:
+    """List in, lists out (for callers that hold the whole program)."""
+    out = list(optimize(zip(tac, lines), level))
+    return [ins for ins, _ in out], [ln for _, ln in out]
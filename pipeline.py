@@ -0,0 +1,213 @@
+# src/pipeline.py
+"""
+Library API: the compiler as objects instead of a command line.
+
+    from package.pipeline import Compiler
+
+    result = Compiler().compile("start print(1 + 2); end")
+    result.ok, result.output          # True, '3\\n'
+    result.tokens, result.program, result.tac
+
+    checker = Compiler(until='check')  # lex + parse + check, nothing else
+    for src in sources:
+        if not checker.compile(src).ok: ...
+
+The stages are ``lex``, ``parse``, ``check``, ``tac`` and ``run``; a
+compiler stops after ``until``. Errors never escape ``compile``: they are
+kept in ``result.error`` with ``result.error_phase`` (``lex``, ``parse``,
+``semantic``, ``runtime`` or ``internal``, as in batch mode and the
+server). ``result.raise_error()`` re-raises for callers who prefer that.
+
+A ``Compiler`` holds only settings, so one instance can compile any number
+of programs, from any number of threads. ``run(result)`` executes an
+already compiled result again, e.g. one kept in a cache.
+
+Phase modules are imported the first time a stage needs them: a ``lex``
+only compiler never loads the parser, the checker, the TAC generator or
+the VM, and neither does ``python -m package.main --lex``.
+
+``Compiler(one_pass=True)`` replaces ``parse``, ``check`` and ``tac`` by
+one ``onepass`` stage (see ``onepass.py``): same TAC and diagnostics, no
+AST (``result.program`` stays None).
+"""
+
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from .errors import LexError, ParseError, SemanticError, RuntimeErrorMC
+from .profiling import phase
+
+STAGES = ('lex', 'parse', 'check', 'tac', 'run')
+# stage -> name announced to profiling.phase subscribers
+PHASE_NAMES = {'lex': 'lexer', 'parse': 'parser', 'check': 'semantic', 'tac': 'tac', 'run': 'vm',
+               'onepass': 'onepass'}
+# stages the one-pass front end does in a single traversal
+FUSED = ('parse', 'check', 'tac')
+
+PHASE_OF = {
+    LexError: 'lex',
+    ParseError: 'parse',
+    SemanticError: 'semantic',
+    RuntimeErrorMC: 'runtime',
+}
+
+
+def error_phase(e: Exception) -> str:
+    for cls, name in PHASE_OF.items():
+        if isinstance(e, cls):
+            return name
+    return 'internal'
+
+
+@dataclass
+class CompileResult:
+    source: str
+    # stages that completed, in order
+    stages: List[str] = field(default_factory=list)
+    tokens: Optional[List[Any]] = None
+    program: Any = None
+    tac: Optional[List[Tuple]] = None
+    # source line of every TAC instruction
+    lines: Optional[List[int]] = None
+    output: str = ''
+    steps: int = 0
+    error: Optional[Exception] = None
+    error_phase: Optional[str] = None
+    # stage -> seconds
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def token_count(self) -> int:
+        """Tokens without the trailing EOF."""
+        return len(self.tokens) - 1 if self.tokens else 0
+
+    def raise_error(self) -> None:
+        if self.error is not None:
+            raise self.error
+
+
+class Compiler:
+    def __init__(self, until: str = 'run', opt_level: int = 0, hash_cons: bool = False,
+                 limits=None, one_pass: bool = False):
+        if until not in STAGES:
+            raise ValueError(f"unknown stage {until!r}; choose from {', '.join(STAGES)}")
+        if one_pass and hash_cons:
+            raise ValueError("one_pass builds no AST to hash-cons")
+        self.until = until
+        self.opt_level = opt_level
+        self.hash_cons = hash_cons
+        self.one_pass = one_pass
+        # limits.Limits for the run stage (None = unbounded)
+        self.limits = limits
+
+    def compile(self, source: str, output=None) -> CompileResult:
+        """Run the stages up to ``until``. With an *output* sink the program
+        prints there instead of into ``result.output``."""
+        result = CompileResult(source)
+        for stage in self._plan():
+            if stage == 'run':
+                self._execute(result, output)
+            elif not self._stage(result, stage, getattr(self, f"_{stage}")):
+                break
+        return result
+
+    def compile_file(self, path: str, output=None) -> CompileResult:
+        try:
+            with open(path, 'r') as f:
+                source = f.read()
+        except OSError as e:
+            result = CompileResult('')
+            result.error, result.error_phase = e, 'internal'
+            return result
+        return self.compile(source, output)
+
+    def run(self, result: CompileResult, output=None) -> CompileResult:
+        """Execute a result that got through ``tac``. Returns a new result;
+        *result* itself is left as it was, so it can be cached and run again."""
+        if result.tac is None:
+            if result.error is None:
+                raise ValueError("nothing to run: compile with until='tac' or later")
+            return result
+        stages = [s for s in result.stages if s != 'run']
+        result = replace(result, stages=stages, timings=dict(result.timings),
+                         output='', steps=0, error=None, error_phase=None)
+        self._execute(result, output)
+        return result
+
+    def _plan(self) -> List[str]:
+        stages = list(STAGES[:STAGES.index(self.until) + 1])
+        # parse only: nothing to fuse
+        if self.one_pass and 'check' in stages:
+            stages = ['onepass' if s == 'parse' else s for s in stages if s not in FUSED[1:]]
+        return stages
+
+    def _execute(self, result: CompileResult, output) -> None:
+        capture = output is None
+        if capture:
+            from .sinks import StringSink
+            output = StringSink()
+
+        def execute(res):
+            from .vm import VM
+            vm = VM(res.program, output, self.limits)
+            try:
+                vm.execute(res.tac)
+            finally:
+                res.steps = vm.steps
+                if capture:
+                    res.output = output.getvalue()
+
+        self._stage(result, 'run', execute)
+
+    def _stage(self, result: CompileResult, stage: str, fn) -> bool:
+        t0 = time.perf_counter()
+        try:
+            with phase(PHASE_NAMES[stage]):
+                fn(result)
+        except Exception as e:
+            result.error, result.error_phase = e, error_phase(e)
+            return False
+        finally:
+            result.timings[stage] = time.perf_counter() - t0
+        result.stages.append(stage)
+        return True
+
+    # -----------------------------
+    # Stages (each imports its phase on first use)
+    # -----------------------------
+    def _lex(self, res: CompileResult):
+        from .lexer import Lexer
+        res.tokens = Lexer(res.source).scan_tokens()
+
+    def _parse(self, res: CompileResult):
+        from .parser import Parser
+        res.program = Parser(res.tokens, hash_cons=self.hash_cons).parse()
+
+    def _check(self, res: CompileResult):
+        from .semantic import SemanticAnalyzer
+        SemanticAnalyzer(memoize=self.hash_cons).analyze(res.program)
+
+    def _tac(self, res: CompileResult):
+        from .tac import TACGenerator
+        gen = TACGenerator(memoize=self.hash_cons)
+        res.tac, res.lines = gen.generate(res.program), gen.lines
+        self._optimize(res)
+
+    def _onepass(self, res: CompileResult):
+        from .onepass import OnePassParser
+        parser = OnePassParser(res.tokens)
+        tac = parser.compile()
+        # a check-only compiler stops short of the TAC
+        if self.until != 'check':
+            res.tac, res.lines = tac, parser.lines
+            self._optimize(res)
+
+    def _optimize(self, res: CompileResult):
+        if self.opt_level:
+            from .peephole import optimize_list
+            res.tac, res.lines = optimize_list(res.tac, res.lines, self.opt_level)
@@ -0,0 +1,164 @@
+# src/profiling.py
+"""
+Phase hooks and the ``--profile`` report.
+
+Any code can watch the compiler phases::
+
+    from package.profiling import subscribe
+    unsubscribe = subscribe(on_start=lambda name: ...,
+                            on_end=lambda name, seconds: ...)
+
+Phases are announced with ``with phase('lexer'): ...``; with nobody
+subscribed that costs one list check. ``PhaseProfiler`` is such a subscriber:
+it records wall/CPU time and tracemalloc peak/net allocations per phase and
+can keep a cProfile dump of the slowest phase.
+
+Every run announces its phases, so this module is imported on every start;
+cProfile, tracemalloc and the AST classes are only loaded once a profiler
+or ``count_nodes`` needs them.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+_listeners: List[tuple] = []
+
+
+def subscribe(on_start: Optional[Callable[[str], None]] = None,
+              on_end: Optional[Callable[[str, float], None]] = None) -> Callable[[], None]:
+    """Register phase callbacks; returns a function that removes them."""
+    entry = (on_start, on_end)
+    _listeners.append(entry)
+
+    def unsubscribe():
+        if entry in _listeners:
+            _listeners.remove(entry)
+    return unsubscribe
+
+
+@contextmanager
+def phase(name: str):
+    """Announce one compiler phase to the subscribers."""
+    if not _listeners:
+        yield
+        return
+    for on_start, _ in list(_listeners):
+        if on_start:
+            on_start(name)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        # reverse order so nested subscribers unwind like a stack
+        for _, on_end in reversed(list(_listeners)):
+            if on_end:
+                on_end(name, dt)
+
+
+def count_nodes(node) -> int:
+    """Number of AST nodes (statements + expressions) under *node*."""
+    from .ast_nodes import Expr, Stmt, Program
+    n = 1 if isinstance(node, (Expr, Stmt)) else 0
+    if isinstance(node, (Expr, Stmt, Program)):
+        for v in vars(node).values():
+            if isinstance(v, list):
+                for item in v:
+                    n += count_nodes(item)
+            elif isinstance(v, (Expr, Stmt)):
+                n += count_nodes(v)
+    return n
+
+
+class PhaseProfiler:
+    """Collects per-phase timings and allocations while subscribed."""
+
+    def __init__(self, cprofile: bool = False):
+        self.cprofile = cprofile
+        self.phases: List[Dict] = []
+        self.counts: Dict[str, int] = {}
+        self.error: Optional[str] = None
+        self._open: Dict[str, tuple] = {}
+        self._profiles: Dict[str, 'cProfile.Profile'] = {}
+        self._unsubscribe = None
+        self._started_tracing = False
+
+    def start(self):
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._unsubscribe = subscribe(self._on_start, self._on_end)
+
+    def stop(self):
+        import tracemalloc
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def count(self, key: str, value: int):
+        self.counts[key] = value
+
+    def _on_start(self, name: str):
+        import cProfile
+        import tracemalloc
+        current, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        prof = None
+        if self.cprofile:
+            prof = self._profiles[name] = cProfile.Profile()
+            prof.enable()
+        self._open[name] = (time.perf_counter(), time.process_time(), current, prof)
+
+    def _on_end(self, name: str, _seconds: float):
+        import tracemalloc
+        wall0, cpu0, mem0, prof = self._open.pop(name)
+        if prof is not None:
+            prof.disable()
+        wall = time.perf_counter() - wall0
+        cpu = time.process_time() - cpu0
+        current, peak = tracemalloc.get_traced_memory()
+        self.phases.append({
+            'name': name,
+            'wall_s': wall,
+            'cpu_s': cpu,
+            'alloc_peak_bytes': max(0, peak - mem0),
+            'alloc_net_bytes': current - mem0,
+        })
+
+    def slowest(self) -> Optional[str]:
+        if not self.phases:
+            return None
+        return max(self.phases, key=lambda p: p['wall_s'])['name']
+
+    def dump_cprofile(self, path: str) -> Optional[str]:
+        """Write pstats of the slowest phase to *path*; returns its name."""
+        name = self.slowest()
+        if name is None or name not in self._profiles:
+            return None
+        self._profiles[name].dump_stats(path)
+        return name
+
+    def report(self, **extra) -> Dict:
+        out = {
+            'phases': self.phases,
+            'counts': self.counts,
+            'total': {
+                'wall_s': sum(p['wall_s'] for p in self.phases),
+                'cpu_s': sum(p['cpu_s'] for p in self.phases),
+                'alloc_peak_bytes': max((p['alloc_peak_bytes'] for p in self.phases), default=0),
+            },
+            'slowest_phase': self.slowest(),
+            'error': self.error,
+        }
+        out.update(extra)
+        return out
+
+    def write(self, path: str, **extra):
+        import json
+        with open(path, 'w') as f:
+            json.dump(self.report(**extra), f, indent=2)
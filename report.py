@@ -0,0 +1,97 @@
+# src/report.py
+"""Console formatting shared by the single-file driver and batch mode."""
+
+import json
+import os
+import sys
+
+from .sinks import OutputSink
+
+
+def use_color(stream=None) -> bool:
+    """Colour only on a terminal; NO_COLOR / FORCE_COLOR override."""
+    if os.environ.get("NO_COLOR"):
+        return False
+    if os.environ.get("FORCE_COLOR"):
+        return True
+    stream = stream or sys.stdout
+    return hasattr(stream, "isatty") and stream.isatty()
+
+
+# ====== Simple ANSI Colors ======
+RESET = "\033[0m"
+BOLD = "\033[1m"
+GREEN = "\033[92m"
+RED = "\033[91m"
+CYAN = "\033[96m"
+YELLOW = "\033[93m"
+
+# pipe / file pe escape codes nahi chahiye
+if not use_color():
+    RESET = BOLD = GREEN = RED = CYAN = YELLOW = ""
+
+
+def color_ok_fail(count: int) -> str:
+    """0 ho to green, warna red."""
+    if count == 0:
+        return f"{GREEN}{count}{RESET}"
+    return f"{RED}{count}{RESET}"
+
+
+def print_overall_summary(total_tokens: int, unique_lexemes_count: int,
+                          lex_errors: int, parse_errors: int,
+                          semantic_errors: int, runtime_errors: int,
+                          tac_instr_count: int, vm_executed: str,
+                          vm_ok: bool, programs: int = None) -> None:
+    """OVERALL SUMMARY table; *programs* is only shown in batch mode."""
+    print()
+    print(f"{BOLD}{CYAN}========== OVERALL SUMMARY =========={RESET}")
+    if programs is not None:
+        print(f"PROGRAMS           : {programs}")
+    print(f"TOTAL TOKENS       : {total_tokens}")
+    print(f"UNIQUE LEXEMES     : {unique_lexemes_count}")
+    print(f"LEXICAL ERRORS     : {color_ok_fail(lex_errors)}")
+    print(f"SYNTAX ERRORS      : {color_ok_fail(parse_errors)}")
+    print(f"SEMANTIC ERRORS    : {color_ok_fail(semantic_errors)}")
+    print(f"RUNTIME ERRORS     : {color_ok_fail(runtime_errors)}")
+    print(f"TAC INSTRUCTIONS   : {tac_instr_count}")
+    print(f"VM EXECUTED        : {GREEN if vm_ok else RED}{vm_executed}{RESET}")
+    print(f"{BOLD}{CYAN}====================================={RESET}")
+    print()
+
+
+class NdjsonWriter:
+    """One JSON object per line, written through a single buffer."""
+
+    def __init__(self, stream=None, buffer_size: int = 1 << 16):
+        self.stream = stream or sys.stdout
+        self.buffer_size = buffer_size
+        self._parts = []
+        self._size = 0
+        self._encode = json.JSONEncoder(separators=(",", ":")).encode
+
+    def record(self, type_: str, **fields) -> None:
+        line = self._encode({"type": type_, **fields}) + "\n"
+        self._parts.append(line)
+        self._size += len(line)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._parts:
+            self.stream.write("".join(self._parts))
+            self._parts = []
+            self._size = 0
+        self.stream.flush()
+
+    def output_sink(self) -> "_OutputRecords":
+        """VM output sink turning every printed value into an 'output' record."""
+        return _OutputRecords(self)
+
+
+class _OutputRecords(OutputSink):
+    def __init__(self, writer: NdjsonWriter):
+        self.writer = writer
+
+    def write(self, value) -> None:
+        self.writer.record("output", text=f"{value}")
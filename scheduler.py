@@ -0,0 +1,216 @@
+# src/scheduler.py
+"""
+Cooperative scheduler: many MC programs time-sliced inside one process.
+
+Each task is a paused ``vm.TACExecution`` (a pc, two dicts and a counter),
+so thousands of them fit in memory and a switch is one method call. The
+scheduler resumes the most urgent task for ``quantum`` instructions, then
+puts it back in the queue: higher ``priority`` runs first, equal priorities
+take turns round-robin.
+
+    sched = Scheduler(quantum=2000)
+    task = sched.spawn(tac)          # or sched.spawn_source("start ... end")
+    sched.run()                      # or: await sched.run_async()
+    task.output.getvalue()
+
+``run_async`` yields to the event loop after every slice, so compile
+requests, sockets and other coroutines keep being served while programs
+run; ``await sched.wait(task)`` waits for one task.
+
+    python -m package.scheduler demo1.mc demo10_max_two.mc --copies 1000
+"""
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, List, Optional
+
+from .lexer import Lexer
+from .parser import Parser
+from .semantic import SemanticAnalyzer
+from .tac import TACGenerator
+from .vm import VM, TACExecution, tac_labels
+from .sinks import OutputSink, StringSink
+from .limits import Limits
+
+DEFAULT_QUANTUM = 1000
+
+
+class Task:
+    """One scheduled program. ``error`` is set if it failed."""
+
+    __slots__ = ('id', 'name', 'priority', 'run', 'output', 'error', 'slices',
+                 'waiter')
+
+    def __init__(self, id: int, name: str, priority: int, run: TACExecution,
+                 output: OutputSink):
+        self.id = id
+        self.name = name
+        self.priority = priority
+        self.run = run
+        self.output = output
+        self.error: Optional[Exception] = None
+        self.slices = 0
+        self.waiter: Optional[asyncio.Future] = None
+
+    @property
+    def done(self) -> bool:
+        return self.run.finished or self.error is not None
+
+    @property
+    def steps(self) -> int:
+        return self.run.done
+
+    def __repr__(self):
+        state = 'failed' if self.error else 'done' if self.run.finished else 'ready'
+        return f"<Task {self.id} {self.name!r} {state} steps={self.steps}>"
+
+
+class Scheduler:
+    def __init__(self, quantum: int = DEFAULT_QUANTUM, limits: Optional[Limits] = None):
+        self.quantum = quantum
+        # default budget for every task spawned without its own
+        self.limits = limits
+        # (-priority, turn, task): turn keeps equal priorities in FIFO order
+        self._ready: List = []
+        self._turn = itertools.count()
+        self._ids = itertools.count(1)
+        self._wakeup: Optional[asyncio.Event] = None
+        self.switches = 0
+        self.completed = 0
+
+    def __len__(self):
+        return len(self._ready)
+
+    # -----------------------------
+    # Spawning
+    # -----------------------------
+    def spawn(self, tac, priority: int = 0, output: Optional[OutputSink] = None,
+              limits: Optional[Limits] = None, name: Optional[str] = None,
+              labels: Optional[Dict[str, int]] = None) -> Task:
+        """Queue a compiled program (a TAC list or ``mcb.MCBCode``)."""
+        output = output if output is not None else StringSink()
+        vm = VM(None, output, limits if limits is not None else self.limits)
+        run = vm.start(tac, labels if labels is not None else tac_labels(tac))
+        tid = next(self._ids)
+        task = Task(tid, name or f"task-{tid}", priority, run, output)
+        self._push(task)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return task
+
+    def spawn_source(self, source: str, **kwargs) -> Task:
+        """Compile *source* and queue it; front-end errors raise right here."""
+        program = Parser(Lexer(source).scan_tokens()).parse()
+        SemanticAnalyzer().analyze(program)
+        return self.spawn(TACGenerator().generate(program), **kwargs)
+
+    def _push(self, task: Task) -> None:
+        heapq.heappush(self._ready, (-task.priority, next(self._turn), task))
+
+    # -----------------------------
+    # Running
+    # -----------------------------
+    def step(self) -> Optional[Task]:
+        """Give one slice to the most urgent task; None when nothing is ready."""
+        if not self._ready:
+            return None
+        _prio, _turn, task = heapq.heappop(self._ready)
+        self.switches += 1
+        task.slices += 1
+        try:
+            finished = task.run.resume(self.quantum)
+        except Exception as e:
+            # RuntimeErrorMC / BudgetExceeded / e.g. division by zero
+            task.error = e
+            finished = True
+        if finished:
+            self._finish(task)
+        else:
+            self._push(task)
+        return task
+
+    def _finish(self, task: Task) -> None:
+        task.output.flush()
+        self.completed += 1
+        if task.waiter is not None and not task.waiter.done():
+            task.waiter.set_result(task)
+
+    def run(self) -> int:
+        """Run every queued task to completion; returns how many finished."""
+        start = self.completed
+        while self._ready:
+            self.step()
+        return self.completed - start
+
+    async def run_async(self, forever: bool = False) -> None:
+        """Like ``run`` but yields to the event loop after every slice.
+
+        With *forever* it keeps waiting for new ``spawn`` calls instead of
+        returning when the queue is empty.
+        """
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                if not self._ready:
+                    if not forever:
+                        return
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                self.step()
+                await asyncio.sleep(0)
+        finally:
+            self._wakeup = None
+
+    async def wait(self, task: Task) -> Task:
+        if task.done:
+            return task
+        if task.waiter is None:
+            task.waiter = asyncio.get_running_loop().create_future()
+        return await task.waiter
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run many MC programs interleaved in one process")
+    ap.add_argument("files", nargs="+")
+    ap.add_argument("--copies", type=int, default=1, help="instances of every file")
+    ap.add_argument("--quantum", type=int, default=DEFAULT_QUANTUM,
+                    help="instructions per slice before switching (default %(default)s)")
+    ap.add_argument("--max-steps", type=int, metavar="N", help="per-task step budget")
+    ap.add_argument("--show-output", action="store_true", help="print every task's output")
+    args = ap.parse_args()
+
+    sched = Scheduler(args.quantum, Limits(max_steps=args.max_steps))
+    tasks = []
+    for path in args.files:
+        with open(path) as f:
+            src = f.read()
+        program = Parser(Lexer(src).scan_tokens()).parse()
+        SemanticAnalyzer().analyze(program)
+        tac = TACGenerator().generate(program)
+        labels = tac_labels(tac)
+        for i in range(args.copies):
+            tasks.append(sched.spawn(tac, labels=labels, name=f"{path}#{i}"))
+
+    t0 = time.perf_counter()
+    sched.run()
+    secs = time.perf_counter() - t0
+
+    failed = [t for t in tasks if t.error is not None]
+    if args.show_output:
+        for t in tasks:
+            print(f"--- {t.name} ---")
+            print(t.output.getvalue(), end='')
+            if t.error is not None:
+                print(f"RUNTIME ERROR: {t.error}")
+    steps = sum(t.steps for t in tasks)
+    print(f"{len(tasks)} tasks, {steps} instructions, {sched.switches} slices "
+          f"in {secs * 1000:.1f} ms ({steps / secs if secs else 0:,.0f} instr/s), "
+          f"{len(failed)} failed")
+
+
+if __name__ == "__main__":
+    main()
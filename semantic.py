@@ -4,12 +4,13 @@ from dataclasses import dataclass
 from typing import Dict, Optional
 from .ast_nodes import *
 from .errors import SemanticError
+from .arrays import array_type, array_size, element_type, is_array_type
 
 
 @dataclass
 class Symbol:
     name: str
-    type_name: str  # 'int' or 'float'
+    type_name: str  # 'int', 'float' or an array type like 'int[8]'
 
 
 class Scope:
@@ -41,20 +42,122 @@ def unify_types(t1: str, t2: str) -> str:
     return 'int'
 
 
+def check_assignable(target: str, t: str, name: str):
+    """int <- int; float <- int|float; an array takes an array of the
+    same size with compatible elements, or a scalar (fills it)."""
+    if is_array_type(target):
+        elem = t
+        ok = True
+        if is_array_type(t):
+            elem = element_type(t)
+            ok = array_size(t) == array_size(target)
+        ok = ok and not (element_type(target) == 'int' and elem != 'int')
+    else:
+        ok = not is_array_type(t) and not (target == 'int' and t != 'int')
+    if not ok:
+        raise SemanticError(f"Cannot assign {t} to {target} '{name}'")
+
+
+# -----------------------------
+# Typing rules (one per construct, shared with onepass.py)
+# -----------------------------
+def unary_type(op: str, t: str) -> str:
+    # unary + - preserve type; ! returns int (0/1) for simplicity
+    if op == '!':
+        if is_array_type(t):
+            raise SemanticError(f"Operator '!' needs a scalar operand, got {t}")
+        return 'int'
+    return t
+
+
+def binary_type(op: str, lt: str, rt: str) -> str:
+    if is_array_type(lt) or is_array_type(rt):
+        return array_binary_type(op, lt, rt)
+    if op in ['+', '-', '*', '/']:
+        return unify_types(lt, rt)
+    # comparisons produce int (boolean)
+    if op in ['==', '!=', '<', '<=', '>', '>=']:
+        return 'int'
+    raise SemanticError("Unknown expression type")
+
+
+def array_binary_type(op: str, lt: str, rt: str) -> str:
+    # element-wise arithmetic only; a scalar side applies to every element
+    if op not in ['+', '-', '*', '/']:
+        raise SemanticError(f"Operator '{op}' needs scalar operands, got {lt} and {rt}")
+    sizes = {array_size(t) for t in (lt, rt) if is_array_type(t)}
+    if len(sizes) > 1:
+        raise SemanticError(f"Array size mismatch: {lt} {op} {rt}")
+    elems = [element_type(t) if is_array_type(t) else t for t in (lt, rt)]
+    # '/' gives floats, as it does at runtime
+    elem = 'float' if op == '/' else unify_types(*elems)
+    return array_type(elem, sizes.pop())
+
+
+def indexed_type(name: str, t: str) -> str:
+    """Element type of ``name[...]`` for a variable of type *t*."""
+    if not is_array_type(t):
+        raise SemanticError(f"'{name}' is not an array")
+    return element_type(t)
+
+
+def check_index(t: str):
+    if t != 'int':
+        raise SemanticError(f"Array index must be int, got {t}")
+
+
+def reduce_type(op: str, t: str) -> str:
+    if not is_array_type(t):
+        raise SemanticError(f"{op}() needs an array, got {t}")
+    return element_type(t)
+
+
+def check_cond(t: str):
+    if is_array_type(t):
+        raise SemanticError(f"Condition must be a scalar, got {t}")
+
+
+# summary marker: the type needs a full check (array element or reduction)
+_PLAIN = 'plain'
+
+
 class SemanticAnalyzer:
     """
     Proper semantic analyzer class.
     main.py yehi naam import karta hai.
     """
 
-    def __init__(self):
-        # future me yahan symbol-table waghera rakh sakti ho
-        pass
+    def __init__(self, memoize: bool = False):
+        # memoize: expression summaries per node (pays off on a hash-consed
+        # AST, where one node stands for many occurrences)
+        self.memoize = memoize
+        self._summaries: Dict[int, tuple] = {}
 
     def analyze(self, program: Program):
         """Entry point from main.py"""
+        self._summaries = {}
         self._check_program(program, Scope())
 
+    def check_statements(self, stmts, scope: Scope):
+        """Check statements against an existing scope (incremental mode)."""
+        for st in stmts:
+            self._check_stmt(st, scope)
+
+    def iter_checked(self, stmts):
+        """Check a stream of top-level statements, passing each one on."""
+        self._summaries = {}
+        scope = Scope()
+        for st in stmts:
+            try:
+                self._check_stmt(st, scope)
+            except SemanticError:
+                # error path only: as with Parser.parse + analyze, a syntax
+                # error further on is reported first
+                for _ in stmts:
+                    pass
+                raise
+            yield st
+
     # -----------------------------
     # Program / Block helpers
     # -----------------------------
@@ -73,25 +176,31 @@ class SemanticAnalyzer:
     # -----------------------------
     def _check_stmt(self, st: Stmt, scope: Scope):
         if isinstance(st, VarDecl):
-            scope.declare(st.name, st.type_name)
+            # initializer sees the outer binding, as it does at runtime
             if st.init is not None:
                 t = self._check_expr(st.init, scope)
-                # assignment compatibility: int <- int; float <- int|float
-                if st.type_name == 'int' and t != 'int':
-                    raise SemanticError(f"Cannot assign {t} to int '{st.name}'")
+                check_assignable(st.type_name, t, st.name)
+            scope.declare(st.name, st.type_name)
+
+        elif isinstance(st, ArrayDecl):
+            scope.declare(st.name, array_type(st.type_name, st.size))
 
         elif isinstance(st, Assign):
             sym = scope.resolve(st.name)
             t = self._check_expr(st.value, scope)
-            if sym.type_name == 'int' and t != 'int':
-                raise SemanticError(f"Cannot assign {t} to int '{st.name}'")
+            check_assignable(sym.type_name, t, st.name)
+
+        elif isinstance(st, IndexAssign):
+            elem = self._check_index(st.name, st.index, scope)
+            t = self._check_expr(st.value, scope)
+            check_assignable(elem, t, st.name)
 
         elif isinstance(st, Print):
             self._check_expr(st.expr, scope)
 
         elif isinstance(st, If):
             # condition
-            self._check_expr(st.cond, scope)
+            self._check_cond(st.cond, scope)
 
             # then branch
             if isinstance(st.then_branch, Block):
@@ -108,7 +217,7 @@ class SemanticAnalyzer:
 
         elif isinstance(st, While):
             # condition
-            self._check_expr(st.cond, scope)
+            self._check_cond(st.cond, scope)
 
             # loop body
             if isinstance(st.body, Block):
@@ -122,10 +231,24 @@ class SemanticAnalyzer:
         else:
             raise SemanticError("Unknown statement type")
 
+    def _check_cond(self, e: Expr, scope: Scope):
+        check_cond(self._check_expr(e, scope))
+
+    def _check_index(self, name: str, index: Expr, scope: Scope) -> str:
+        """Element type of ``name[index]``."""
+        elem = indexed_type(name, scope.resolve(name).type_name)
+        check_index(self._check_expr(index, scope))
+        return elem
+
     # -----------------------------
     # Expressions
     # -----------------------------
     def _check_expr(self, e: Expr, scope: Scope) -> str:
+        if self.memoize:
+            return self._check_expr_memo(e, scope)
+        return self._check_node(e, scope)
+
+    def _check_node(self, e: Expr, scope: Scope) -> str:
         if isinstance(e, Literal):
             return type_of_literal(e.value)
 
@@ -134,21 +257,89 @@ class SemanticAnalyzer:
             return sym.type_name
 
         if isinstance(e, Unary):
-            t = self._check_expr(e.right, scope)
-            # unary + - preserve type; ! returns int (0/1) for simplicity
-            if e.op == '!':
-                return 'int'
-            return t
+            return unary_type(e.op, self._check_node(e.right, scope))
 
         if isinstance(e, Binary):
-            lt = self._check_expr(e.left, scope)
-            rt = self._check_expr(e.right, scope)
+            lt = self._check_node(e.left, scope)
+            rt = self._check_node(e.right, scope)
+            return binary_type(e.op, lt, rt)
 
-            if e.op in ['+', '-', '*', '/']:
-                return unify_types(lt, rt)
+        if isinstance(e, Index):
+            return self._check_index(e.name, e.index, scope)
 
-            # comparisons produce int (boolean)
-            if e.op in ['==', '!=', '<', '<=', '>', '>=']:
-                return 'int'
+        if isinstance(e, Reduce):
+            return reduce_type(e.op, self._check_node(e.arg, scope))
 
         raise SemanticError("Unknown expression type")
+
+    # -----------------------------
+    # Memoised expressions
+    # -----------------------------
+    # An expression's type only depends on which of its variables are
+    # float, so each node is summarised once, independent of scope, as
+    # (fixed type or None, names that make it float, all names in DFS order).
+    # Checking an occurrence then only resolves those names; the first
+    # undeclared one is the same one the plain tree walk would report.
+    # Expressions involving arrays are not summarised: they take the plain
+    # walk, which also produces the array-specific diagnostics.
+    def _check_expr_memo(self, e: Expr, scope: Scope) -> str:
+        fixed, float_names, names = self._summary(e)
+        syms = {n: scope.resolve(n) for n in names}
+        if fixed == _PLAIN or any(is_array_type(s.type_name) for s in syms.values()):
+            return self._check_node(e, scope)
+        if fixed is not None:
+            return fixed
+        if any(syms[n].type_name == 'float' for n in float_names):
+            return 'float'
+        return 'int'
+
+    def _summary(self, e: Expr) -> tuple:
+        hit = self._summaries.get(id(e))
+        if hit is not None:
+            return hit[1]
+        if isinstance(e, Literal):
+            s = (type_of_literal(e.value), (), ())
+        elif isinstance(e, Var):
+            s = (None, (e.name,), (e.name,))
+        elif isinstance(e, Unary):
+            fixed, float_names, names = self._summary(e.right)
+            if e.op == '!' and fixed != _PLAIN:
+                s = ('int', (), names)
+            else:
+                s = (fixed, float_names, names)
+        elif isinstance(e, Index):
+            _f, _fn, names = self._summary(e.index)
+            s = (_PLAIN, (), _merge_names((e.name,), names))
+        elif isinstance(e, Reduce):
+            s = (_PLAIN, (), self._summary(e.arg)[2])
+        elif isinstance(e, Binary):
+            lf, lfn, ln = self._summary(e.left)
+            rf, rfn, rn = self._summary(e.right)
+            names = _merge_names(ln, rn)
+            if _PLAIN in (lf, rf):
+                s = (_PLAIN, (), names)
+            elif e.op in ['+', '-', '*', '/']:
+                float_names = _merge_names(lfn, rfn)
+                if lf == 'float' or rf == 'float':
+                    s = ('float', (), names)
+                elif not float_names:
+                    s = ('int', (), names)
+                else:
+                    s = (None, float_names, names)
+            elif e.op in ['==', '!=', '<', '<=', '>', '>=']:
+                s = ('int', (), names)
+            else:
+                raise SemanticError("Unknown expression type")
+        else:
+            raise SemanticError("Unknown expression type")
+        # the node is kept alongside so its id cannot be reused
+        self._summaries[id(e)] = (e, s)
+        return s
+
+
+def _merge_names(a: tuple, b: tuple) -> tuple:
+    if not b:
+        return a
+    if not a:
+        return b
+    return a + tuple(n for n in b if n not in a)
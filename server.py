@@ -0,0 +1,169 @@
+# src/server.py
+"""
+Long-lived compile/check/run server.
+
+Protocol: one JSON object per line in each direction, e.g.::
+
+    -> {"id": 1, "op": "run", "source": "start print(1); end"}
+    <- {"id": 1, "ok": true, "op": "run", "tokens": 6, "tac_instructions": 2,
+        "output": "1\\n", "cached": false}
+
+``op`` is one of ``check``, ``compile``, ``run`` or ``stats``; ``path`` may
+be sent instead of ``source``. Failures come back as
+``{"ok": false, "error": {"phase": ..., "message": ...}}``; a run that hits
+its step/time/memory budget fails with phase ``runtime``. Requests on one
+connection are answered in order; connections are served concurrently.
+The front end runs on the event loop (it is cheap and usually cached);
+``run`` executes in a worker thread so one long program does not stall
+every other connection. Front-end results are kept in an LRU cache keyed by source text.
+
+    python -m package.server --port 8765
+    python -m package.server --unix /tmp/mc.sock
+"""
+
+import argparse
+import asyncio
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .pipeline import Compiler, CompileResult
+from .limits import Limits, parse_size
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# one request line may carry a whole program
+LINE_LIMIT = 16 * 1024 * 1024
+
+
+class CompileServer:
+    def __init__(self, cache_size: int = 256, limits: Optional[Limits] = None):
+        self.cache_size = cache_size
+        # applied to every 'run'; a runaway program must not hold a worker forever
+        self.limits = limits
+        self.compiler = Compiler(until='tac', limits=limits)
+        self.cache: 'OrderedDict[str, CompileResult]' = OrderedDict()
+        self.requests = 0
+        self.hits = 0
+
+    # -----------------------------
+    # Compilation (sync, warm cache)
+    # -----------------------------
+    def _compile(self, source: str) -> Tuple[CompileResult, bool]:
+        entry = self.cache.get(source)
+        if entry is not None:
+            self.cache.move_to_end(source)
+            self.hits += 1
+            return entry, True
+        entry = self.compiler.compile(source)
+        self.cache[source] = entry
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return entry, False
+
+    async def handle(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one decoded request; only ``run`` leaves the event loop."""
+        self.requests += 1
+        op = req.get('op')
+        resp: Dict[str, Any] = {'id': req.get('id'), 'op': op}
+        if op == 'stats':
+            resp.update(ok=True, requests=self.requests, cache_hits=self.hits,
+                        cache_entries=len(self.cache))
+            return resp
+        if op not in ('check', 'compile', 'run'):
+            return self._fail(resp, 'request', f"unknown op {op!r}")
+
+        source = req.get('source')
+        if source is None:
+            if 'path' not in req:
+                return self._fail(resp, 'request', "'source' or 'path' required")
+            try:
+                with open(req['path'], 'r') as f:
+                    source = f.read()
+            except OSError as e:
+                return self._fail(resp, 'request', str(e))
+
+        entry, cached = self._compile(source)
+        resp.update(tokens=entry.token_count, cached=cached)
+        if entry.error is not None:
+            return self._fail(resp, entry.error_phase, str(entry.error))
+        resp['tac_instructions'] = len(entry.tac)
+        if op == 'compile':
+            resp['tac'] = [list(ins) for ins in entry.tac]
+        elif op == 'run':
+            # Compiler.run copies the cached entry, so it is safe off-loop
+            loop = asyncio.get_running_loop()
+            ran = await loop.run_in_executor(None, self.compiler.run, entry)
+            resp['output'] = ran.output
+            if ran.error is not None:
+                return self._fail(resp, ran.error_phase, str(ran.error))
+        resp['ok'] = True
+        return resp
+
+    @staticmethod
+    def _fail(resp, phase, message):
+        resp.update(ok=False, error={'phase': phase, 'message': message})
+        return resp
+
+    # -----------------------------
+    # asyncio transport
+    # -----------------------------
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    req = json.loads(line)
+                    if not isinstance(req, dict):
+                        raise ValueError('request must be a JSON object')
+                except ValueError as e:
+                    resp = self._fail({'id': None}, 'request', f"bad JSON: {e}")
+                else:
+                    resp = await self.handle(req)
+                writer.write(json.dumps(resp).encode('utf-8') + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                    unix_path: Optional[str] = None) -> asyncio.AbstractServer:
+        if unix_path:
+            return await asyncio.start_unix_server(self._client, path=unix_path, limit=LINE_LIMIT)
+        return await asyncio.start_server(self._client, host, port, limit=LINE_LIMIT)
+
+    async def serve_forever(self, **kwargs):
+        server = await self.start(**kwargs)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Warm compile/run server for MC programs")
+    ap.add_argument("--host", default=DEFAULT_HOST)
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    ap.add_argument("--cache-size", type=int, default=256, help="compiled programs kept warm")
+    ap.add_argument("--max-steps", type=int, default=10_000_000, metavar="N",
+                    help="TAC instructions one run may execute (default 10M)")
+    ap.add_argument("--timeout", type=float, default=5.0, metavar="SECONDS",
+                    help="wall-clock limit per run (default 5)")
+    ap.add_argument("--max-memory", type=parse_size, default=64 << 20, metavar="BYTES",
+                    help="memory held by one run's variables (default 64M)")
+    args = ap.parse_args()
+
+    limits = Limits(args.max_steps, args.timeout, args.max_memory)
+    srv = CompileServer(args.cache_size, limits)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"MC server listening on {where}", flush=True)
+    try:
+        asyncio.run(srv.serve_forever(host=args.host, port=args.port, unix_path=args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
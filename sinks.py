@@ -0,0 +1,93 @@
+# src/sinks.py
+"""
+Output sinks for the MC ``print`` statement.
+
+The VM hands every printed value to ``sink.write(value)`` and calls
+``sink.flush()`` when a run ends (normally or with an error). Text is
+always ``str(value) + '\\n'``, i.e. exactly what ``print(value)`` produced.
+"""
+
+import io
+import sys
+from typing import Any, List
+
+
+class OutputSink:
+    def write(self, value: Any) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+    def pending(self) -> List[Any]:
+        """Values written but not delivered yet (kept in VM snapshots)."""
+        return []
+
+
+class StdoutSink(OutputSink):
+    """Collects lines and writes them to stdout in large chunks.
+
+    The stream is looked up at flush time, so ``contextlib.redirect_stdout``
+    around a run still works.
+    """
+
+    def __init__(self, stream=None, buffer_size: int = 1 << 16):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self._parts: List[str] = []
+        self._size = 0
+
+    def write(self, value: Any) -> None:
+        line = f"{value}\n"
+        self._parts.append(line)
+        self._size += len(line)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._parts:
+            stream = self.stream or sys.stdout
+            stream.write(''.join(self._parts))
+            stream.flush()
+            self._parts = []
+            self._size = 0
+
+    def pending(self) -> List[Any]:
+        return [line[:-1] for line in self._parts]
+
+
+class ListSink(OutputSink):
+    """Keeps the printed values themselves (no formatting)."""
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self.write = self.values.append
+
+    def text(self) -> str:
+        return ''.join(f"{v}\n" for v in self.values)
+
+    def pending(self) -> List[Any]:
+        return list(self.values)
+
+
+class StringSink(OutputSink):
+    """Captures the printed text in an ``io.StringIO``."""
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+
+    def write(self, value: Any) -> None:
+        self.buffer.write(f"{value}\n")
+
+    def getvalue(self) -> str:
+        return self.buffer.getvalue()
+
+    def pending(self) -> List[Any]:
+        return self.getvalue().splitlines()
+
+
+class NullSink(OutputSink):
+    """Discards output; for benchmarking the interpreter itself."""
+
+    def write(self, value: Any) -> None:
+        pass
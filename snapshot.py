@@ -0,0 +1,248 @@
+# src/snapshot.py
+"""
+VM snapshots (.mcs): checkpoint a paused TAC run and resume it later.
+
+Layout, all little endian::
+
+    header   b'MCS\\0', u16 version, u16 flags, u32 pc, u64 steps,
+             3 x (u32 offset, u32 size) for program, variables, output
+    program  the program itself as an embedded .mcb image (see mcb.py)
+    vars     u32 count, then per slot: u16 length + utf-8 name,
+             u8 type (0 = temporary, 1 = int, 2 = float; element type for
+             arrays), value
+    output   u32 count, then one value per line not yet delivered
+
+Values use the .mcb constant encoding plus two tags of its own: a string
+(output lines) and an array (u8 type code, u32 length, raw little endian
+elements).
+A snapshot carries its own code, so ``python -m package.main state.mcs``
+continues a run without the source.
+
+A run can only be paused at a loop back-edge (``TACExecution.resume``), so
+that is where checkpoints are taken: every N steps or seconds, or when
+SIGUSR1 arrives (``run_with_checkpoints``). The output sink is flushed
+before each checkpoint, so only sinks that capture output (``ListSink``,
+``StringSink``) leave anything pending; output written between the last
+checkpoint and a crash is printed again after resuming.
+
+A snapshot can be resumed any number of times, e.g. to run an expensive
+common prefix once and fork many runs from it.
+"""
+
+import os
+import signal
+import struct
+import sys
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from .errors import SnapshotError, MCBError
+from .mcb import COUNT, encode_mcb, loads_mcb, decode_const, _encode_const
+from .sinks import OutputSink, StdoutSink
+from .limits import Limits
+from .vm import TACExecution, tac_labels
+
+MAGIC = b'MCS\0'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIQ6I')
+
+TYPE_CODES = {None: 0, 'int': 1, 'float': 2}
+TYPE_NAMES = {v: k for k, v in TYPE_CODES.items()}
+# output lines may be text (from StdoutSink); numbers use the mcb tags
+C_STR = 3
+C_ARRAY = 4
+# kill -USR1 <pid> asks a running program for a checkpoint (POSIX only)
+CHECKPOINT_SIGNAL = getattr(signal, 'SIGUSR1', None)
+
+
+def _encode_value(v) -> bytes:
+    if isinstance(v, str):
+        raw = v.encode('utf-8')
+        return struct.pack('<BI', C_STR, len(raw)) + raw
+    if isinstance(v, array):
+        if sys.byteorder == 'big':
+            v = array(v.typecode, v)
+            v.byteswap()
+        return struct.pack('<BcI', C_ARRAY, v.typecode.encode('ascii'), len(v)) + v.tobytes()
+    return _encode_const(v)
+
+
+def _decode_value(buf, pos: int) -> Tuple[Any, int]:
+    if buf[pos] == C_STR:
+        (n,) = COUNT.unpack_from(buf, pos + 1)
+        pos += 1 + COUNT.size
+        return bytes(buf[pos:pos + n]).decode('utf-8'), pos + n
+    if buf[pos] == C_ARRAY:
+        code, n = struct.unpack_from('<cI', buf, pos + 1)
+        pos += 6
+        arr = array(code.decode('ascii'))
+        arr.frombytes(bytes(buf[pos:pos + n * arr.itemsize]))
+        if sys.byteorder == 'big':
+            arr.byteswap()
+        return arr, pos + n * arr.itemsize
+    return decode_const(buf, pos)
+
+
+def encode_snapshot(run: TACExecution, lines=None) -> bytes:
+    """Serialise a paused (or finished) run, including its code."""
+    try:
+        program = encode_mcb(list(run.tac), lines)
+    except MCBError as e:
+        raise SnapshotError(f"Cannot embed program: {e}") from None
+
+    var_sec = bytearray(COUNT.pack(len(run.values)))
+    for name, value in run.values.items():
+        raw = name.encode('utf-8')
+        var_sec += struct.pack('<HB', len(raw), TYPE_CODES[run.types.get(name)]) + raw
+        var_sec += _encode_value(value)
+
+    pending = run.output.pending()
+    out_sec = bytearray(COUNT.pack(len(pending)))
+    for v in pending:
+        out_sec += _encode_value(v)
+
+    sections = [program, bytes(var_sec), bytes(out_sec)]
+    offsets = []
+    pos = HEADER.size
+    for sec in sections:
+        offsets += [pos, len(sec)]
+        pos += len(sec)
+    header = HEADER.pack(MAGIC, VERSION, 0, run.pc, run.done, *offsets)
+    return header + b''.join(sections)
+
+
+def write_snapshot(path: str, run: TACExecution, lines=None) -> int:
+    """Write atomically (temp file + rename), so a crash mid-write keeps
+    the previous checkpoint. Returns the number of bytes written."""
+    data = encode_snapshot(run, lines)
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError as e:
+        raise SnapshotError(f"Cannot write snapshot: {e}") from None
+    return len(data)
+
+
+class Snapshot:
+    """A decoded snapshot; ``resume()`` turns it back into a live run."""
+
+    def __init__(self, buf):
+        if len(buf) < HEADER.size:
+            raise SnapshotError("File too small to be a VM snapshot")
+        magic, version, self.flags, self.pc, self.steps, *offsets = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise SnapshotError("Not a VM snapshot (bad magic)")
+        if version != VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version} (expected {VERSION})")
+        p_off, p_len, v_off, _v_len, o_off, _o_len = offsets
+        try:
+            self.program = loads_mcb(bytes(buf[p_off:p_off + p_len]))
+            # decode once; every resume shares the same instruction list
+            self.code = list(self.program.code)
+            self.values: Dict[str, Any] = {}
+            self.types: Dict[str, str] = {}
+            (count,) = COUNT.unpack_from(buf, v_off)
+            pos = v_off + COUNT.size
+            for _ in range(count):
+                n, tcode = struct.unpack_from('<HB', buf, pos)
+                pos += 3
+                name = bytes(buf[pos:pos + n]).decode('utf-8')
+                pos += n
+                self.values[name], pos = _decode_value(buf, pos)
+                if tcode:
+                    self.types[name] = TYPE_NAMES[tcode]
+            (count,) = COUNT.unpack_from(buf, o_off)
+            pos = o_off + COUNT.size
+            self.pending: List[Any] = []
+            for _ in range(count):
+                value, pos = _decode_value(buf, pos)
+                self.pending.append(value)
+        except (struct.error, KeyError, ValueError, MCBError) as e:
+            raise SnapshotError(f"Corrupt snapshot: {e}") from None
+        if self.pc > len(self.code):
+            raise SnapshotError("Corrupt snapshot: pc past the end of the code")
+        self.labels = tac_labels(self.code)
+
+    @property
+    def lines(self) -> List[int]:
+        return self.program.lines
+
+    def resume(self, output: Optional[OutputSink] = None,
+               limits: Optional[Limits] = None) -> TACExecution:
+        """A fresh run continuing from this snapshot (callable many times).
+
+        Pending output is written to *output* first. The step count carries
+        over, so ``max_steps`` covers the run as a whole; the time and memory
+        budgets start over.
+        """
+        output = output if output is not None else StdoutSink()
+        limits = limits if limits is not None and limits.any() else None
+        run = TACExecution(self.code, self.labels, output, limits)
+        run.values.update(self.values)
+        # arrays are mutable: every resume starts from the saved contents
+        for name, v in self.values.items():
+            if isinstance(v, array):
+                run.values[name] = array(v.typecode, v)
+        run.types.update(self.types)
+        run.pc = self.pc
+        run.done = self.steps
+        for v in self.pending:
+            output.write(v)
+        return run
+
+
+def loads_snapshot(data: bytes) -> Snapshot:
+    return Snapshot(memoryview(data))
+
+
+def load_snapshot(path: str) -> Snapshot:
+    with open(path, 'rb') as f:
+        return Snapshot(memoryview(f.read()))
+
+
+def run_with_checkpoints(run: TACExecution, path: str, every_steps: Optional[int] = None,
+                         every_seconds: Optional[float] = None,
+                         on_signal: Optional[int] = CHECKPOINT_SIGNAL,
+                         quantum: int = 10_000, lines=None) -> int:
+    """Run to completion, writing *path* at back-edges as configured.
+
+    Without a period only *on_signal* triggers a checkpoint. Returns the
+    number of checkpoints written.
+    """
+    requested = [False]
+    old_handler = None
+    if on_signal is not None:
+        def handler(_signum, _frame):
+            requested[0] = True
+        try:
+            old_handler = signal.signal(on_signal, handler)
+        except ValueError:
+            # not the main thread: periodic checkpoints only
+            on_signal = None
+
+    slice_steps = min(x for x in (every_steps, quantum) if x)
+    next_steps = run.done + every_steps if every_steps else None
+    next_time = time.monotonic() + every_seconds if every_seconds else None
+    written = 0
+    try:
+        while not run.resume(slice_steps):
+            due = requested[0]
+            if next_steps is not None and run.done >= next_steps:
+                due = True
+                next_steps = run.done + every_steps
+            if next_time is not None and time.monotonic() >= next_time:
+                due = True
+                next_time = time.monotonic() + every_seconds
+            if due:
+                requested[0] = False
+                # deliver what is buffered so it is neither lost nor replayed
+                run.output.flush()
+                write_snapshot(path, run, lines)
+                written += 1
+    finally:
+        if on_signal is not None:
+            signal.signal(on_signal, old_handler)
+    return written
@@ -1,97 +1,227 @@
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Set, Tuple
 from .ast_nodes import *
 
 
 class TACGenerator:
-   
-    def __init__(self):
-        pass
-    def generate(self, program):
+
+    def __init__(self, memoize: bool = False):
+        # memoize: inside one expression a shared (hash-consed) node is
+        # lowered once and its temp reused; expressions have no side effects
+        self.memoize = memoize
+        self._expr_temps = None
+        if not memoize:
+            # no per-node memo lookups on the normal path
+            self._lower_expr = self._lower_node
+        self._reset()
+
+    def _reset(self):
         self.code: List[Tuple] = []
+        # source line of every instruction in self.code (0 = unknown)
+        self.lines: List[int] = []
+        self.cur_line = 0
         self.temp_id = 0
         self.label_id = 0
+        # source name -> TAC name, one dict per open block
+        self.scopes: List[Dict[str, str]] = [{}]
+        self.shadow_id = 0
+        # TAC names (variables and temps) currently holding a whole array;
+        # decides between scalar and element-wise instructions
+        self.arrays: Set[str] = set()
 
+    def generate(self, program):
+        """Lower *program* to a fresh TAC list."""
+        self._reset()
+        return self.gen(program)
+
+    # temps live in the same namespace as variables at runtime, so they get
+    # a name no MC identifier can have ('$1'), like shadowed names ('x.1')
     def new_temp(self):
         self.temp_id += 1
-        return f"t{self.temp_id}"
+        return f"${self.temp_id}"
 
     def new_label(self, base='L'):
         self.label_id += 1
         return f"{base}{self.label_id}"
 
+    # TAC is flat, so a declaration that shadows an outer variable gets its
+    # own name ('x.1'); '.' can never appear in an MC identifier.
+    def _declare(self, name: str) -> str:
+        tac_name = name
+        if any(name in scope for scope in self.scopes):
+            self.shadow_id += 1
+            tac_name = f"{name}.{self.shadow_id}"
+        self.scopes[-1][name] = tac_name
+        return tac_name
+
+    def _resolve(self, name: str) -> str:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return name
+
     def gen(self, prog: Program) -> List[Tuple]:
         for st in prog.statements:
             self._emit_stmt(st)
         return self.code
 
+    def iter_statements(self, stmts) -> Iterator[Tuple[List[Tuple], List[int]]]:
+        """Lower top-level statements one by one, yielding (code, lines) for
+        each. Only the current statement's TAC is held in memory."""
+        self._reset()
+        for st in stmts:
+            self.code = []
+            self.lines = []
+            self._emit_stmt(st)
+            yield self.code, self.lines
+
+    def stream(self, stmts) -> Iterator[Tuple[Tuple, int]]:
+        """(instruction, source line) pairs, e.g. for ``peephole.optimize``
+        or ``mcb.write_mcb_stream``."""
+        for code, lines in self.iter_statements(stmts):
+            yield from zip(code, lines)
+
+    def gen_stmt(self, st: Stmt) -> List[Tuple]:
+        """Lower one statement on its own; temp/label numbering carries on."""
+        self.code = []
+        self.lines = []
+        self._emit_stmt(st)
+        return self.code
+
+    def _emit(self, ins: Tuple):
+        self.code.append(ins)
+        self.lines.append(self.cur_line)
+
     def _emit_stmt(self, st: Stmt):
+        outer_line = self.cur_line
+        self.cur_line = st.line or outer_line
+        try:
+            self._lower_stmt(st)
+        finally:
+            self.cur_line = outer_line
+
+    def _lower_stmt(self, st: Stmt):
         if isinstance(st, VarDecl):
-            if st.init is not None:
-                rhs = self._emit_expr(st.init)
-                self.code.append(('=', rhs, None, st.name))
-            else:
-                # declaration no-op for TAC
-                pass
+            # initializer sees the outer binding, so lower it first
+            rhs = self._emit_expr(st.init) if st.init is not None else None
+            name = self._declare(st.name)
+            self.arrays.discard(name)
+            self._emit(('decl', st.type_name, rhs, name))
+        elif isinstance(st, ArrayDecl):
+            name = self._declare(st.name)
+            self.arrays.add(name)
+            self._emit(('array', st.type_name, st.size, name))
         elif isinstance(st, Assign):
             rhs = self._emit_expr(st.value)
-            self.code.append(('=', rhs, None, st.name))
+            name = self._resolve(st.name)
+            # arrays are copied (or filled, from a scalar) in place
+            self._emit(('vassign' if name in self.arrays else '=', rhs, None, name))
+        elif isinstance(st, IndexAssign):
+            index = self._emit_expr(st.index)
+            rhs = self._emit_expr(st.value)
+            self._emit(('store_index', rhs, index, self._resolve(st.name)))
         elif isinstance(st, Print):
             v = self._emit_expr(st.expr)
-            self.code.append(('print', v, None, None))
+            self._emit(('vprint' if v in self.arrays else 'print', v, None, None))
         elif isinstance(st, If):
             cond = self._emit_expr(st.cond)
             Ltrue = self.new_label('L')
             Lend = self.new_label('L')
             if st.else_branch:
                 Lfalse = self.new_label('L')
-                self.code.append(('if_goto', cond, None, Ltrue))
-                self.code.append(('goto', None, None, Lfalse))
-                self.code.append(('label', None, None, Ltrue))
+                self._emit(('if_goto', cond, None, Ltrue))
+                self._emit(('goto', None, None, Lfalse))
+                self._emit(('label', None, None, Ltrue))
                 self._emit_stmt(st.then_branch)
-                self.code.append(('goto', None, None, Lend))
-                self.code.append(('label', None, None, Lfalse))
+                self._emit(('goto', None, None, Lend))
+                self._emit(('label', None, None, Lfalse))
                 self._emit_stmt(st.else_branch)
-                self.code.append(('label', None, None, Lend))
+                self._emit(('label', None, None, Lend))
             else:
-                self.code.append(('if_goto', cond, None, Ltrue))
-                self.code.append(('goto', None, None, Lend))
-                self.code.append(('label', None, None, Ltrue))
+                self._emit(('if_goto', cond, None, Ltrue))
+                self._emit(('goto', None, None, Lend))
+                self._emit(('label', None, None, Ltrue))
                 self._emit_stmt(st.then_branch)
-                self.code.append(('label', None, None, Lend))
+                self._emit(('label', None, None, Lend))
         elif isinstance(st, While):
             Lstart = self.new_label('L')
             Lbody = self.new_label('L')
             Lend = self.new_label('L')
-            self.code.append(('label', None, None, Lstart))
+            self._emit(('label', None, None, Lstart))
             cond = self._emit_expr(st.cond)
-            self.code.append(('if_goto', cond, None, Lbody))
-            self.code.append(('goto', None, None, Lend))
-            self.code.append(('label', None, None, Lbody))
+            self._emit(('if_goto', cond, None, Lbody))
+            self._emit(('goto', None, None, Lend))
+            self._emit(('label', None, None, Lbody))
             self._emit_stmt(st.body)
-            self.code.append(('goto', None, None, Lstart))
-            self.code.append(('label', None, None, Lend))
+            self._emit(('goto', None, None, Lstart))
+            self._emit(('label', None, None, Lend))
         elif isinstance(st, Block):
-            for s in st.statements:
-                self._emit_stmt(s)
+            self.scopes.append({})
+            try:
+                for s in st.statements:
+                    self._emit_stmt(s)
+            finally:
+                self.scopes.pop()
         else:
             raise RuntimeError('Unknown statement')
 
     def _emit_expr(self, e: Expr):
+        if not self.memoize:
+            return self._lower_node(e)
+        self._expr_temps = {}
+        try:
+            return self._lower_expr(e)
+        finally:
+            self._expr_temps = None
+
+    def _lower_expr(self, e: Expr):
+        memo = self._expr_temps
+        if memo is not None:
+            hit = memo.get(id(e))
+            if hit is not None:
+                return hit
+            memo[id(e)] = out = self._lower_node(e)
+            return out
+        return self._lower_node(e)
+
+    def _lower_node(self, e: Expr):
         if isinstance(e, Literal):
             t = self.new_temp()
-            self.code.append(('const', e.value, None, t))
+            self._emit(('const', e.value, None, t))
             return t
         if isinstance(e, Var):
-            return e.name
+            return self._resolve(e.name)
         if isinstance(e, Unary):
-            v = self._emit_expr(e.right)
+            v = self._lower_expr(e.right)
+            if v in self.arrays:
+                return self._lower_vector(f'vunary_{e.op}', v, None)
             t = self.new_temp()
-            self.code.append((f'unary_{e.op}', v, None, t))
+            self._emit((f'unary_{e.op}', v, None, t))
             return t
         if isinstance(e, Binary):
-            l = self._emit_expr(e.left)
-            r = self._emit_expr(e.right)
+            l = self._lower_expr(e.left)
+            r = self._lower_expr(e.right)
+            if l in self.arrays or r in self.arrays:
+                return self._lower_vector(f'v{e.op}', l, r)
             t = self.new_temp()
-            self.code.append((e.op, l, r, t))
+            self._emit((e.op, l, r, t))
+            return t
+        if isinstance(e, Index):
+            i = self._lower_expr(e.index)
+            t = self.new_temp()
+            self._emit(('index', self._resolve(e.name), i, t))
+            return t
+        if isinstance(e, Reduce):
+            a = self._lower_expr(e.arg)
+            t = self.new_temp()
+            self._emit((e.op, a, None, t))
             return t
         raise RuntimeError('Unknown expr')
+
+    def _lower_vector(self, op: str, a, b):
+        # one instruction for the whole array; '+a' is a itself
+        if op == 'vunary_+':
+            return a
+        t = self.new_temp()
+        self.arrays.add(t)
+        self._emit((op, a, b, t))
+        return t
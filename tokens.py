@@ -17,6 +17,8 @@ class TokenType(Enum):
     RBRACE = auto()
     SEMI = auto()
     COMMA = auto()
+    LBRACKET = auto()
+    RBRACKET = auto()
 
     # Two-char
     EQEQ = auto()
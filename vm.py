@@ -1,25 +1,264 @@
-from typing import Dict, List, Tuple, Any
+import operator
+import time
+from array import array
+from typing import Dict, List, Tuple, Any, Optional, Sequence
 
 from .ast_nodes import *          # Program, Stmt, Expr, etc.
 from .semantic import type_of_literal, unify_types
 from .errors import RuntimeErrorMC
+from .sinks import OutputSink, StdoutSink
+from .limits import Budget, Limits, frame_bytes
+from . import arrays
+
+
+def divide(a, b):
+    try:
+        return a / b
+    except ZeroDivisionError:
+        raise RuntimeErrorMC("Division by zero") from None
+
+
+# TAC binary operators; comparisons give 0/1 like the AST evaluator
+TAC_BINOPS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': divide,
+    '==': lambda a, b: 1 if a == b else 0,
+    '!=': lambda a, b: 1 if a != b else 0,
+    '<': lambda a, b: 1 if a < b else 0,
+    '<=': lambda a, b: 1 if a <= b else 0,
+    '>': lambda a, b: 1 if a > b else 0,
+    '>=': lambda a, b: 1 if a >= b else 0,
+}
+# element-wise TAC operators ('v+' ...) -> arrays.elementwise operator
+TAC_VECOPS = {f'v{op}': op for op in arrays.ELEMENTWISE}
+
+
+def tac_labels(tac: Sequence[Tuple]) -> Dict[str, int]:
+    """Map every label name to the index of its 'label' instruction."""
+    return {ins[3]: i for i, ins in enumerate(tac) if ins[0] == 'label'}
+
+
+class TACExecution:
+    """Explicit state of one TAC run, so it can be paused and resumed.
+
+    ``resume(steps)`` runs until the program ends (returns True) or until
+    the first loop back-edge after *steps* more instructions (returns
+    False); a pause only ever happens at a back-edge, the same place budgets
+    are checked, so the hot path stays as it was. See ``scheduler.py``.
+    """
+
+    __slots__ = ('tac', 'labels', 'output', 'emit', 'values', 'types', 'pc',
+                 'done', 'budget', 'check', 'finished')
+
+    def __init__(self, tac, labels: Dict[str, int], output: OutputSink,
+                 limits: Optional[Limits] = None):
+        self.tac = tac
+        self.labels = labels
+        self.output = output
+        self.emit = output.write
+        self.values: Dict[str, Any] = {}
+        self.types: Dict[str, str] = {}
+        self.pc = 0
+        # instructions executed so far
+        self.done = 0
+        self.finished = False
+        self.budget = self.check = None
+        if limits is not None:
+            values = self.values
+            self.budget = Budget(limits, lambda: frame_bytes((values,)))
+            # the clock runs only inside resume(), not while queued
+            self.budget.stop()
+            self.check = self.budget.check
+
+    def resume(self, steps: Optional[int] = None) -> bool:
+        tac, labels, emit = self.tac, self.labels, self.emit
+        values, types, check = self.values, self.types, self.check
+        pause_at = self.done + steps if steps is not None else None
+        # back-edges only need a look when something is watching them
+        watched = check is not None or pause_at is not None
+        if self.budget is not None:
+            self.budget.start()
+
+        def load(name):
+            try:
+                return values[name]
+            except KeyError:
+                raise RuntimeErrorMC(f"Undeclared variable '{name}'") from None
+
+        def store(name, v):
+            tt = types.get(name)
+            if tt == 'int' and isinstance(v, float):
+                # shadowed names look like 'x.1' in TAC
+                raise RuntimeErrorMC(
+                    f"Type error: cannot assign float to int {name.split('.')[0]}"
+                )
+            values[name] = float(v) if tt == 'float' else v
+
+        pc = self.pc
+        n = len(tac)
+        # steps are only counted when a jump is taken: a straight run from
+        # seg to pc executed exactly pc - seg instructions
+        done = self.done
+        seg = pc
+        try:
+            while pc < n:
+                op, a1, a2, res = tac[pc]
+                pc += 1
+                if op in TAC_BINOPS:
+                    values[res] = TAC_BINOPS[op](load(a1), load(a2))
+                elif op == 'const':
+                    values[res] = a1
+                elif op == '=':
+                    if res not in types:
+                        raise RuntimeErrorMC(f"Undeclared variable '{res}'")
+                    store(res, load(a1))
+                elif op == 'decl':
+                    types[res] = a1
+                    store(res, load(a2) if a2 is not None else 0)
+                elif op == 'if_goto':
+                    if load(a1):
+                        target = labels[res]
+                        done += pc - seg
+                        back = target < pc
+                        pc = seg = target
+                        if watched and back and self._back_edge(done, pause_at):
+                            return False
+                elif op == 'if_false_goto':
+                    if not load(a1):
+                        target = labels[res]
+                        done += pc - seg
+                        back = target < pc
+                        pc = seg = target
+                        if watched and back and self._back_edge(done, pause_at):
+                            return False
+                elif op == 'goto':
+                    target = labels[res]
+                    done += pc - seg
+                    back = target < pc
+                    pc = seg = target
+                    if watched and back and self._back_edge(done, pause_at):
+                        return False
+                elif op == 'label':
+                    pass
+                elif op == 'print':
+                    emit(load(a1))
+                elif op == 'unary_-':
+                    values[res] = -load(a1)
+                elif op == 'unary_+':
+                    values[res] = +load(a1)
+                elif op == 'unary_!':
+                    values[res] = 0 if not load(a1) else 1
+                # arrays: one instruction per whole-array operation
+                elif op == 'index':
+                    values[res] = arrays.get(load(a1), load(a2), a1.split('.')[0])
+                elif op == 'store_index':
+                    arrays.put(load(res), load(a2), load(a1), res.split('.')[0])
+                # a whole-array operation counts one step per element, so
+                # step budgets and pauses see its real cost
+                elif op in TAC_VECOPS:
+                    values[res] = v = arrays.elementwise(TAC_VECOPS[op], load(a1), load(a2))
+                    done += len(v) - 1
+                elif op == 'vunary_-':
+                    values[res] = v = arrays.negate(load(a1))
+                    done += len(v) - 1
+                elif op == 'vassign':
+                    if res not in types:
+                        raise RuntimeErrorMC(f"Undeclared variable '{res}'")
+                    v = values[res]
+                    arrays.assign(v, load(a1), res.split('.')[0])
+                    done += len(v) - 1
+                elif op in arrays.REDUCTIONS:
+                    v = load(a1)
+                    values[res] = arrays.reduce(op, v)
+                    done += len(v) - 1
+                elif op == 'array':
+                    if self.budget is not None:
+                        self.budget.reserve(arrays.ELEMENT_BYTES * a2)
+                    types[res] = a1
+                    values[res] = arrays.new_array(a1, a2)
+                elif op == 'vprint':
+                    v = load(a1)
+                    emit(arrays.format_array(v))
+                    done += len(v) - 1
+                else:
+                    raise RuntimeErrorMC(f"Unknown TAC instruction {op!r}")
+            self.finished = True
+            return True
+        finally:
+            self.pc = pc
+            self.done = done + pc - seg
+            if self.budget is not None:
+                self.budget.stop()
+
+    def _back_edge(self, done: int, pause_at: Optional[int]) -> bool:
+        """Budget check; True when the current slice is used up."""
+        if self.check is not None:
+            self.check(done)
+        return pause_at is not None and done >= pause_at
 
 
 class VM:
-    def __init__(self, program):
+    def __init__(self, program, output: Optional[OutputSink] = None,
+                 limits: Optional[Limits] = None):
         self.program = program
-
-    def execute(self, tac):
-        """Execute the three-address code."""
-        pass
         # har scope ek dict: name -> (type_name, value)
         self.scopes: List[Dict[str, Tuple[str, Any]]] = [dict()]
+        # MC print -> sink; flushed when a run ends
+        self.output = output if output is not None else StdoutSink()
+        self.limits = limits if limits is not None and limits.any() else None
+        # steps done by the last run (TAC instructions / AST statements)
+        self.steps = 0
+        self._budget: Optional[Budget] = None
+
+    def execute(self, tac, labels: Optional[Dict[str, int]] = None, profile=None):
+        """Execute the three-address code.
+
+        *tac* only needs ``len()`` and indexing, so a lazily decoded
+        instruction stream (see ``mcb.MCBCode``) runs without being copied.
+        Pass a ``vmprof.ExecProfile`` as *profile* to collect hot spots.
+        """
+        if labels is None:
+            labels = tac_labels(tac)
+        code = tac
+        if profile is not None:
+            from .vmprof import ProfiledCode
+            code = ProfiledCode(tac, profile)
+        run = self.start(code, labels)
+        try:
+            run.resume()
+        finally:
+            self.steps = run.done
+            if profile is not None:
+                code.finish()
+            self.output.flush()
+
+    def start(self, tac, labels: Optional[Dict[str, int]] = None) -> TACExecution:
+        """Paused TAC run; drive it with ``resume(steps)``."""
+        if labels is None:
+            labels = tac_labels(tac)
+        return TACExecution(tac, labels, self.output, self.limits)
 
     # ---------- Public entry ----------
 
-    def run(self) -> None:
-        for st in self.program.statements:
-            self._exec_stmt(st)
+    def run(self, profile=None) -> None:
+        self.scopes = [dict()]
+        self.steps = 0
+        if self.limits is not None:
+            self._budget = Budget(self.limits, lambda: frame_bytes(self.scopes, wrapped=True))
+        if profile is not None:
+            from .vmprof import profile_ast
+            profile_ast(self, profile)
+        t0 = time.perf_counter()
+        try:
+            for st in self.program.statements:
+                self._exec_stmt(st)
+        finally:
+            if profile is not None:
+                del self._exec_stmt
+                profile.total_time = time.perf_counter() - t0
+            self.output.flush()
 
     # ---------- Scope helpers ----------
 
@@ -56,6 +295,7 @@ class VM:
             self.scopes.pop()
 
     def _exec_stmt(self, st: Stmt) -> None:
+        self.steps += 1
         if isinstance(st, VarDecl):
             if st.init is not None:
                 t, v = self._eval_expr(st.init)
@@ -70,9 +310,20 @@ class VM:
                 default = 0 if st.type_name == 'int' else 0.0
                 self._declare(st.name, st.type_name, default)
 
+        elif isinstance(st, ArrayDecl):
+            if self._budget is not None:
+                self._budget.reserve(arrays.ELEMENT_BYTES * st.size)
+            self._declare(st.name, arrays.array_type(st.type_name, st.size),
+                          arrays.new_array(st.type_name, st.size))
+
         elif isinstance(st, Assign):
             t, v = self._eval_expr(st.value)
-            tt, _oldv = self._resolve(st.name)
+            tt, oldv = self._resolve(st.name)
+            if isinstance(oldv, array):
+                # copy / fill in place
+                arrays.assign(oldv, v, st.name)
+                self.steps += len(oldv) - 1
+                return
             if tt == 'int' and t != 'int':
                 raise RuntimeErrorMC(
                     f"Type error: cannot assign {t} to int {st.name}"
@@ -80,9 +331,18 @@ class VM:
             v = int(v) if tt == 'int' else float(v)
             self._assign(st.name, tt, v)
 
+        elif isinstance(st, IndexAssign):
+            _t, i = self._eval_expr(st.index)
+            _t, v = self._eval_expr(st.value)
+            _tt, arr = self._resolve(st.name)
+            arrays.put(arr, i, v, st.name)
+
         elif isinstance(st, Print):
             _t, v = self._eval_expr(st.expr)
-            print(v)
+            if isinstance(v, array):
+                self.steps += len(v) - 1
+                v = arrays.format_array(v)
+            self.output.write(v)
 
         elif isinstance(st, Block):
             self._exec_block(st)
@@ -100,6 +360,9 @@ class VM:
                 if not cond_val:
                     break
                 self._exec_stmt(st.body)
+                # back-edge: the only place a run can go on for long
+                if self._budget is not None:
+                    self._budget.check(self.steps)
 
         else:
             raise RuntimeErrorMC("Unknown statement type")
@@ -116,6 +379,12 @@ class VM:
 
         if isinstance(e, Unary):
             t, v = self._eval_expr(e.right)
+            if isinstance(v, array) and e.op in ('-', '+'):
+                if e.op == '+':
+                    return t, v
+                # whole-array operations count one step per element
+                self.steps += len(v) - 1
+                return t, arrays.negate(v)
             if e.op == '-':
                 return t, -v
             if e.op == '+':
@@ -130,6 +399,10 @@ class VM:
             rt, rv = self._eval_expr(e.right)
 
             if e.op in ['+', '-', '*', '/']:
+                if isinstance(lv, array) or isinstance(rv, array):
+                    out = arrays.elementwise(e.op, lv, rv)
+                    self.steps += len(out) - 1
+                    return arrays.type_of(out), out
                 t = unify_types(lt, rt)
                 if t == 'float':
                     lv = float(lv)
@@ -145,7 +418,7 @@ class VM:
                 if e.op == '*':
                     return t, lv * rv
                 if e.op == '/':
-                    return 'float', lv / rv
+                    return 'float', divide(lv, rv)
 
             if e.op in ['==', '!=', '<', '<=', '>', '>=']:
                 if e.op == '==':
@@ -163,4 +436,14 @@ class VM:
 
             raise RuntimeErrorMC(f"Unknown binary operator {e.op}")
 
+        if isinstance(e, Index):
+            _t, i = self._eval_expr(e.index)
+            tt, arr = self._resolve(e.name)
+            return arrays.element_type(tt), arrays.get(arr, i, e.name)
+
+        if isinstance(e, Reduce):
+            _t, arr = self._eval_expr(e.arg)
+            self.steps += len(arr) - 1
+            return arrays.ELEMENT_TYPES[arr.typecode], arrays.reduce(e.op, arr)
+
         raise RuntimeErrorMC("Unknown expression type")
@@ -0,0 +1,152 @@
+# src/vmprof.py
+"""
+Execution profiler for the VM (``--profile-vm``).
+
+Counts executed TAC instructions (``VM.execute``) or statements (``VM.run``)
+and the time spent in them, per source line and per loop, and prints a
+hot-spot table next to the source text.
+
+Nothing here touches the normal execution path: ``VM.execute`` is handed a
+``ProfiledCode`` wrapper whose ``__getitem__`` does the bookkeeping on every
+instruction fetch, and ``VM.run`` swaps ``_exec_stmt`` for a wrapper on that
+one instance. Without a profile the VM runs exactly as before.
+"""
+
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .ast_nodes import While
+
+
+class ExecProfile:
+    """Raw counters; ``by_line()`` / ``loops()`` aggregate them."""
+
+    def __init__(self, lines: Optional[Sequence[int]] = None):
+        # TAC mode: per instruction index; AST mode: per node id
+        self.lines = list(lines) if lines is not None else []
+        self.counts: Dict[int, int] = {}
+        self.times: Dict[int, float] = {}
+        self.node_line: Dict[int, int] = {}
+        # TAC back-edges: (goto index, header index) -> times taken
+        self.back_edges: Dict[Tuple[int, int], int] = {}
+        # AST loops: node id -> (line, inclusive seconds, body node id)
+        self.ast_loops: Dict[int, list] = {}
+        self.unit = 'instructions'
+        self.total_time = 0.0
+
+    def line_of(self, key: int) -> int:
+        if self.unit == 'statements':
+            return self.node_line.get(key, 0)
+        return self.lines[key] if key < len(self.lines) else 0
+
+    def by_line(self) -> Dict[int, Tuple[int, float]]:
+        """line -> (executions, self time in seconds)."""
+        out: Dict[int, list] = {}
+        for key, n in self.counts.items():
+            row = out.setdefault(self.line_of(key), [0, 0.0])
+            row[0] += n
+            row[1] += self.times.get(key, 0.0)
+        return {ln: (n, t) for ln, (n, t) in out.items()}
+
+    def loops(self) -> List[Tuple[int, int, float]]:
+        """(line, iterations, inclusive seconds) for every loop that ran."""
+        out = []
+        if self.unit == 'statements':
+            for line, secs, body in self.ast_loops.values():
+                out.append((line, self.counts.get(body, 0), secs))
+        else:
+            for (goto_i, head_i), n in self.back_edges.items():
+                secs = sum(t for i, t in self.times.items() if head_i <= i <= goto_i)
+                out.append((self.line_of(head_i), n, secs))
+        out.sort(key=lambda r: -r[2])
+        return out
+
+
+class ProfiledCode(Sequence):
+    """TAC wrapper that charges the time between fetches to the fetched pc."""
+
+    def __init__(self, tac, profile: ExecProfile):
+        self.tac = tac
+        self.profile = profile
+        self.last_pc = -1
+        self.last_t = 0.0
+        self.started = 0.0
+
+    def __len__(self):
+        return len(self.tac)
+
+    def __getitem__(self, pc):
+        now = time.perf_counter()
+        prof = self.profile
+        last = self.last_pc
+        if last >= 0:
+            prof.times[last] = prof.times.get(last, 0.0) + (now - self.last_t)
+            if pc <= last:
+                edge = (last, pc)
+                prof.back_edges[edge] = prof.back_edges.get(edge, 0) + 1
+        else:
+            self.started = now
+        prof.counts[pc] = prof.counts.get(pc, 0) + 1
+        self.last_pc = pc
+        self.last_t = time.perf_counter()
+        return self.tac[pc]
+
+    def finish(self):
+        now = time.perf_counter()
+        if self.last_pc >= 0:
+            prof = self.profile
+            prof.times[self.last_pc] = prof.times.get(self.last_pc, 0.0) + (now - self.last_t)
+            prof.total_time = now - self.started
+
+
+def profile_ast(vm, profile: ExecProfile):
+    """Install a per-statement profiling wrapper on *vm* (one instance only)."""
+    profile.unit = 'statements'
+    inner = vm._exec_stmt
+    child_time = [0.0]
+    counts, times = profile.counts, profile.times
+
+    def exec_stmt(st):
+        key = id(st)
+        t0 = time.perf_counter()
+        saved, child_time[0] = child_time[0], 0.0
+        try:
+            inner(st)
+        finally:
+            dt = time.perf_counter() - t0
+            counts[key] = counts.get(key, 0) + 1
+            times[key] = times.get(key, 0.0) + dt - child_time[0]
+            child_time[0] = saved + dt
+            if key not in profile.node_line:
+                profile.node_line[key] = st.line
+                if isinstance(st, While):
+                    profile.ast_loops[key] = [st.line, 0.0, id(st.body)]
+            if isinstance(st, While):
+                profile.ast_loops[key][1] += dt
+
+    vm._exec_stmt = exec_stmt
+    return exec_stmt
+
+
+def format_report(profile: ExecProfile, source: Optional[str] = None, top: int = 10) -> str:
+    """Hot-spot table (by self time) plus loop table, annotated with source."""
+    src_lines = source.splitlines() if source else []
+
+    def text(ln):
+        if 0 < ln <= len(src_lines):
+            return src_lines[ln - 1].strip()
+        return ''
+
+    rows = sorted(profile.by_line().items(), key=lambda r: -r[1][1])
+    total = sum(t for _n, t in profile.by_line().values()) or 1e-12
+    out = [f"--- VM PROFILE (hot lines by time, {profile.unit}) ---",
+           f"{'line':>6} {'count':>10} {'time ms':>10} {'%':>6}  source"]
+    for ln, (n, t) in rows[:top]:
+        out.append(f"{ln or '?':>6} {n:>10} {t * 1000:>10.3f} {t / total * 100:>5.1f}%  {text(ln)}")
+    loops = profile.loops()
+    if loops:
+        out.append("")
+        out.append(f"{'loop@':>6} {'iters':>10} {'time ms':>10} {'%':>6}  source")
+        for ln, n, t in loops[:top]:
+            out.append(f"{ln or '?':>6} {n:>10} {t * 1000:>10.3f} {t / total * 100:>5.1f}%  {text(ln)}")
+    return '\n'.join(out)
@@ -0,0 +1,141 @@
+# src/workload.py
+"""
+Synthetic MC program generator for benchmarks.
+
+Programs scale along five knobs and are always valid, terminating and
+deterministic for a given seed:
+
+* ``size``       -- top-level statement groups
+* ``depth``      -- nesting of if/while blocks inside a group
+* ``expr_depth`` -- height of generated expression trees
+* ``trips``      -- iterations of every generated while loop
+* ``variables``  -- int variables in play
+
+Loops nest, so a group at depth ``d`` may run ``trips ** d`` times. Values
+are kept small with reset guards so big-int arithmetic does not skew timings.
+
+    python -m package.workload --size 200 --depth 3 -o big.mc
+"""
+
+import argparse
+import random
+from dataclasses import dataclass, asdict
+
+BOUND = 1000000
+
+
+@dataclass
+class WorkloadSpec:
+    size: int = 50
+    depth: int = 2
+    expr_depth: int = 3
+    trips: int = 10
+    variables: int = 8
+    seed: int = 0
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class _Gen:
+    def __init__(self, spec: WorkloadSpec):
+        if spec.variables < 1:
+            raise ValueError("a workload needs at least one variable")
+        self.spec = spec
+        self.rnd = random.Random(spec.seed)
+        self.lines = []
+        self.loop_id = 0
+
+    def var(self):
+        return f"v{self.rnd.randrange(self.spec.variables)}"
+
+    def expr(self, depth):
+        if depth <= 0 or self.rnd.random() < 0.2:
+            if self.rnd.random() < 0.7:
+                return self.var()
+            return str(self.rnd.randint(0, 9))
+        op = self.rnd.choice(['+', '-', '+', '*'])
+        if op == '*':
+            # scale by a literal only, keeps values bounded
+            return f"({self.expr(depth - 1)} * {self.rnd.randint(1, 3)})"
+        return f"({self.expr(depth - 1)} {op} {self.expr(depth - 1)})"
+
+    def cond(self):
+        op = self.rnd.choice(['<', '<=', '>', '>=', '==', '!='])
+        return f"{self.expr(max(1, self.spec.expr_depth - 1))} {op} {self.expr(1)}"
+
+    def emit(self, indent, text):
+        self.lines.append('    ' * indent + text)
+
+    def assign(self, indent):
+        v = self.var()
+        self.emit(indent, f"{v} = {self.expr(self.spec.expr_depth)};")
+        self.emit(indent, f"if ({v} > {BOUND}) {v} = {v[1:]};")
+        self.emit(indent, f"if ({v} < -{BOUND}) {v} = {v[1:]};")
+
+    def group(self, indent, depth):
+        kind = self.rnd.random() if depth > 0 else 0.0
+        if kind < 0.4:
+            self.assign(indent)
+        elif kind < 0.7:
+            self.emit(indent, f"if ({self.cond()}) {{")
+            self.group(indent + 1, depth - 1)
+            self.emit(indent, "} else {")
+            self.assign(indent + 1)
+            self.emit(indent, "}")
+        else:
+            self.loop_id += 1
+            c = f"c{self.loop_id}"
+            self.emit(indent, f"int {c} = 0;")
+            self.emit(indent, f"while ({c} < {self.spec.trips}) {{")
+            self.group(indent + 1, depth - 1)
+            self.assign(indent + 1)
+            self.emit(indent + 1, f"{c} = {c} + 1;")
+            self.emit(indent, "}")
+
+    def program(self):
+        s = self.spec
+        self.emit(0, f"// synthetic workload {s.to_dict()}")
+        self.emit(0, "start")
+        for i in range(s.variables):
+            self.emit(1, f"int v{i} = {i};")
+        for _ in range(s.size):
+            self.group(1, s.depth)
+        # one checksum line so every run has observable output
+        total = ' + '.join(f"v{i}" for i in range(s.variables)) or '0'
+        self.emit(1, f"print({total});")
+        self.emit(0, "end")
+        return '\n'.join(self.lines) + '\n'
+
+
+def generate_program(spec: WorkloadSpec = None, **kwargs) -> str:
+    """Source text for *spec* (or a spec built from keyword arguments)."""
+    if spec is None:
+        spec = WorkloadSpec(**kwargs)
+    return _Gen(spec).program()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate a synthetic MC program")
+    d = WorkloadSpec()
+    ap.add_argument("--size", type=int, default=d.size)
+    ap.add_argument("--depth", type=int, default=d.depth)
+    ap.add_argument("--expr-depth", dest="expr_depth", type=int, default=d.expr_depth)
+    ap.add_argument("--trips", type=int, default=d.trips)
+    ap.add_argument("--variables", type=int, default=d.variables)
+    ap.add_argument("--seed", type=int, default=d.seed)
+    ap.add_argument("-o", "--output", help="write here instead of stdout")
+    args = ap.parse_args()
+
+    spec = WorkloadSpec(args.size, args.depth, args.expr_depth, args.trips,
+                        args.variables, args.seed)
+    src = generate_program(spec)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(src)
+    else:
+        print(src, end="")
+
+
+if __name__ == "__main__":
+    main()